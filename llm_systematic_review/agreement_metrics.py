@@ -0,0 +1,176 @@
+import re
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# LLM criterion columns as produced by pd.json_normalize on the decisions, e.g.
+# 'inclusion_criteria_evaluation.llm_ic_1_participants.decision' or 'llm_ic_1_population.decision'
+_CRITERION_COLUMN = re.compile(r"(?:^|\.)(llm_(?:ic|ec)_\d+_\w+?)(?:\.decision)?$")
+_BINARY_VALUES = {"yes": 1.0, "include": 1.0, "true": 1.0, "1": 1.0, "1.0": 1.0,
+                  "no": 0.0, "exclude": 0.0, "false": 0.0, "0": 0.0, "0.0": 0.0}
+
+METRICS = ["sensitivity", "specificity", "precision", "accuracy", "kappa", "wss"]
+
+# Resamples drawn at once; bounds the (chunk x rows) weight matrix to a few hundred MB at most
+_BOOTSTRAP_CHUNK = 1000
+
+
+def binarize(values: pd.Series) -> np.ndarray:
+    """
+    Maps Yes/No, Include/Exclude, True/False and 1/0 (in any case) to 1.0/0.0, everything else to NaN.
+    """
+    return values.astype(str).str.strip().str.lower().map(_BINARY_VALUES).to_numpy(dtype=float)
+
+
+def criterion_columns(joined: pd.DataFrame) -> Dict[str, str]:
+    """
+    Finds the LLM decision column of every llm_ic_*/llm_ec_* criterion.
+
+    Returns:
+        Dictionary mapping the criterion name (e.g. 'llm_ic_1_participants') to its column.
+    """
+    columns = {}
+    for column in joined.columns:
+        match = _CRITERION_COLUMN.search(str(column))
+        if match is not None:
+            columns.setdefault(match.group(1), column)
+    return columns
+
+
+def confusion_counts(human: np.ndarray, llm: np.ndarray) -> np.ndarray:
+    """
+    Counts the confusion matrix cells of every criterion at once.
+
+    Args:
+        human: (rows x criteria) array of 0/1 reference decisions, NaN where missing.
+        llm: (rows x criteria) array of 0/1 LLM decisions, NaN where missing.
+
+    Returns:
+        (4 x criteria) array of TP, FP, FN, TN counts; rows with a missing value are left out of that criterion.
+    """
+    return _cell_indicators(human, llm).sum(axis=0).reshape(4, -1)
+
+
+def _cell_indicators(human: np.ndarray, llm: np.ndarray) -> np.ndarray:
+    # (rows x 4*criteria) 0/1 matrix: a row's cell for each criterion, all zeros where a value is missing
+    valid = ~(np.isnan(human) | np.isnan(llm))
+    human_positive, llm_positive = (human == 1) & valid, (llm == 1) & valid
+    human_negative, llm_negative = (human == 0) & valid, (llm == 0) & valid
+    cells = [human_positive & llm_positive, human_negative & llm_positive, human_positive & llm_negative, human_negative & llm_negative]
+    return np.concatenate(cells, axis=1).astype(np.float64)
+
+
+def metrics_from_counts(tp: np.ndarray, fp: np.ndarray, fn: np.ndarray, tn: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Agreement metrics from confusion counts of any (broadcastable) shape, with the human decision as reference.
+
+    Work saved over sampling is (TN + FN) / N - (1 - sensitivity): the share of
+    records screened out by the LLM minus the share of includes it loses.
+    Metrics with an empty denominator are NaN.
+    """
+    tp, fp, fn, tn = (np.asarray(count, dtype=float) for count in (tp, fp, fn, tn))
+    n = tp + fp + fn + tn
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sensitivity = tp / (tp + fn)
+        observed = (tp + tn) / n
+        expected = ((tp + fp) * (tp + fn) + (fn + tn) * (fp + tn)) / n ** 2
+        return {
+            "sensitivity": sensitivity,
+            "specificity": tn / (tn + fp),
+            "precision": tp / (tp + fp),
+            "accuracy": observed,
+            "kappa": (observed - expected) / (1 - expected),
+            "wss": (tn + fn) / n - (1 - sensitivity)
+        }
+
+
+def bootstrap_counts(human: np.ndarray, llm: np.ndarray, n_bootstrap: int = 10000, random_state: Optional[int] = 0) -> np.ndarray:
+    """
+    Confusion counts of every criterion in `n_bootstrap` resamples of the rows.
+
+    A resample is represented by how often each row is drawn, so the counts of
+    all resamples and criteria follow from one matrix product per chunk of
+    resamples instead of a Python loop over resamples.
+
+    Returns:
+        (n_bootstrap x 4 x criteria) array of TP, FP, FN, TN counts.
+    """
+    rng = np.random.default_rng(random_state)
+    indicators = _cell_indicators(human, llm)
+    n_rows = len(indicators)
+    counts = np.empty((n_bootstrap, indicators.shape[1]))
+    for start in range(0, n_bootstrap, _BOOTSTRAP_CHUNK):
+        size = min(_BOOTSTRAP_CHUNK, n_bootstrap - start)
+        draws = rng.integers(0, n_rows, size=(size, n_rows)) + np.arange(size)[:, None] * n_rows
+        weights = np.bincount(draws.ravel(), minlength=size * n_rows).reshape(size, n_rows)
+        counts[start:start + size] = weights @ indicators
+    return counts.reshape(n_bootstrap, 4, -1)
+
+
+def agreement_metrics(joined: pd.DataFrame, pairs: Dict[str, Tuple[str, str]], n_bootstrap: int = 10000, confidence: float = 0.95,
+                      random_state: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Computes confusion matrices, Cohen's kappa, sensitivity, specificity and WSS for several criteria in one pass.
+
+    Args:
+        joined: Frame with the human and the LLM decisions of the same articles side by side.
+        pairs: Dictionary mapping a criterion name to its (human column, LLM column); the values are
+            binarized, so 'Yes'/'No', 'Include'/'Exclude', booleans and 0/1 all work.
+        n_bootstrap: Number of bootstrap resamples for the confidence intervals; 0 skips them.
+        confidence: Coverage of the percentile confidence intervals.
+        random_state: Seed of the resampling.
+
+    Returns:
+        One row per criterion with the TP/FP/FN/TN counts, the number of rows compared
+        and every metric in METRICS, each with '<metric>_ci_low' and '<metric>_ci_high' columns.
+    """
+    names = list(pairs)
+    human = np.column_stack([binarize(joined[human_column]) for human_column, _ in pairs.values()])
+    llm = np.column_stack([binarize(joined[llm_column]) for _, llm_column in pairs.values()])
+
+    tp, fp, fn, tn = confusion_counts(human, llm)
+    report = pd.DataFrame({"tp": tp, "fp": fp, "fn": fn, "tn": tn}, index=pd.Index(names, name="criterion")).astype(int)
+    report["n"] = report[["tp", "fp", "fn", "tn"]].sum(axis=1)
+    point = metrics_from_counts(tp, fp, fn, tn)
+
+    if n_bootstrap > 0:
+        resampled = metrics_from_counts(*np.moveaxis(bootstrap_counts(human, llm, n_bootstrap, random_state), 1, 0))
+        tail = (1 - confidence) / 2 * 100
+    for metric in METRICS:
+        report[metric] = point[metric]
+        if n_bootstrap > 0:
+            # Resamples with an empty denominator (e.g. no human includes drawn) are left out
+            report[f"{metric}_ci_low"], report[f"{metric}_ci_high"] = np.nanpercentile(resampled[metric], [tail, 100 - tail], axis=0)
+    return report
+
+
+def llm_criterion_pairs(joined: pd.DataFrame, human_columns: Dict[str, str], final_decision: Optional[Tuple[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+    """
+    Pairs every llm_ic_*/llm_ec_* criterion found in `joined` with its human column.
+
+    Args:
+        joined: The joined human/LLM frame.
+        human_columns: Dictionary mapping a criterion name (e.g. 'llm_ic_1_participants') to the human column;
+            criteria without a human column are skipped.
+        final_decision: Optional (human column, LLM column) of the final decision, listed first as 'final_decision'.
+
+    Returns:
+        Dictionary suitable as `pairs` of agreement_metrics.
+    """
+    pairs = {"final_decision": final_decision} if final_decision is not None else {}
+    for criterion, llm_column in criterion_columns(joined).items():
+        if criterion in human_columns:
+            pairs[criterion] = (human_columns[criterion], llm_column)
+    return pairs
+
+
+def confusion_matrices(report: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Returns the 2 x 2 confusion matrix of every criterion of an agreement_metrics report.
+
+    The layout is that of sklearn.metrics.confusion_matrix: rows are the human decision
+    (0, 1), columns the LLM decision (0, 1).
+    """
+    counts = report[["tn", "fp", "fn", "tp"]].to_numpy(dtype=int).reshape(-1, 2, 2)
+    return dict(zip(report.index, counts))
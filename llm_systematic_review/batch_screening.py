@@ -0,0 +1,226 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from llm_systematic_review.call_metrics import metrics_template, template_name
+from llm_systematic_review.endpoint_pool import EndpointPool
+from llm_systematic_review.helpers import SYSTEM_MESSAGE, create_system_message
+from llm_systematic_review.prompt_renderer import COMPACT_KEYS, PROMPT_ENCODINGS, compact_instructions, compact_json, count_tokens
+from llm_systematic_review.result_journal import ResultJournal
+from llm_systematic_review.rule_prefilter import RulePrefilter
+from llm_systematic_review.screening_engine import (TITLE_ABSTRACT_COLUMNS, apply_prefilter, build_title_abstract_prompts, fill_rule_decisions,
+                                                    pending_positions, run_coroutine, screen_prompts_async)
+
+BATCH_INSTRUCTION = (
+    " Several articles are provided in 'input_articles'. Evaluate each article independently of the others "
+    "and return one result per article in 'results', in the same order, each with the article's covidence_number."
+)
+
+DEFAULT_BATCH_SIZE = 10
+# Input tokens per batched request; leaves room in the context window for one result per article
+DEFAULT_MAX_BATCH_TOKENS = 8000
+
+
+def _article_fields(title: Any, abstract: Any, year: Any, covidence_number: Any) -> Dict[str, Any]:
+    return {"title": title, "abstract": abstract, "year": year, "covidence_number": covidence_number}
+
+
+def _batch_template(prompt_template: Dict) -> Dict[str, Any]:
+    # The template with the batch instruction and a 'results' list as output format, without the article section
+    batch_prompt = {key: value for key, value in prompt_template.items() if key not in ("input_article", "output_format")}
+    batch_prompt["task_definition"] = prompt_template["task_definition"] + BATCH_INSTRUCTION
+    batch_prompt["output_format"] = {"results": [prompt_template["output_format"]]}
+    return batch_prompt
+
+
+def create_llm_batch_prompt_string(prompt_template: Dict, input_articles: List[Dict[str, Any]], encoding: str = "pretty") -> str:
+    """
+    Builds one prompt that asks for the decisions on several articles at once.
+
+    The criteria of the template are sent once; the single 'input_article' is
+    replaced by an 'input_articles' list, and the output format by a 'results'
+    list of the template's per-article output format.
+
+    Args:
+        prompt_template: A title/abstract PromptTemplates entry.
+        input_articles: Article dictionaries with 'title', 'abstract', 'year' and 'covidence_number'.
+        encoding: 'pretty' for the whole batch prompt as indented JSON, 'compact' for only the
+            articles as a minified JSON list with short keys (use with create_batch_system_message).
+
+    Returns:
+        A JSON-formatted string to be sent to the LLM.
+    """
+    if encoding not in PROMPT_ENCODINGS:
+        raise ValueError(f"Unknown prompt encoding '{encoding}', expected one of {PROMPT_ENCODINGS}")
+    if encoding == "compact":
+        return compact_json([{COMPACT_KEYS[field]: value for field, value in article.items()} for article in input_articles])
+    batch_prompt = _batch_template(prompt_template)
+    batch_prompt["input_articles"] = input_articles
+    # Keep the key order of the original batch prompt, with the output format last
+    batch_prompt["output_format"] = batch_prompt.pop("output_format")
+    return json.dumps(batch_prompt, indent=2)
+
+
+def create_batch_system_message(prompt_template: Dict, encoding: str = "pretty") -> str:
+    """
+    Returns the system message that goes with batched prompts of the given encoding.
+
+    In 'compact' mode the role, criteria, batch instruction and output format are
+    part of the system message, so the user message only carries the articles.
+    """
+    if encoding == "pretty":
+        return SYSTEM_MESSAGE
+    instructions = compact_instructions(dict(_batch_template(prompt_template), input_article=prompt_template["input_article"]))
+    return (
+        f"{SYSTEM_MESSAGE}\n\nInstructions, criteria and output format: {instructions}\n"
+        "The user message contains the articles as a JSON list, using the short keys listed in input_article_keys."
+    )
+
+
+def pack_batches(articles: pd.DataFrame, prompt_template: Dict, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS, encoding: str = "pretty") -> List[List[int]]:
+    """
+    Groups consecutive articles into batches of at most `batch_size` articles and `max_batch_tokens` input tokens.
+
+    An article that alone exceeds the token budget gets a batch of its own.
+
+    Args:
+        articles: DataFrame with 'Title', 'Abstract', 'Published Year' and 'Covidence #' columns.
+        prompt_template: A title/abstract PromptTemplates entry.
+        batch_size: Maximum number of articles per request.
+        max_batch_tokens: Maximum number of input tokens per request, system message included.
+        encoding: 'pretty' or 'compact', see create_llm_batch_prompt_string.
+
+    Returns:
+        Lists of row positions in `articles`, one list per batch.
+    """
+    static_tokens = (count_tokens(create_llm_batch_prompt_string(prompt_template, [], encoding))
+                     + count_tokens(create_batch_system_message(prompt_template, encoding)))
+    batches, current, current_tokens = [], [], static_tokens
+    for position, row in enumerate(articles[TITLE_ABSTRACT_COLUMNS].itertuples(index=False)):
+        article = _article_fields(*row)
+        article_text = (create_llm_batch_prompt_string(prompt_template, [article], encoding) if encoding == "compact"
+                        else json.dumps(article, indent=2))
+        article_tokens = count_tokens(article_text)
+        if current and (len(current) == batch_size or current_tokens + article_tokens > max_batch_tokens):
+            batches.append(current)
+            current, current_tokens = [], static_tokens
+        current.append(position)
+        current_tokens += article_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def demultiplex_batch_response(llm_response: Optional[Dict[str, Any]], covidence_numbers: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Splits a batched response into per-article results and checks that every article came back.
+
+    Args:
+        llm_response: Parsed JSON response of a batched request, or None if the request failed.
+        covidence_numbers: Covidence numbers of the articles sent in the batch.
+
+    Returns:
+        Tuple of (results keyed by Covidence number, Covidence numbers missing from the response).
+        Results for IDs that were not part of the batch are dropped.
+    """
+    expected = set(covidence_numbers)
+    results = {}
+    if llm_response is not None and isinstance(llm_response.get("results"), list):
+        for result in llm_response["results"]:
+            if not isinstance(result, dict):
+                continue
+            covidence_number = str(result.get("covidence_number", "")).strip()
+            if covidence_number in expected and covidence_number not in results:
+                results[covidence_number] = result
+    missing = [covidence_number for covidence_number in covidence_numbers if covidence_number not in results]
+    return results, missing
+
+
+async def screen_articles_batched_async(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str,
+                                        batch_size: int = DEFAULT_BATCH_SIZE, max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                                        max_concurrency: int = 8, use_cache: bool = True,
+                                        journal_path: Optional[str] = None, encoding: str = "pretty", pool: Optional[EndpointPool] = None,
+                                        prefilter: Optional[RulePrefilter] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Screens articles with several articles per request.
+
+    Batches are sent concurrently. Articles missing from a batched response
+    (dropped or with a garbled covidence_number) are re-screened one by one, so
+    every article either gets its own result or None if even that fails.
+    Encoding, endpoint pool and prefilter work as in screen_articles_async.
+
+    Args:
+        articles: DataFrame with 'Title', 'Abstract', 'Published Year' and 'Covidence #' columns.
+        prompt_template: A title/abstract PromptTemplates entry.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        batch_size: Maximum number of articles per request.
+        max_batch_tokens: Maximum number of input tokens per request.
+        max_concurrency: Upper bound on simultaneous requests.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        journal_path: Optional JSONL file used to checkpoint and resume the run.
+        encoding: 'pretty' (original prompt format) or 'compact' (minified articles, criteria in the system message).
+        pool: Optional EndpointPool to spread the requests over several endpoints; api_key, base_url and model are then ignored.
+        prefilter: Optional RulePrefilter deciding articles without an LLM call.
+
+    Returns:
+        A list of LLM decisions in the same order as the DataFrame rows, with None
+        for articles that could not be screened.
+    """
+    covidence_numbers = articles['Covidence #'].astype(str).tolist()
+    journal = ResultJournal(journal_path) if journal_path is not None else None
+    rule_decisions, duplicate_of = apply_prefilter(prefilter, articles, journal)
+    pending = pending_positions(covidence_numbers, journal, rule_decisions, duplicate_of)
+    pending_articles = articles.iloc[pending]
+
+    batches = [[pending[position] for position in batch]
+               for batch in pack_batches(pending_articles, prompt_template, batch_size, max_batch_tokens, encoding)]
+    prompts = [
+        create_llm_batch_prompt_string(prompt_template, [_article_fields(*row) for row in articles.iloc[batch][TITLE_ABSTRACT_COLUMNS].itertuples(index=False)],
+                                       encoding)
+        for batch in batches
+    ]
+    print(f"Screening {len(pending)} articles in {len(batches)} batched requests")
+    with metrics_template(f"{template_name(prompt_template)} (batched)"):
+        responses = await screen_prompts_async(prompts, api_key, base_url, model, max_concurrency, use_cache,
+                                               system_message=create_batch_system_message(prompt_template, encoding), pool=pool)
+
+    results = [journal.get(covidence_number) if journal is not None else None for covidence_number in covidence_numbers]
+    missing_positions = []
+    for batch, llm_response in zip(batches, responses):
+        batch_results, missing = demultiplex_batch_response(llm_response, [covidence_numbers[position] for position in batch])
+        for position in batch:
+            covidence_number = covidence_numbers[position]
+            if covidence_number in batch_results:
+                results[position] = batch_results[covidence_number]
+                if journal is not None:
+                    journal.append(covidence_number, results[position])
+            else:
+                missing_positions.append(position)
+
+    if missing_positions:
+        print(f"{len(missing_positions)} articles missing from batched responses, re-screening them individually")
+        prompts = build_title_abstract_prompts(articles.iloc[missing_positions], prompt_template, encoding)
+        missing_numbers = [covidence_numbers[position] for position in missing_positions]
+        with metrics_template(template_name(prompt_template)):
+            responses = await screen_prompts_async(prompts, api_key, base_url, model, max_concurrency, use_cache, missing_numbers, journal,
+                                                   create_system_message(prompt_template, encoding), pool=pool)
+        for position, llm_response in zip(missing_positions, responses):
+            results[position] = llm_response
+    fill_rule_decisions(results, covidence_numbers, journal, rule_decisions, duplicate_of)
+    return results
+
+
+def screen_articles_batched(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str,
+                            batch_size: int = DEFAULT_BATCH_SIZE, max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                            max_concurrency: int = 8, use_cache: bool = True,
+                            journal_path: Optional[str] = None, encoding: str = "pretty", pool: Optional[EndpointPool] = None,
+                            prefilter: Optional[RulePrefilter] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Blocking wrapper around screen_articles_batched_async for use in the request scripts.
+    """
+    return run_coroutine(screen_articles_batched_async(articles, prompt_template, api_key, base_url, model, batch_size,
+                                                       max_batch_tokens, max_concurrency, use_cache, journal_path, encoding, pool, prefilter))
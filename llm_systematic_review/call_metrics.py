@@ -0,0 +1,209 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.prompt_renderer import count_tokens
+
+DEFAULT_METRICS_DIR = "data/llm_call_metrics"
+# Fields of every entry written by CallMetrics.record
+METRIC_COLUMNS = ["timestamp", "template", "endpoint", "model", "prompt_tokens", "completion_tokens",
+                  "usage_estimated", "latency", "status"]
+SUMMARY_COLUMNS = ["calls", "failed_attempts", "prompt_tokens", "completion_tokens", "mean_prompt_tokens",
+                   "mean_completion_tokens", "p50_latency_s", "p95_latency_s", "total_tokens"]
+
+# Assumed per-request latency and answer length when there is no metrics history to go by
+DEFAULT_LATENCY = 8.0
+DEFAULT_COMPLETION_TOKENS = {
+    "PROMPT_TITLE_ABSTRACT": 350,
+    "PROMPT_FULL_TEXT": 450,
+    "PROMPT_EXTRACTION_PT_1": 250,
+    "PROMPT_EXTRACTION_PT_2": 300,
+    "PROMPT_EXTRACTION_PT_3": 150
+}
+
+# Name of the template the requests of the current task are built from
+_current_template: contextvars.ContextVar = contextvars.ContextVar("current_template", default="unknown")
+
+
+def template_name(prompt_template: Dict[str, Any]) -> str:
+    """
+    Returns the PromptTemplates attribute name of a template, e.g. 'PROMPT_FULL_TEXT'.
+    """
+    for name, value in vars(PromptTemplates).items():
+        if value is prompt_template:
+            return name
+    return "custom"
+
+
+@contextlib.contextmanager
+def metrics_template(name: str) -> Iterator[None]:
+    """
+    Labels the calls made inside the block (and the asyncio tasks started from it) with a template name.
+    """
+    token = _current_template.set(name)
+    try:
+        yield
+    finally:
+        _current_template.reset(token)
+
+
+class CallMetrics:
+    """
+    Run-level log of every LLM API call, one JSON object per line.
+
+    Each entry holds the template, endpoint, model, prompt and completion
+    tokens, latency and outcome of one HTTP attempt, so retries and failures
+    show up as well. Token counts come from the response's usage; where the
+    API does not report usage (streamed answers) they are estimated with
+    count_tokens and flagged with 'usage_estimated'.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the JSONL metrics file; entries are appended.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def record(self, base_url: str, model: str, latency: float, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None,
+               usage_estimated: bool = False, status: str = "ok") -> None:
+        entry = {
+            "timestamp": time.time(),
+            "template": _current_template.get(),
+            "endpoint": base_url.rstrip("/"),
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "usage_estimated": usage_estimated,
+            "latency": latency,
+            "status": status
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_active_metrics: Optional[CallMetrics] = None
+
+
+def start_metrics_run(path: Optional[str] = None) -> CallMetrics:
+    """
+    Starts logging every LLM call of this process, by default to a new timestamped file in DEFAULT_METRICS_DIR.
+    """
+    global _active_metrics
+    stop_metrics_run()
+    if path is None:
+        path = os.path.join(DEFAULT_METRICS_DIR, f"llm_calls_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+    _active_metrics = CallMetrics(path)
+    return _active_metrics
+
+
+def stop_metrics_run() -> None:
+    global _active_metrics
+    if _active_metrics is not None:
+        _active_metrics.close()
+        _active_metrics = None
+
+
+def get_call_metrics() -> Optional[CallMetrics]:
+    """
+    Returns the metrics log of the current run, or None if no run was started.
+    """
+    return _active_metrics
+
+
+def load_call_metrics(path: str) -> pd.DataFrame:
+    """
+    Reads a metrics file; the frame has the METRIC_COLUMNS even if no call was logged
+    (e.g. a run that was fully resumed or answered from the cache).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()], columns=METRIC_COLUMNS)
+
+
+def summarize_call_metrics(path: str) -> pd.DataFrame:
+    """
+    Summarizes a metrics file by template.
+
+    Returns:
+        One row per template with the number of calls and failed attempts, total and
+        mean prompt/completion tokens of the successful calls, and their p50/p95 latency.
+    """
+    calls = load_call_metrics(path)
+    if calls.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS).rename_axis("template")
+    calls["failed"] = calls["status"] != "ok"
+    succeeded = calls[~calls["failed"]]
+    grouped = succeeded.groupby("template")
+    summary = pd.DataFrame({
+        "calls": calls.groupby("template").size(),
+        "failed_attempts": calls.groupby("template")["failed"].sum(),
+        "prompt_tokens": grouped["prompt_tokens"].sum(),
+        "completion_tokens": grouped["completion_tokens"].sum(),
+        "mean_prompt_tokens": grouped["prompt_tokens"].mean().round(1),
+        "mean_completion_tokens": grouped["completion_tokens"].mean().round(1),
+        "p50_latency_s": grouped["latency"].quantile(0.5).round(2),
+        "p95_latency_s": grouped["latency"].quantile(0.95).round(2)
+    }).fillna(0)
+    summary["total_tokens"] = summary["prompt_tokens"] + summary["completion_tokens"]
+    return summary.sort_values("total_tokens", ascending=False)
+
+
+def estimate_run(prompts: List[str], system_message: str, template: str, max_concurrency: int = 8,
+                 history_path: Optional[str] = None, requests_per_second: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Predicts the tokens and wall time of sending `prompts` before the run.
+
+    Prompt tokens are counted exactly (with tiktoken, if installed). Completion
+    tokens and latency per request are taken from the template's calls in a
+    previous metrics file if given, otherwise from DEFAULT_COMPLETION_TOKENS and
+    DEFAULT_LATENCY. The wall time assumes `max_concurrency` requests in flight,
+    capped by `requests_per_second` if the endpoint's rate limit is known.
+
+    Args:
+        prompts: The rendered prompts of the run.
+        system_message: The system message sent with every prompt.
+        template: Template name as returned by template_name.
+        max_concurrency: Upper bound on simultaneous requests.
+        history_path: Optional metrics file of an earlier run.
+        requests_per_second: Optional rate limit of the endpoint.
+
+    Returns:
+        Dictionary with the number of requests, the predicted prompt, completion and total tokens, and the wall time in seconds.
+    """
+    completion_tokens, latency = DEFAULT_COMPLETION_TOKENS.get(template, 300), DEFAULT_LATENCY
+    if history_path is not None:
+        calls = load_call_metrics(history_path)
+        calls = calls[(calls["template"] == template) & (calls["status"] == "ok")]
+        if len(calls) > 0:
+            completion_tokens, latency = float(calls["completion_tokens"].mean()), float(calls["latency"].mean())
+
+    system_tokens = count_tokens(system_message)
+    prompt_tokens = sum(count_tokens(prompt_string) + system_tokens for prompt_string in prompts)
+    wall_time = len(prompts) * latency / max_concurrency
+    if requests_per_second is not None:
+        wall_time = max(wall_time, len(prompts) / requests_per_second)
+    return {
+        "template": template,
+        "requests": len(prompts),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": round(len(prompts) * completion_tokens),
+        "total_tokens": round(prompt_tokens + len(prompts) * completion_tokens),
+        "wall_time_s": round(wall_time, 1)
+    }
@@ -0,0 +1,37 @@
+from instance.config import api_key
+from llm_systematic_review.helpers import get_openai_client, close_openai_clients
+from openai import OpenAI
+import statistics
+import time
+
+# Measures the per-call overhead of creating a new OpenAI client for every request
+# (old behaviour of get_llm_screening_decision) against reusing the pooled client.
+# models.list() is used as the probe because it is cheap and does not consume tokens,
+# so the difference between the two timings is mostly connection setup (TCP + TLS handshake).
+
+base_url = "https://chat-ai.academiccloud.de/v1"
+n_calls = 20
+
+
+def time_calls(get_client) -> list:
+    durations = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        get_client().models.list()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+# Before: a fresh client (and connection) per call
+fresh_durations = time_calls(lambda: OpenAI(api_key=api_key, base_url=base_url))
+
+# After: one shared client with keep-alive connections (first call opens the connection)
+close_openai_clients()
+pooled_durations = time_calls(lambda: get_openai_client(api_key, base_url))
+
+for label, durations in [("fresh client per call", fresh_durations), ("shared pooled client", pooled_durations)]:
+    print(f"{label}: median {statistics.median(durations) * 1000:.1f} ms, "
+          f"mean {statistics.mean(durations) * 1000:.1f} ms over {n_calls} calls")
+
+overhead = statistics.median(fresh_durations) - statistics.median(pooled_durations)
+print(f"Per-call overhead removed by connection reuse: {overhead * 1000:.1f} ms")
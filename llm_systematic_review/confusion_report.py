@@ -0,0 +1,120 @@
+import base64
+import contextlib
+import io
+import math
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from PIL import Image
+
+from llm_systematic_review.agreement_metrics import confusion_matrices
+
+PANEL_SIZE = (3.2, 3.0)
+
+
+class ConfusionMatrixReport:
+    """
+    Renders the confusion matrices of all criteria of a run into one multi-panel figure.
+
+    The figure is drawn on an Agg canvas without going through pyplot, so it
+    works headless and never opens a window. One figure is kept and cleared
+    between runs, which avoids setting up a new figure per criterion and run.
+    """
+
+    def __init__(self, columns: int = 3, dpi: int = 100):
+        """
+        Args:
+            columns: Panels per row.
+            dpi: Resolution of the PNG files.
+        """
+        self.columns = columns
+        self.figure = Figure(dpi=dpi)
+        FigureCanvasAgg(self.figure)
+
+    def render(self, report: pd.DataFrame, title: str = "") -> Figure:
+        """
+        Draws one panel per criterion of an agreement_metrics report, with its kappa, sensitivity and specificity.
+        """
+        matrices = confusion_matrices(report)
+        columns = min(self.columns, len(matrices))
+        rows = math.ceil(len(matrices) / columns)
+        self.figure.clf()
+        self.figure.set_size_inches(PANEL_SIZE[0] * columns, PANEL_SIZE[1] * rows + 0.4)
+        axes = self.figure.subplots(rows, columns, squeeze=False).ravel()
+        for ax, (criterion, matrix) in zip(axes, matrices.items()):
+            ax.imshow(matrix, cmap="Blues")
+            for (row, column), count in np.ndenumerate(matrix):
+                # White on the darker half of the colour map
+                color = "white" if count > matrix.max() / 2 else "black"
+                ax.text(column, row, str(count), ha="center", va="center", color=color)
+            ax.set_xticks([0, 1], ["Exclude", "Include"])
+            ax.set_yticks([0, 1], ["Exclude", "Include"])
+            ax.set_xlabel("LLM")
+            ax.set_ylabel("Human")
+            metrics = report.loc[criterion]
+            ax.set_title(f"{criterion}\nkappa {metrics['kappa']:.2f}, sens {metrics['sensitivity']:.2f}, spec {metrics['specificity']:.2f}",
+                         fontsize=9)
+        for ax in axes[len(matrices):]:
+            ax.set_axis_off()
+        self.figure.suptitle(title)
+        # Fixed margins in inches; tight_layout would draw the whole figure once more just to measure it
+        width, height = self.figure.get_size_inches()
+        self.figure.subplots_adjust(left=0.9 / width, right=1 - 0.2 / width, bottom=0.55 / height, top=1 - 0.9 / height,
+                                    wspace=0.9, hspace=0.7)
+        return self.figure
+
+    def save(self, report: pd.DataFrame, path: str, title: str = "") -> None:
+        """
+        Renders a report and writes it to `path`; the format follows the extension (png, pdf, svg).
+        """
+        self.render(report, title).savefig(path)
+
+    def png_bytes(self) -> bytes:
+        """
+        Encodes the figure drawn last as PNG, from the Agg pixel buffer.
+        """
+        self.figure.canvas.draw()
+        buffer = io.BytesIO()
+        Image.fromarray(np.asarray(self.figure.canvas.buffer_rgba())).save(buffer, format="png")
+        return buffer.getvalue()
+
+
+def render_reports(reports: Dict[str, pd.DataFrame], output_dir: Optional[str] = None, pdf_path: Optional[str] = None,
+                   html_path: Optional[str] = None, columns: int = 3) -> None:
+    """
+    Renders the confusion matrix figure of every run in one go.
+
+    Args:
+        reports: Dictionary mapping a run name to its agreement_metrics report.
+        output_dir: Optional directory for one '<run name>.png' per run.
+        pdf_path: Optional PDF file with one page per run.
+        html_path: Optional self-contained HTML file with every run's figure and metrics table.
+        columns: Panels per row.
+    """
+    renderer = ConfusionMatrixReport(columns)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    sections = []
+    with contextlib.ExitStack() as stack:
+        pdf = stack.enter_context(PdfPages(pdf_path)) if pdf_path is not None else None
+        # Each run is laid out once; the PNG file and the HTML page share one raster drawing
+        for name, report in reports.items():
+            figure = renderer.render(report, name)
+            png = renderer.png_bytes() if output_dir is not None or html_path is not None else None
+            if output_dir is not None:
+                with open(os.path.join(output_dir, f"{name}.png"), 'wb') as f:
+                    f.write(png)
+            if pdf is not None:
+                pdf.savefig(figure)
+            if html_path is not None:
+                image = base64.b64encode(png).decode("ascii")
+                sections.append(f"<h2>{name}</h2>\n<img src=\"data:image/png;base64,{image}\">\n{report.round(3).to_html()}")
+    if html_path is not None:
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write("<html><head><meta charset=\"utf-8\"><title>Confusion matrices</title></head><body>\n"
+                    + "\n".join(sections) + "\n</body></html>\n")
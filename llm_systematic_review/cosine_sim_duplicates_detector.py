@@ -3,22 +3,58 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import re
-from typing import List, Tuple
+import scipy.sparse as sp
+from typing import List, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# Mersenne prime for the MinHash permutations (a * x + b) mod p
+MINHASH_PRIME = (1 << 31) - 1
+# Settings of the TF-IDF vectorizer, shared with DuplicateIndex
+TFIDF_PARAMS = {
+    "max_features": 5000,
+    "ngram_range": (1, 2),  # Use unigrams and bigrams
+    "min_df": 2,  # Ignore terms that appear in less than 2 documents
+    "max_df": 0.95  # Ignore terms that appear in more than 95% of documents
+}
+
 class ArticleDuplicateDetector:
-    def __init__(self, similarity_threshold: float = 0.8):
+    def __init__(self, similarity_threshold: float = 0.8, mode: str = "dense", top_k: Optional[int] = None, block_size: int = 1000,
+                 num_perm: int = 128, bands: int = 32, random_state: int = 0):
         """
         Initialize the duplicate detector.
         
         Args:
             similarity_threshold: Threshold above which articles are considered duplicates
+            mode: 'dense' computes the full n x n similarity matrix; 'sparse' only keeps the
+                neighbours above the threshold, computed in blocks, so memory grows
+                linearly with the number of articles; 'minhash' only compares the
+                candidate pairs found by locality-sensitive hashing of MinHash signatures
+            top_k: In sparse and minhash mode, the number of most similar neighbours kept per
+                article (None keeps all above the threshold)
+            block_size: In sparse mode, the number of articles per block; in minhash mode,
+                the number of articles hashed at once
+            num_perm: In minhash mode, the number of hash permutations per signature
+            bands: In minhash mode, the number of LSH bands num_perm is split into; more
+                bands find pairs of lower word overlap, at the cost of more candidates
+            random_state: In minhash mode, the seed of the hash permutations
         """
+        if mode not in ("dense", "sparse", "minhash"):
+            raise ValueError(f"Unknown mode '{mode}', use 'dense', 'sparse' or 'minhash'")
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
         self.similarity_threshold = similarity_threshold
+        self.mode = mode
+        self.top_k = top_k
+        self.block_size = block_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.random_state = random_state
+        self.signatures = None
+        self.candidate_pairs = None
         self.vectorizer = None
         self.tfidf_matrix = None
         self.processed_data = None
@@ -83,6 +119,10 @@ class ArticleDuplicateDetector:
         """
         Calculate cosine similarities between all articles.
         
+        In sparse mode only the similarities above the threshold (and, with top_k,
+        the top_k per article) are kept, as a sparse matrix with the pairs in its
+        upper triangle.
+        
         Args:
             df: Processed DataFrame
             
@@ -90,21 +130,170 @@ class ArticleDuplicateDetector:
             Cosine similarity matrix
         """
         # Initialize TF-IDF vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 2),  # Use unigrams and bigrams
-            min_df=2,  # Ignore terms that appear in less than 2 documents
-            max_df=0.95  # Ignore terms that appear in more than 95% of documents
-        )
+        self.vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
         
         # Fit and transform the text data
         self.tfidf_matrix = self.vectorizer.fit_transform(df['processed_text'])
         
+        if self.mode == "sparse":
+            return self.sparse_neighbours(self.tfidf_matrix)
+        if self.mode == "minhash":
+            return self.minhash_neighbours(df, self.tfidf_matrix)
+        
         # Calculate cosine similarities
         similarity_matrix = cosine_similarity(self.tfidf_matrix)
         
         return similarity_matrix
     
+    def sparse_neighbours(self, tfidf_matrix: sp.csr_matrix) -> sp.csr_matrix:
+        """
+        Find the neighbours above the threshold block by block.
+        
+        TF-IDF rows are L2-normalized, so the product of a block of rows with a
+        block of transposed rows holds their cosine similarities. Abstracts share
+        enough terms for these products to be nearly dense, so each block of
+        columns is made dense once and multiplied with the sparse row blocks above
+        it; only one block x block tile of similarities exists at a time, and only
+        the pairs above the threshold are kept.
+        
+        Args:
+            tfidf_matrix: L2-normalized TF-IDF matrix
+            
+        Returns:
+            Sparse n x n matrix with the similarity of every kept pair (i, j), i < j
+        """
+        n = tfidf_matrix.shape[0]
+        tfidf_matrix = tfidf_matrix.tocsr()
+        rows, columns, scores = [], [], []
+        for column_start in range(0, n, self.block_size):
+            column_block = tfidf_matrix[column_start:column_start + self.block_size].T.toarray()
+            for row_start in range(0, column_start + 1, self.block_size):
+                tile = tfidf_matrix[row_start:row_start + self.block_size] @ column_block
+                above = tile >= self.similarity_threshold
+                if row_start == column_start:
+                    # Diagonal tile: upper triangle only
+                    above = np.triu(above, k=1)
+                tile_rows, tile_columns = np.nonzero(above)
+                rows.append(tile_rows + row_start)
+                columns.append(tile_columns + column_start)
+                scores.append(tile[tile_rows, tile_columns])
+        return self._pair_matrix(np.concatenate(rows), np.concatenate(columns), np.concatenate(scores), n)
+    
+    def _pair_matrix(self, rows: np.ndarray, columns: np.ndarray, scores: np.ndarray, n: int) -> sp.csr_matrix:
+        # Sparse matrix of the pairs above the threshold (i < j), reduced to top_k neighbours if set
+        if self.top_k is not None:
+            # Rank every pair among the neighbours of each of its two articles; keep it if it is
+            # within the top_k of either
+            articles = np.concatenate([rows, columns])
+            pair_indices = np.tile(np.arange(len(rows)), 2)
+            order = np.lexsort((-np.tile(scores, 2), articles))
+            articles, pair_indices = articles[order], pair_indices[order]
+            ranks = np.arange(len(articles)) - np.searchsorted(articles, articles, side='left')
+            keep = np.zeros(len(rows), dtype=bool)
+            keep[pair_indices[ranks < self.top_k]] = True
+            rows, columns, scores = rows[keep], columns[keep], scores[keep]
+        
+        return sp.csr_matrix((scores, (rows, columns)), shape=(n, n))
+    
+    def minhash_signatures(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Compute a MinHash signature of the set of words of every processed text.
+        
+        Args:
+            df: Processed DataFrame
+            
+        Returns:
+            (articles x num_perm) array of signatures
+        """
+        words = CountVectorizer(binary=True, token_pattern=r"\S+", lowercase=False).fit_transform(df['processed_text'])
+        return self.word_set_signatures(words)
+    
+    def word_set_signatures(self, words: sp.csr_matrix) -> np.ndarray:
+        """
+        Compute the MinHash signatures of the rows of a binary (articles x word ids) matrix.
+        
+        Each of the num_perm hash functions (a * word_id + b) mod p is applied to
+        all words of a block of articles at once, and the minimum per article is
+        taken with np.minimum.reduceat over the CSR row boundaries. Signatures are
+        only comparable between matrices that number the words the same way.
+        
+        Args:
+            words: Binary word matrix, e.g. from CountVectorizer(binary=True)
+            
+        Returns:
+            (articles x num_perm) array of signatures
+        """
+        words = sp.csr_matrix(words)
+        rng = np.random.default_rng(self.random_state)
+        a = rng.integers(1, MINHASH_PRIME, self.num_perm, dtype=np.int64)
+        b = rng.integers(0, MINHASH_PRIME, self.num_perm, dtype=np.int64)
+        
+        signatures = np.full((words.shape[0], self.num_perm), MINHASH_PRIME, dtype=np.int64)
+        for start in range(0, words.shape[0], self.block_size):
+            block = words[start:start + self.block_size]
+            non_empty = np.flatnonzero(np.diff(block.indptr))
+            if len(non_empty) == 0:
+                continue
+            hashes = (block.indices.astype(np.int64)[:, None] * a + b) % MINHASH_PRIME
+            signatures[start + non_empty] = np.minimum.reduceat(hashes, block.indptr[non_empty], axis=0)
+        return signatures
+    
+    def minhash_candidates(self, signatures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the candidate pairs whose signatures agree on all rows of at least one band.
+        
+        Two articles whose word sets have Jaccard similarity s become candidates
+        with probability 1 - (1 - s^r)^bands, r = num_perm / bands rows per band.
+        
+        Args:
+            signatures: Output of minhash_signatures
+            
+        Returns:
+            Tuple of (rows, columns) of the unique candidate pairs, row < column
+        """
+        n = signatures.shape[0]
+        rows_per_band = self.num_perm // self.bands
+        pair_keys = []
+        for band in range(self.bands):
+            band_values = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+            _, buckets = np.unique(band_values.view(np.dtype((np.void, band_values.dtype.itemsize * rows_per_band))).ravel(),
+                                   return_inverse=True)
+            order = np.argsort(buckets, kind='stable')
+            bucket_starts = np.flatnonzero(np.diff(buckets[order], prepend=-1))
+            bucket_sizes = np.diff(np.append(bucket_starts, n))
+            for start, size in zip(bucket_starts[bucket_sizes > 1], bucket_sizes[bucket_sizes > 1]):
+                members = order[start:start + size]
+                first, second = np.triu_indices(size, k=1)
+                pair_keys.append(members[first].astype(np.int64) * n + members[second])
+        if not pair_keys:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        keys = np.unique(np.concatenate(pair_keys))
+        return keys // n, keys % n
+    
+    def minhash_neighbours(self, df: pd.DataFrame, tfidf_matrix: sp.csr_matrix) -> sp.csr_matrix:
+        """
+        Find the neighbours above the threshold among the MinHash/LSH candidate pairs.
+        
+        The exact TF-IDF cosine similarity of every candidate pair is computed,
+        so the kept pairs and scores are those sparse mode would report; pairs
+        LSH does not propose are missed.
+        
+        Args:
+            df: Processed DataFrame
+            tfidf_matrix: L2-normalized TF-IDF matrix
+            
+        Returns:
+            Sparse n x n matrix with the similarity of every kept pair (i, j), i < j
+        """
+        n = tfidf_matrix.shape[0]
+        self.signatures = self.minhash_signatures(df)
+        rows, columns = self.minhash_candidates(self.signatures)
+        self.candidate_pairs = len(rows)
+        tfidf_matrix = tfidf_matrix.tocsr()
+        scores = np.asarray(tfidf_matrix[rows].multiply(tfidf_matrix[columns]).sum(axis=1)).ravel()
+        above = scores >= self.similarity_threshold
+        return self._pair_matrix(rows[above], columns[above], scores[above], n)
+    
     def find_duplicates(self, similarity_matrix: np.ndarray) -> List[Tuple]:
         """
         Find potential duplicate pairs based on similarity threshold.
@@ -115,16 +304,17 @@ class ArticleDuplicateDetector:
         Returns:
             List of tuples containing duplicate pairs and their similarity scores
         """
-        duplicates = []
-        n = similarity_matrix.shape[0]
-        
-        # Check upper triangle of similarity matrix (avoid duplicates)
-        for i in range(n):
-            for j in range(i + 1, n):
-                if similarity_matrix[i, j] >= self.similarity_threshold:
-                    duplicates.append((i, j, similarity_matrix[i, j]))
+        if sp.issparse(similarity_matrix):
+            # Sparse neighbours hold only pairs above the threshold, in the upper triangle
+            pairs = similarity_matrix.tocoo()
+            rows, columns, scores = pairs.row, pairs.col, pairs.data
+        else:
+            # Check upper triangle of similarity matrix (avoid duplicates)
+            rows, columns = np.nonzero(np.triu(similarity_matrix >= self.similarity_threshold, k=1))
+            scores = similarity_matrix[rows, columns]
         
-        return duplicates
+        order = np.lexsort((columns, rows))
+        return list(zip(rows[order].tolist(), columns[order].tolist(), scores[order].tolist()))
     
     def generate_duplicate_report(self, duplicates: List[Tuple]) -> pd.DataFrame:
         """
@@ -139,20 +329,17 @@ class ArticleDuplicateDetector:
         if not duplicates:
             return pd.DataFrame(columns=['Covidence_1', 'Title_1', 'Covidence_2', 'Title_2', 'Similarity_Score'])
         
-        report_data = []
-        for i, j, score in duplicates:
-            row1 = self.processed_data.iloc[i]
-            row2 = self.processed_data.iloc[j]
-            
-            report_data.append({
-                'Covidence_1': row1['Covidence #'],
-                'Title_1': row1['Title'],
-                'Covidence_2': row2['Covidence #'],
-                'Title_2': row2['Title'],
-                'Similarity_Score': round(score, 4)
-            })
-        
-        return pd.DataFrame(report_data)
+        first, second, scores = (np.array(values) for values in zip(*duplicates))
+        covidence_numbers = self.processed_data['Covidence #'].to_numpy()
+        titles = self.processed_data['Title'].to_numpy()
+        
+        return pd.DataFrame({
+            'Covidence_1': covidence_numbers[first],
+            'Title_1': titles[first],
+            'Covidence_2': covidence_numbers[second],
+            'Title_2': titles[second],
+            'Similarity_Score': np.round(scores, 4)
+        })
     
     def detect_duplicates(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
         """
@@ -162,7 +349,8 @@ class ArticleDuplicateDetector:
             df: Input DataFrame with 'Covidence #', 'Title', and 'Abstract' columns
             
         Returns:
-            Tuple of (duplicate_report_df, similarity_matrix)
+            Tuple of (duplicate_report_df, similarity_matrix); in sparse mode the
+            similarity matrix only holds the kept pairs, see sparse_neighbours
         """
         print("Preprocessing data...")
         processed_df = self.prepare_data(df)
@@ -181,15 +369,17 @@ class ArticleDuplicateDetector:
         return duplicate_report, similarity_matrix
 
 
-# Load your dataset
-df = pd.read_csv('review_581959_screen_csv_20250718174203.csv')
-df = df[['Title', 'Abstract', 'Covidence #']]
- 
-# Initialize detector with similarity threshold
-detector = ArticleDuplicateDetector(similarity_threshold=0.7)
-    
-# Detect duplicates
-duplicate_report, similarity_matrix = detector.detect_duplicates(df)
-    
-# Save results
-duplicate_report.to_csv('duplicate_report.csv', index=False)
+if __name__ == "__main__":
+    # Imported by the comparison scripts, so the example run only happens when executed directly
+    # Load your dataset
+    df = pd.read_csv('review_581959_screen_csv_20250718174203.csv')
+    df = df[['Title', 'Abstract', 'Covidence #']]
+
+    # Initialize detector with similarity threshold; sparse mode keeps memory linear for large exports
+    detector = ArticleDuplicateDetector(similarity_threshold=0.7, mode="sparse")
+
+    # Detect duplicates
+    duplicate_report, similarity_matrix = detector.detect_duplicates(df)
+
+    # Save results
+    duplicate_report.to_csv('duplicate_report.csv', index=False)
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from llm_systematic_review.cosine_sim_duplicates_detector import TFIDF_PARAMS, ArticleDuplicateDetector
+
+DEFAULT_INDEX_PATH = "data/duplicate_index.npz"
+REPORT_COLUMNS = ['Covidence_1', 'Title_1', 'Covidence_2', 'Title_2', 'Similarity_Score', 'In_Index']
+# Detector settings stored with the index; a loaded index compares new records the same way
+DETECTOR_SETTINGS = ["similarity_threshold", "mode", "block_size", "num_perm", "bands", "random_state"]
+
+
+def text_fingerprint(processed_text: str) -> str:
+    """
+    Hash of a record's processed text, telling a re-sent record from a different one under the same ID.
+    """
+    return hashlib.sha1(processed_text.encode('utf-8')).hexdigest()[:16]
+
+
+def _word_matrix(texts: pd.Series, word_ids: Dict[str, int]) -> sp.csr_matrix:
+    # Binary word matrix numbered by word_ids, as ArticleDuplicateDetector.minhash_signatures builds it
+    return CountVectorizer(binary=True, token_pattern=r"\S+", lowercase=False, vocabulary=word_ids).transform(texts).tocsr()
+
+
+class DuplicateIndex:
+    """
+    Persistent duplicate index of an already-screened corpus.
+
+    The index keeps the TF-IDF vectorizer fitted on the corpus, the corpus'
+    TF-IDF rows and, in minhash mode, their MinHash signatures with the LSH
+    band keys sorted per band. New records are transformed with the stored
+    vectorizer (it is never refitted, so terms it has not seen are ignored)
+    and compared with the indexed records and with each other: in dense and
+    sparse mode by multiplying them with blocks of the indexed rows, in
+    minhash mode only with the indexed records sharing a band key, found by
+    binary search. Either way the work grows with the number of new records
+    instead of rebuilding all pairs of the corpus.
+
+    The TF-IDF weights stay those of the corpus the index was built on; once
+    a large share of the records has been added later, build a new index.
+    """
+
+    def __init__(self, detector: Optional[ArticleDuplicateDetector] = None):
+        """
+        Args:
+            detector: Detector whose preprocessing, threshold and mode the index uses
+                (defaults to threshold 0.7 in sparse mode); top_k is not applied,
+                every pair above the threshold is reported.
+        """
+        self.detector = detector if detector is not None else ArticleDuplicateDetector(similarity_threshold=0.7, mode="sparse")
+        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.tfidf_matrix: Optional[sp.csr_matrix] = None
+        self.covidence_numbers: List[str] = []
+        self.titles: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.fingerprints: List[str] = []
+        self.word_ids: Dict[str, int] = {}
+        self.signatures: Optional[np.ndarray] = None
+        self.candidate_pairs = 0
+        self._band_multipliers: Optional[np.ndarray] = None
+        self._sorted_keys: Optional[np.ndarray] = None
+        self._key_positions: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.covidence_numbers)
+
+    @property
+    def uses_minhash(self) -> bool:
+        return self.detector.mode == "minhash"
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, detector: Optional[ArticleDuplicateDetector] = None) -> "DuplicateIndex":
+        """
+        Fits the vectorizer on a corpus and indexes its records.
+
+        Args:
+            df: DataFrame with 'Covidence #', 'Title', and 'Abstract' columns
+            detector: See __init__
+
+        Returns:
+            The index; the pairs within the corpus itself are found with detector.detect_duplicates
+        """
+        index = cls(detector)
+        processed_df = index.detector.prepare_data(df)
+        processed_df = processed_df[~processed_df['Covidence #'].astype(str).duplicated()]
+        processed_df = processed_df.assign(fingerprint=processed_df['processed_text'].map(text_fingerprint))
+        index.vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+        tfidf_matrix = index.vectorizer.fit_transform(processed_df['processed_text']).tocsr()
+        index.tfidf_matrix = tfidf_matrix[:0]
+        if index.uses_minhash:
+            index._init_minhash()
+            index.word_ids = CountVectorizer(token_pattern=r"\S+", lowercase=False).fit(processed_df['processed_text']).vocabulary_
+            signatures = index.detector.word_set_signatures(_word_matrix(processed_df['processed_text'], index.word_ids))
+        else:
+            signatures = None
+        index._append(processed_df, tfidf_matrix, signatures)
+        return index
+
+    def _init_minhash(self) -> None:
+        # Empty signature store and band keys; the odd multipliers combine the rows of a band into one key
+        rows_per_band = self.detector.num_perm // self.detector.bands
+        self._band_multipliers = np.random.default_rng(self.detector.random_state).integers(
+            1, np.iinfo(np.int64).max, rows_per_band, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        self.signatures = np.empty((0, self.detector.num_perm), dtype=np.int64)
+        self._sorted_keys = np.empty((0, self.detector.bands), dtype=np.uint64)
+        self._key_positions = np.empty((0, self.detector.bands), dtype=np.int64)
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        # One 64-bit key per band; colliding keys only add candidates, which are verified exactly
+        rows_per_band = self.detector.num_perm // self.detector.bands
+        bands = signatures.astype(np.uint64).reshape(len(signatures), self.detector.bands, rows_per_band)
+        return (bands * self._band_multipliers).sum(axis=2, dtype=np.uint64)
+
+    def _append(self, processed_df: pd.DataFrame, tfidf_matrix: sp.csr_matrix, signatures: Optional[np.ndarray]) -> None:
+        start = len(self)
+        covidence_numbers = processed_df['Covidence #'].astype(str).tolist()
+        self.covidence_numbers.extend(covidence_numbers)
+        self.titles.extend(processed_df['Title'].astype(str).tolist())
+        self.positions.update((number, start + offset) for offset, number in enumerate(covidence_numbers))
+        self.fingerprints.extend(processed_df['fingerprint'].tolist())
+        self.tfidf_matrix = sp.vstack([self.tfidf_matrix, tfidf_matrix], format='csr')
+        if signatures is not None:
+            self.signatures = np.concatenate([self.signatures, signatures])
+            # The kept keys are sorted, so the stable sort (timsort) of the appended ones is close to a merge
+            keys = np.concatenate([self._sorted_keys, self._band_keys(signatures)])
+            key_positions = np.concatenate([self._key_positions,
+                                            np.repeat(np.arange(start, len(self))[:, None], self.detector.bands, axis=1)])
+            order = np.argsort(keys, axis=0, kind='stable')
+            self._sorted_keys = np.take_along_axis(keys, order, axis=0)
+            self._key_positions = np.take_along_axis(key_positions, order, axis=0)
+
+    def _prepare_new(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, sp.csr_matrix, Optional[np.ndarray]]:
+        # Preprocesses the records that are not indexed yet (by Covidence #) and computes their rows
+        processed_df = self.detector.prepare_data(df)
+        processed_df = processed_df.assign(fingerprint=processed_df['processed_text'].map(text_fingerprint))
+        covidence_numbers = processed_df['Covidence #'].astype(str)
+        indexed = covidence_numbers.isin(self.positions)
+        changed = [number for number, fingerprint in zip(covidence_numbers[indexed], processed_df['fingerprint'][indexed])
+                   if self.fingerprints[self.positions[number]] != fingerprint]
+        if changed:
+            # The same ID with another text is a different record, e.g. positions reused by a later export
+            print(f"Warning: {len(changed)} records reuse the ID of an indexed record with a different text and are skipped, "
+                  f"e.g. {changed[:5]}; give the records IDs that follow their content")
+        processed_df = processed_df[~indexed & ~covidence_numbers.duplicated()]
+        if len(processed_df) == 0:
+            return processed_df, self.tfidf_matrix[:0], self.signatures[:0] if self.uses_minhash else None
+        tfidf_matrix = self.vectorizer.transform(processed_df['processed_text']).tocsr()
+        if not self.uses_minhash:
+            return processed_df, tfidf_matrix, None
+        for text in processed_df['processed_text']:
+            for word in text.split():
+                self.word_ids.setdefault(word, len(self.word_ids))
+        signatures = self.detector.word_set_signatures(_word_matrix(processed_df['processed_text'], self.word_ids))
+        return processed_df, tfidf_matrix, signatures
+
+    def _exact_pairs(self, tfidf_matrix: sp.csr_matrix, reference_matrix: sp.csr_matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Pairs (row of tfidf_matrix, row of reference_matrix) above the threshold, one dense block of reference rows at a time
+        rows, columns, scores = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)], [np.empty(0)]
+        for start in range(0, reference_matrix.shape[0], self.detector.block_size):
+            tile = tfidf_matrix @ reference_matrix[start:start + self.detector.block_size].T.toarray()
+            tile_rows, tile_columns = np.nonzero(tile >= self.detector.similarity_threshold)
+            rows.append(tile_rows)
+            columns.append(tile_columns + start)
+            scores.append(tile[tile_rows, tile_columns])
+        return np.concatenate(rows), np.concatenate(columns), np.concatenate(scores)
+
+    def _indexed_pairs(self, tfidf_matrix: sp.csr_matrix, signatures: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Pairs (new record, indexed record) above the threshold
+        if signatures is None:
+            return self._exact_pairs(tfidf_matrix, self.tfidf_matrix)
+
+        keys = self._band_keys(signatures)
+        pair_keys = [np.empty(0, dtype=np.int64)]
+        for band in range(self.detector.bands):
+            low = np.searchsorted(self._sorted_keys[:, band], keys[:, band], side='left')
+            counts = np.searchsorted(self._sorted_keys[:, band], keys[:, band], side='right') - low
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            matches = self._key_positions[np.repeat(low, counts) + offsets, band]
+            pair_keys.append(np.repeat(np.arange(len(keys)), counts) * len(self) + matches)
+        pair_keys = np.unique(np.concatenate(pair_keys))
+        rows, columns = pair_keys // max(len(self), 1), pair_keys % max(len(self), 1)
+        self.candidate_pairs += len(rows)
+        scores = np.asarray(tfidf_matrix[rows].multiply(self.tfidf_matrix[columns]).sum(axis=1)).ravel()
+        above = scores >= self.detector.similarity_threshold
+        return rows[above], columns[above], scores[above]
+
+    def _new_pairs(self, tfidf_matrix: sp.csr_matrix, signatures: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Pairs (i, j), i < j, among the new records above the threshold
+        if signatures is None:
+            rows, columns, scores = self._exact_pairs(tfidf_matrix, tfidf_matrix)
+            upper = rows < columns
+            return rows[upper], columns[upper], scores[upper]
+        rows, columns = self.detector.minhash_candidates(signatures)
+        self.candidate_pairs += len(rows)
+        scores = np.asarray(tfidf_matrix[rows].multiply(tfidf_matrix[columns]).sum(axis=1)).ravel()
+        above = scores >= self.detector.similarity_threshold
+        return rows[above], columns[above], scores[above]
+
+    def _report(self, processed_df: pd.DataFrame, tfidf_matrix: sp.csr_matrix, signatures: Optional[np.ndarray]) -> pd.DataFrame:
+        self.candidate_pairs = 0
+        if len(processed_df) == 0:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        covidence_numbers = processed_df['Covidence #'].astype(str).to_numpy()
+        titles = processed_df['Title'].astype(str).to_numpy()
+        indexed_rows, indexed_columns, indexed_scores = self._indexed_pairs(tfidf_matrix, signatures)
+        new_rows, new_columns, new_scores = self._new_pairs(tfidf_matrix, signatures)
+
+        report = pd.DataFrame({
+            'Covidence_1': np.concatenate([covidence_numbers[indexed_rows], covidence_numbers[new_rows]]),
+            'Title_1': np.concatenate([titles[indexed_rows], titles[new_rows]]),
+            'Covidence_2': np.concatenate([np.asarray(self.covidence_numbers, dtype=object)[indexed_columns],
+                                           covidence_numbers[new_columns]]),
+            'Title_2': np.concatenate([np.asarray(self.titles, dtype=object)[indexed_columns], titles[new_columns]]),
+            'Similarity_Score': np.round(np.concatenate([indexed_scores, new_scores]), 4),
+            'In_Index': np.repeat([True, False], [len(indexed_rows), len(new_rows)]),
+            # Sort keys: new record, then indexed matches before those within the new records
+            '_row': np.concatenate([indexed_rows, new_rows]),
+            '_column': np.concatenate([indexed_columns, new_columns + len(self)])
+        })
+        return report.sort_values(['_row', '_column']).drop(columns=['_row', '_column']).reset_index(drop=True)
+
+    def query(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Finds the duplicates of new records without adding them to the index.
+
+        Args:
+            df: DataFrame with 'Covidence #', 'Title', and 'Abstract' columns; records
+                whose Covidence # is already indexed are skipped (with a warning if
+                their text differs from the indexed one's)
+
+        Returns:
+            DataFrame with one row per pair of a new record ('Covidence_1') and an indexed
+            or another new record ('Covidence_2'), the 'Similarity_Score' and 'In_Index'
+            (whether 'Covidence_2' is indexed)
+        """
+        return self._report(*self._prepare_new(df))
+
+    def add(self, df: pd.DataFrame) -> int:
+        """
+        Adds new records to the index.
+
+        Returns:
+            The number of records added (already indexed and empty records are skipped)
+        """
+        processed_df, tfidf_matrix, signatures = self._prepare_new(df)
+        self._append(processed_df, tfidf_matrix, signatures)
+        return len(processed_df)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Finds the duplicates of new records (see query) and adds the records to the index.
+        """
+        processed_df, tfidf_matrix, signatures = self._prepare_new(df)
+        report = self._report(processed_df, tfidf_matrix, signatures)
+        self._append(processed_df, tfidf_matrix, signatures)
+        return report
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> None:
+        """
+        Writes the index to one compressed .npz file (no pickled objects).
+        """
+        settings = {name: getattr(self.detector, name) for name in DETECTOR_SETTINGS}
+        arrays = {
+            "settings": np.array(json.dumps(settings)),
+            "covidence_numbers": np.array(self.covidence_numbers, dtype=str),
+            "titles": np.array(self.titles, dtype=str),
+            "fingerprints": np.array(self.fingerprints, dtype=str),
+            "terms": self.vectorizer.get_feature_names_out().astype(str),
+            "idf": self.vectorizer.idf_,
+            "tfidf_data": self.tfidf_matrix.data,
+            "tfidf_indices": self.tfidf_matrix.indices,
+            "tfidf_indptr": self.tfidf_matrix.indptr
+        }
+        if self.uses_minhash:
+            arrays["words"] = np.array(sorted(self.word_ids, key=self.word_ids.get), dtype=str)
+            # Signatures are below MINHASH_PRIME = 2^31 - 1, so they fit in int32
+            arrays["signatures"] = self.signatures.astype(np.int32)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "DuplicateIndex":
+        """
+        Reads an index written by save, with the detector settings it was built with.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            index = cls(ArticleDuplicateDetector(**json.loads(str(arrays["settings"]))))
+            terms = arrays["terms"].tolist()
+            index.vectorizer = TfidfVectorizer(**TFIDF_PARAMS, vocabulary={term: position for position, term in enumerate(terms)})
+            index.vectorizer.idf_ = arrays["idf"]
+            covidence_numbers = arrays["covidence_numbers"].tolist()
+            processed_df = pd.DataFrame({'Covidence #': covidence_numbers, 'Title': arrays["titles"].tolist(),
+                                         'fingerprint': arrays["fingerprints"].tolist()})
+            tfidf_matrix = sp.csr_matrix((arrays["tfidf_data"], arrays["tfidf_indices"], arrays["tfidf_indptr"]),
+                                         shape=(len(covidence_numbers), len(terms)))
+            index.tfidf_matrix = tfidf_matrix[:0]
+            signatures = None
+            if index.uses_minhash:
+                index.word_ids = {word: position for position, word in enumerate(arrays["words"].tolist())}
+                index._init_minhash()
+                signatures = arrays["signatures"].astype(np.int64)
+        index._append(processed_df, tfidf_matrix, signatures)
+        return index
@@ -0,0 +1,75 @@
+from llm_systematic_review.cosine_sim_duplicates_detector import ArticleDuplicateDetector
+from llm_systematic_review.duplicate_index import DuplicateIndex
+from llm_systematic_review.ris_reader import read_ris_files
+import contextlib
+import io
+import os
+import pandas as pd
+import tempfile
+import time
+
+# Checks new records against an already-indexed corpus with DuplicateIndex and compares it with
+# rebuilding all pairs with ArticleDuplicateDetector.detect_duplicates. The merged RIS exports
+# are shuffled and split into the known corpus and the new records. The reference are the pairs
+# of the full rebuild that involve a new record; the index keeps the TF-IDF weights of the known
+# corpus, so its scores differ slightly from the rebuild's near the threshold.
+
+ris_files = [
+    "data/final_data/scopus (1).ris",
+    "data/final_data/savedrecs (3).ris",
+    "data/ris_files/all_records.ris"
+]
+similarity_threshold = 0.7
+new_records = 200
+modes = ["sparse", "minhash"]
+
+corpus = read_ris_files(ris_files).sample(frac=1, random_state=0).reset_index(drop=True)
+known, new = corpus.iloc[:-new_records], corpus.iloc[-new_records:]
+new_numbers = set(new['Covidence #'])
+print(f"{len(known)} indexed records, {len(new)} new records")
+
+
+def pair_set(report: pd.DataFrame) -> set:
+    return {frozenset(pair) for pair in zip(report['Covidence_1'], report['Covidence_2'])}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    # The detector prints its progress; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args)
+    return result, time.perf_counter() - start
+
+
+report = []
+for mode in modes:
+    detector = ArticleDuplicateDetector(similarity_threshold, mode=mode)
+    (rebuild_report, _), rebuild_seconds = timed(detector.detect_duplicates, corpus)
+    reference = {pair for pair in pair_set(rebuild_report) if pair & new_numbers}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "duplicate_index.npz")
+        index, build_seconds = timed(DuplicateIndex.build, known, ArticleDuplicateDetector(similarity_threshold, mode=mode))
+        _, save_seconds = timed(index.save, path)
+        index, load_seconds = timed(DuplicateIndex.load, path)
+        update_report, update_seconds = timed(index.update, new)
+        assert len(index) == len(corpus)
+        # A second update with the same export finds nothing to add
+        assert index.update(new).empty
+    found = pair_set(update_report)
+
+    report.append({
+        "mode": mode,
+        "rebuild_s": round(rebuild_seconds, 3),
+        "index_build_s": round(build_seconds, 3),
+        "save_s": round(save_seconds, 3),
+        "load_s": round(load_seconds, 3),
+        "update_s": round(update_seconds, 3),
+        "rebuild_pairs": len(reference),
+        "index_pairs": len(found),
+        "in_both": len(found & reference),
+        "recall": len(found & reference) / max(len(reference), 1),
+        "precision": len(found & reference) / max(len(found), 1)
+    })
+
+print(pd.DataFrame(report).round(4).to_string(index=False))
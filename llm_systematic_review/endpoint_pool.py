@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Circuit states of an endpoint
+CLOSED = "closed"       # healthy, receives traffic
+OPEN = "open"           # failing, receives no traffic until the cooldown has passed
+HALF_OPEN = "half_open" # cooldown passed, a single probe request decides whether it closes again
+
+
+class Endpoint:
+    """
+    One OpenAI-compatible endpoint (or one API key of an endpoint) and its health statistics.
+    """
+
+    def __init__(self, base_url: str, api_key: str, model: str, weight: float = 1.0, name: Optional[str] = None):
+        """
+        Args:
+            base_url: The base URL for the LLM API.
+            api_key: The API key for authentication.
+            model: The model to use on this endpoint.
+            weight: Share of the traffic relative to the other endpoints, e.g. proportional to the quota.
+            name: Label used in statistics, defaults to the base URL.
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self.weight = weight
+        self.name = name or base_url
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.name!r}, model={self.model!r}, weight={self.weight}, state={self.state})"
+
+
+class EndpointPool:
+    """
+    Routes requests across several endpoints by weight, latency and health.
+
+    Each request goes to a randomly chosen available endpoint, with probability
+    proportional to its weight, divided by its requests in flight and scaled
+    down the slower its smoothed latency is compared to the fastest endpoint.
+    After `failure_threshold` consecutive failures (connection errors, timeouts,
+    5xx responses, 401/403/404 rejections) the endpoint's circuit opens and it
+    gets no traffic for `cooldown` seconds; afterwards a single probe request
+    closes the circuit again or re-opens it. Rate limiting is not a failure: 429s are handled by
+    the endpoint's rate limiter.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], failure_threshold: int = 3, cooldown: float = 30.0, latency_smoothing: float = 0.2):
+        """
+        Args:
+            endpoints: The endpoints to route between.
+            failure_threshold: Consecutive failures that open an endpoint's circuit.
+            cooldown: Seconds an open circuit stays open before a probe request is allowed.
+            latency_smoothing: Weight of the newest latency in the exponential moving average.
+        """
+        if not endpoints:
+            raise ValueError("An endpoint pool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_smoothing = latency_smoothing
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, endpoint_configs: Iterable[Dict[str, Any]], **kwargs) -> "EndpointPool":
+        """
+        Creates a pool from dictionaries with 'base_url', 'api_key', 'model' and optionally 'weight' and 'name'.
+        """
+        return cls([Endpoint(**endpoint_config) for endpoint_config in endpoint_configs], **kwargs)
+
+    @property
+    def models(self) -> List[str]:
+        """
+        The distinct models served by the pool, in endpoint order.
+        """
+        return list(dict.fromkeys(endpoint.model for endpoint in self.endpoints))
+
+    def _is_available(self, endpoint: Endpoint, now: float) -> bool:
+        if endpoint.state == OPEN and now - endpoint.opened_at >= self.cooldown:
+            endpoint.state = HALF_OPEN
+        if endpoint.state == HALF_OPEN:
+            return endpoint.in_flight == 0
+        return endpoint.state == CLOSED
+
+    def _routing_weight(self, endpoint: Endpoint, fastest_latency: Optional[float]) -> float:
+        weight = endpoint.weight / (1 + endpoint.in_flight)
+        if endpoint.latency is not None and fastest_latency is not None:
+            weight *= fastest_latency / endpoint.latency
+        return weight
+
+    def acquire(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        """
+        Picks the endpoint for the next request and counts the request as in flight.
+
+        Endpoints in `exclude` (e.g. those that just failed this request) are only
+        used if no other endpoint is available. If every circuit is open, the
+        endpoint whose circuit opened first is used as a probe.
+
+        Returns:
+            The chosen endpoint; hand it back with release() when the request is done.
+        """
+        with self._lock:
+            now = time.monotonic()
+            excluded = set(map(id, exclude))
+            available = [endpoint for endpoint in self.endpoints if self._is_available(endpoint, now)]
+            candidates = [endpoint for endpoint in available if id(endpoint) not in excluded] or available
+            if not candidates:
+                candidates = [min(self.endpoints, key=lambda endpoint: endpoint.opened_at)]
+            latencies = [endpoint.latency for endpoint in candidates if endpoint.latency is not None]
+            fastest_latency = min(latencies) if latencies else None
+            endpoint = random.choices(candidates, weights=[self._routing_weight(candidate, fastest_latency) for candidate in candidates])[0]
+            endpoint.in_flight += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, latency: Optional[float] = None, failed: bool = False) -> None:
+        """
+        Records the outcome of a request acquired from the pool.
+
+        Args:
+            endpoint: The endpoint returned by acquire().
+            latency: Seconds the request took if it succeeded.
+            failed: Whether the endpoint failed the request. Requests that neither
+                succeeded nor failed (e.g. rate limited) leave the health unchanged.
+        """
+        with self._lock:
+            endpoint.in_flight -= 1
+            if latency is not None:
+                endpoint.successes += 1
+                endpoint.consecutive_failures = 0
+                endpoint.state = CLOSED
+                if endpoint.latency is None:
+                    endpoint.latency = latency
+                else:
+                    endpoint.latency += self.latency_smoothing * (latency - endpoint.latency)
+            elif failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.state == HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+                    if endpoint.state != OPEN:
+                        print(f"Circuit opened for {endpoint.name} after {endpoint.consecutive_failures} consecutive failures")
+                    endpoint.state = OPEN
+                    endpoint.opened_at = time.monotonic()
+            elif endpoint.state == HALF_OPEN:
+                # An inconclusive probe; let the next request probe again
+                endpoint.state = OPEN
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Returns the state, request counts and smoothed latency of every endpoint.
+        """
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint.name,
+                    "model": endpoint.model,
+                    "weight": endpoint.weight,
+                    "state": endpoint.state,
+                    "successes": endpoint.successes,
+                    "failures": endpoint.failures,
+                    "latency": endpoint.latency
+                }
+                for endpoint in self.endpoints
+            ]
@@ -0,0 +1,179 @@
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Markdown code fences the model sometimes wraps its CSV line in
+_CODE_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+
+def _normalize_covidence_number(value: Any) -> str:
+    return str(value).strip().lstrip("#").strip()
+
+
+def validate_extraction_line(response_text: str, columns: List[str], covidence_number: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    Parses and validates the answer to one extraction prompt.
+
+    The answer must contain exactly one CSV record with one value per column,
+    every value non-empty, and the first value must be the requested article's
+    Covidence number. Code fences and an echoed header line are tolerated.
+
+    Args:
+        response_text: Raw text returned by the LLM.
+        columns: Expected column names, starting with 'covidence_number'.
+        covidence_number: Covidence number of the article the prompt was about.
+
+    Returns:
+        Tuple of (values keyed by column, None) for a valid answer, or (None, reason) otherwise.
+    """
+    text = _CODE_FENCE.sub("", response_text.strip()).strip()
+    records = [record for record in csv.reader(text.splitlines()) if any(value.strip() for value in record)]
+    # Drop a header line if the model repeated the column names
+    records = [record for record in records if [value.strip().lower() for value in record] != columns]
+    if len(records) != 1:
+        return None, f"expected one CSV line, got {len(records)}"
+
+    values = [value.strip() for value in records[0]]
+    if len(values) != len(columns):
+        return None, f"expected {len(columns)} values, got {len(values)}"
+    if _normalize_covidence_number(values[0]) != _normalize_covidence_number(covidence_number):
+        return None, f"Covidence number {values[0]!r} does not match {covidence_number!r}"
+    empty = [column for column, value in zip(columns, values) if not value]
+    if empty:
+        return None, f"empty values for {', '.join(empty)}"
+    return dict(zip(columns, values)), None
+
+
+class ExtractionResultWriter:
+    """
+    Writes validated extraction rows to a Parquet dataset directory as they arrive.
+
+    Rows are buffered and every `rows_per_file` rows written as a complete
+    Parquet file of their own, so a long run never holds more than one file's
+    rows in memory, and a crash loses at most the buffered rows: every file
+    already written is readable (see read_extraction_results). Writing into an
+    existing directory adds files next to the ones there. All columns are
+    stored as strings, which keeps commas and quotes in the values intact
+    without any CSV escaping. Answers that failed validation go to a separate
+    JSONL file from which they can be re-requested.
+    """
+
+    def __init__(self, path: str, columns: List[str], invalid_path: Optional[str] = None, rows_per_file: int = 50):
+        """
+        Args:
+            path: Directory of the Parquet dataset with the valid rows, created if needed.
+            columns: Columns of the output rows.
+            invalid_path: Location of the JSONL file with invalid answers, defaults to `path` with an '_invalid.jsonl' suffix.
+            rows_per_file: Number of rows per Parquet file.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.columns = columns
+        self.invalid_path = invalid_path or default_invalid_path(path)
+        self.rows_per_file = rows_per_file
+        self.rows_written = 0
+        self.invalid_written = 0
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema([(column, pa.string()) for column in columns])
+        os.makedirs(path, exist_ok=True)
+        self._file_number = len([name for name in os.listdir(path) if name.endswith(".parquet")])
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        """
+        Adds a validated row; columns missing from `row` are written as nulls.
+        """
+        self._buffer.append(row)
+        if len(self._buffer) >= self.rows_per_file:
+            self.flush()
+
+    def write_invalid(self, covidence_number: str, part: int, response_text: Optional[str], reason: str) -> None:
+        """
+        Records an answer that could not be validated, for a targeted re-request later on.
+        """
+        entry = {"covidence_number": covidence_number, "part": part, "reason": reason, "raw_response": response_text}
+        with open(self.invalid_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.invalid_written += 1
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        table = self._pa.Table.from_pydict(
+            {column: [None if row.get(column) is None else str(row[column]) for row in self._buffer] for column in self.columns},
+            schema=self._schema
+        )
+        file_name = f"part-{self._file_number:05d}.parquet"
+        # Readers skip names starting with '.', so a file cut off mid-write is never picked up
+        temporary_path = os.path.join(self.path, f".{file_name}.tmp")
+        self._pq.write_table(table, temporary_path)
+        os.replace(temporary_path, os.path.join(self.path, file_name))
+        self._file_number += 1
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ExtractionResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def default_invalid_path(path: str) -> str:
+    """
+    Returns the invalid-answer queue that goes with the Parquet dataset at `path`.
+    """
+    return re.sub(r"\.parquet$", "", path.rstrip("/\\")) + "_invalid.jsonl"
+
+
+def read_invalid_queue(invalid_path: str) -> pd.DataFrame:
+    """
+    Reads the invalid answers written by ExtractionResultWriter.write_invalid.
+
+    Returns:
+        DataFrame with 'covidence_number', 'part', 'reason' and 'raw_response' columns,
+        one row per (article, part) with the last recorded failure; empty if there is no queue.
+    """
+    columns = ["covidence_number", "part", "reason", "raw_response"]
+    if not os.path.exists(invalid_path):
+        return pd.DataFrame(columns=columns)
+    entries = []
+    with open(invalid_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A run killed while writing can leave a truncated last line
+                continue
+    queue = pd.DataFrame(entries, columns=columns).astype({"covidence_number": str})
+    return queue.drop_duplicates(subset=["covidence_number", "part"], keep="last").reset_index(drop=True)
+
+
+def read_extraction_results(path: str, columns: List[str]) -> pd.DataFrame:
+    """
+    Reads a Parquet dataset written by ExtractionResultWriter into one row per article.
+
+    An article re-requested later has several rows, each holding the parts that
+    were valid in that run; they are merged, the first non-empty value per column winning.
+
+    Args:
+        path: Directory of the Parquet dataset.
+        columns: Columns of the output rows, starting with 'covidence_number'.
+
+    Returns:
+        DataFrame with one row per article, in the order the articles were first written.
+    """
+    if not os.path.isdir(path) or not any(name.endswith(".parquet") for name in os.listdir(path)):
+        return pd.DataFrame(columns=columns)
+    rows = pd.read_parquet(path).reindex(columns=columns)
+    return rows.groupby("covidence_number", sort=False).first().reset_index().reindex(columns=columns)
@@ -0,0 +1,238 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from openai import AsyncOpenAI
+
+from llm_systematic_review.call_metrics import metrics_template, template_name
+from llm_systematic_review.extraction_parser import (ExtractionResultWriter, default_invalid_path, read_extraction_results, read_invalid_queue,
+                                                     validate_extraction_line)
+from llm_systematic_review.helpers import (EXTRACTION_SYSTEM_MESSAGE, LLMRequestError, create_async_openai_client, create_llm_full_text_prompt_string,
+                                           get_llm_text_response_async)
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.screening_engine import run_coroutine
+
+# Output columns of the three extraction prompts, in the order of their data_extraction_items
+columns_pt_1 = [
+    "covidence_number",
+    "study_objectives",
+    "location",
+    "sample_age",
+    "sample_gender_distribution",
+    "sample_education_level",
+    "interactive",
+    "interaction_description",
+    "domain",
+    "informed_participants",
+    "disclosure_delivery"
+]
+
+columns_pt_2 = [
+    "covidence_number",
+    "prompt_availability",
+    "prompt_extract",
+    "prompt_location",
+    "pers_prompt_content",
+    "discouragement_of_disclosure",
+    "participant_instr_avail",
+    "participant_instr",
+    "pers_nature_in_instr"
+]
+
+columns_pt_3 = [
+    "covidence_number",
+    "debriefing_reported",
+    "debriefing_discloses_ai",
+    "debriefing_discloses_pers",
+    "debriefing_extract",
+    "ai_system_used",
+    "study_design_type",
+    "study_setting",
+    "ethical_approval_reported"
+]
+
+EXTRACTION_PARTS = [
+    (PromptTemplates.PROMPT_EXTRACTION_PT_1, columns_pt_1),
+    (PromptTemplates.PROMPT_EXTRACTION_PT_2, columns_pt_2),
+    (PromptTemplates.PROMPT_EXTRACTION_PT_3, columns_pt_3)
+]
+
+
+# Times an answer that fails validation is requested again, with the validation error pointed out
+MAX_REREQUESTS = 2
+
+
+async def _extract_part(semaphore: asyncio.Semaphore, client: AsyncOpenAI, prompt_string: str, model: str, use_cache: bool,
+                        columns: List[str], covidence_number: str, template: str) -> Tuple[Optional[Dict[str, str]], Optional[str], Optional[str]]:
+    """
+    Requests one extraction part and validates the answer, re-requesting it if it is malformed.
+
+    Returns:
+        Tuple of (validated values or None, last raw answer, reason of the last validation failure).
+    """
+    system_message = EXTRACTION_SYSTEM_MESSAGE
+    response_text, reason = None, None
+    for _ in range(MAX_REREQUESTS + 1):
+        async with semaphore:
+            try:
+                with metrics_template(template):
+                    response_text = await get_llm_text_response_async(prompt_string, client, model, use_cache, system_message)
+            except LLMRequestError as e:
+                return None, None, str(e)
+        values, reason = validate_extraction_line(response_text, columns, covidence_number)
+        if values is not None:
+            return values, response_text, None
+        # A different system message makes it a new request (and a new cache entry) instead of replaying the same answer
+        system_message = (f"{EXTRACTION_SYSTEM_MESSAGE} Your previous answer was invalid ({reason}). Return exactly "
+                          f"{len(columns)} values on one line and enclose values containing commas in double quotes.")
+    return None, response_text, reason
+
+
+async def _extract_article(semaphore: asyncio.Semaphore, client: AsyncOpenAI, covidence_number: str, path: str, model: str, use_cache: bool,
+                           writer: Optional[ExtractionResultWriter], parts: Sequence[int] = (1, 2, 3)) -> Dict[str, Any]:
+    # The full text is read once and shared by the part prompts
+    with open(path, 'r', encoding='utf-8') as f:
+        full_text = f.read()
+    covidence_number = str(covidence_number)
+    results = await asyncio.gather(*[
+        _extract_part(semaphore, client, create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text), model, use_cache, columns, covidence_number,
+                      template_name(prompt_template))
+        for prompt_template, columns in (EXTRACTION_PARTS[part - 1] for part in parts)
+    ])
+
+    row = {"covidence_number": covidence_number}
+    for part, (values, response_text, reason) in zip(parts, results):
+        if values is None:
+            print(f"Extraction part {part} of {covidence_number} is invalid: {reason}")
+            if writer is not None:
+                writer.write_invalid(covidence_number, part, response_text, reason)
+            continue
+        # The Covidence number is taken from the input, not from the LLM's answer
+        values.pop("covidence_number")
+        row.update(values)
+    if writer is not None:
+        writer.write_row(row)
+    return row
+
+
+EXTRACTION_COLUMNS = ["covidence_number"] + [column for _, part_columns in EXTRACTION_PARTS for column in part_columns[1:]]
+
+
+async def extract_articles_async(articles: pd.DataFrame, api_key: str, base_url: str, model: str,
+                                 max_concurrency: int = 8, use_cache: bool = True, output_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Runs the three data extraction prompts for every article concurrently and merges them into one row per article.
+
+    Each full text is read once. All part requests of all articles share one
+    pooled client, the semaphore and the endpoint's rate limiter, so the time per
+    article is roughly that of its slowest part. Every answer is validated
+    against its column list as soon as it arrives; malformed answers are
+    re-requested up to MAX_REREQUESTS times.
+
+    Args:
+        articles: DataFrame with 'Covidence #' and 'path' (the full-text file) columns.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        max_concurrency: Upper bound on simultaneous requests.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        output_path: Optional Parquet dataset directory the rows are written to as the articles complete,
+            see ExtractionResultWriter. Answers that stay invalid are written to a '<name>_invalid.jsonl'
+            file next to it; re-request them with reextract_invalid.
+
+    Returns:
+        DataFrame with one row per article, keyed by 'covidence_number', holding the
+        columns of all three parts. Parts whose answer stayed invalid are left empty.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    writer = ExtractionResultWriter(output_path, EXTRACTION_COLUMNS) if output_path is not None else None
+    try:
+        async with create_async_openai_client(api_key, base_url, pool_size=max_concurrency) as client:
+            rows = await asyncio.gather(*[
+                _extract_article(semaphore, client, covidence_number, path, model, use_cache, writer)
+                for covidence_number, path in articles[['Covidence #', 'path']].itertuples(index=False)
+            ])
+    finally:
+        if writer is not None:
+            writer.close()
+    return pd.DataFrame(rows).reindex(columns=EXTRACTION_COLUMNS)
+
+
+def extract_articles(articles: pd.DataFrame, api_key: str, base_url: str, model: str,
+                     max_concurrency: int = 8, use_cache: bool = True, output_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Blocking wrapper around extract_articles_async for use in the request scripts.
+    """
+    return run_coroutine(extract_articles_async(articles, api_key, base_url, model, max_concurrency, use_cache, output_path))
+
+
+def failed_extractions(extracted: pd.DataFrame) -> pd.Series:
+    """
+    Flags the articles of an extract_articles result with at least one part whose answer stayed invalid (all its columns empty).
+    """
+    failed = pd.Series(False, index=extracted.index)
+    for _, part_columns in EXTRACTION_PARTS:
+        failed |= extracted[part_columns[1:]].isna().all(axis=1)
+    return failed
+
+
+async def reextract_invalid_async(articles: pd.DataFrame, api_key: str, base_url: str, model: str, output_path: str,
+                                  max_concurrency: int = 8, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Requests the parts listed in the invalid-answer queue of an extract_articles run again.
+
+    Only the failed parts are requested, each with the full retry budget of
+    _extract_part. The new rows are added to the dataset at `output_path`, and
+    the queue is replaced by the answers that are still invalid once the run
+    is complete; an interrupted run leaves the old queue in place.
+
+    Args:
+        articles: DataFrame with 'Covidence #' and 'path' columns, as passed to extract_articles.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        output_path: The Parquet dataset directory of the earlier extract_articles run.
+        max_concurrency: Upper bound on simultaneous requests.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+
+    Returns:
+        The merged results of all runs, see read_extraction_results.
+    """
+    invalid_path = default_invalid_path(output_path)
+    queue = read_invalid_queue(invalid_path)
+    paths = dict(zip(articles['Covidence #'].astype(str), articles['path']))
+    missing = sorted(set(queue['covidence_number']) - set(paths))
+    if missing:
+        print(f"No full text for {len(missing)} queued articles, they stay in the queue: {missing[:5]}")
+    print(f"Re-requesting {len(queue)} invalid extraction parts of {queue['covidence_number'].nunique()} articles")
+
+    retry_path = invalid_path + ".retry"
+    if os.path.exists(retry_path):
+        os.remove(retry_path)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    writer = ExtractionResultWriter(output_path, EXTRACTION_COLUMNS, invalid_path=retry_path)
+    for _, entry in queue[queue['covidence_number'].isin(missing)].iterrows():
+        writer.write_invalid(entry['covidence_number'], int(entry['part']), entry['raw_response'], entry['reason'])
+    try:
+        async with create_async_openai_client(api_key, base_url, pool_size=max_concurrency) as client:
+            await asyncio.gather(*[
+                _extract_article(semaphore, client, covidence_number, paths[covidence_number], model, use_cache, writer,
+                                 sorted(int(part) for part in article_queue['part']))
+                for covidence_number, article_queue in queue[~queue['covidence_number'].isin(missing)].groupby('covidence_number', sort=False)
+            ])
+    finally:
+        writer.close()
+    if os.path.exists(retry_path):
+        os.replace(retry_path, invalid_path)
+    elif os.path.exists(invalid_path):
+        os.remove(invalid_path)
+    return read_extraction_results(output_path, EXTRACTION_COLUMNS)
+
+
+def reextract_invalid(articles: pd.DataFrame, api_key: str, base_url: str, model: str, output_path: str,
+                      max_concurrency: int = 8, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Blocking wrapper around reextract_invalid_async for use in the request scripts.
+    """
+    return run_coroutine(reextract_invalid_async(articles, api_key, base_url, model, output_path, max_concurrency, use_cache))
@@ -0,0 +1,233 @@
+import re
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from llm_systematic_review.call_metrics import metrics_template, template_name
+from llm_systematic_review.endpoint_pool import EndpointPool
+from llm_systematic_review.helpers import create_llm_full_text_prompt_string
+from llm_systematic_review.prompt_renderer import count_tokens
+from llm_systematic_review.screening_engine import run_coroutine, screen_prompts_async
+
+# Full-text tokens per request; well inside the context window of llama-3.3-70b-instruct
+DEFAULT_MAX_CHUNK_TOKENS = 12000
+
+# Page markers written by the OCR scripts, e.g. '--- Page 03 ---'
+PAGE_MARKER = re.compile(r"^--- Page \d+ ---$", re.MULTILINE)
+# Numbered or well-known section headings on a line of their own
+SECTION_HEADING = re.compile(
+    r"^[ \t]*(?:\d+(?:\.\d+)*\.?[ \t]+)?(?:Abstract|Introduction|Background|Related Work|Literature Review|Theoretical Background|"
+    r"Methods?|Methodology|Materials and Methods|Results|Findings|Discussion|General Discussion|Conclusions?|Limitations|"
+    r"Study \d+|Experiment \d+)\b[^\n]{0,60}$",
+    re.MULTILINE | re.IGNORECASE
+)
+# Start of a paragraph after a blank line
+PARAGRAPH_BREAK = re.compile(r"(?<=\n\n)")
+
+CHUNK_INSTRUCTION = (
+    " The full text is too long for one request and has been split into consecutive parts; 'input_article' contains "
+    "only one part, labelled with its position. Base each decision on this part only: answer 'Yes' if this part "
+    "provides evidence that the criterion applies and 'No' otherwise."
+)
+
+
+def _split_at(pattern: re.Pattern, text: str) -> List[str]:
+    starts = [0] + [match.start() for match in pattern.finditer(text) if match.start() > 0]
+    return [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+
+def _split_words(text: str, max_tokens: int) -> List[str]:
+    # Last resort for a single paragraph longer than the budget
+    pieces, current = [], []
+    for word in text.split(" "):
+        current.append(word)
+        if count_tokens(" ".join(current)) > max_tokens and len(current) > 1:
+            current.pop()
+            pieces.append(" ".join(current) + " ")
+            current = [word]
+    pieces.append(" ".join(current))
+    return pieces
+
+
+def _split_to_budget(text: str, max_tokens: int, splitters: List) -> List[str]:
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    if not splitters:
+        return _split_words(text, max_tokens)
+    pieces = []
+    for piece in splitters[0](text):
+        pieces.extend(_split_to_budget(piece, max_tokens, splitters[1:]))
+    return pieces
+
+
+def split_full_text(full_text: str, max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS) -> List[str]:
+    """
+    Splits a full text into consecutive chunks of at most `max_chunk_tokens` tokens.
+
+    The text is cut at page markers first, pages that are still too long at
+    section headings, then at paragraphs and finally between words. Consecutive
+    pieces are merged back together as long as they fit into the budget, so no
+    text is dropped or added, and chunks follow the document's own structure.
+
+    Args:
+        full_text: Full text of the article as written by the OCR scripts.
+        max_chunk_tokens: Token budget of one chunk.
+
+    Returns:
+        The chunks in document order; a single chunk if the text fits into the budget.
+    """
+    splitters = [
+        lambda text: _split_at(PAGE_MARKER, text),
+        lambda text: _split_at(SECTION_HEADING, text),
+        lambda text: _split_at(PARAGRAPH_BREAK, text)
+    ]
+    pieces = _split_to_budget(full_text, max_chunk_tokens, splitters)
+
+    chunks, current, current_tokens = [], "", 0
+    for piece in pieces:
+        piece_tokens = count_tokens(piece)
+        if current and current_tokens + piece_tokens > max_chunk_tokens:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current += piece
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+_chunk_templates: Dict[int, Dict[str, Any]] = {}
+
+
+def get_chunk_template(prompt_template: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the variant of a full-text template used for single chunks, created once per template.
+    """
+    chunk_template = _chunk_templates.get(id(prompt_template))
+    if chunk_template is None:
+        chunk_template = dict(prompt_template, task_definition=prompt_template["task_definition"] + CHUNK_INSTRUCTION)
+        _chunk_templates[id(prompt_template)] = chunk_template
+    return chunk_template
+
+
+def build_full_text_prompts(prompt_template: Dict[str, Any], covidence_number: str, full_text: str,
+                            max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS) -> List[str]:
+    """
+    Renders the prompts for one full text: the unchanged prompt if it fits into `max_chunk_tokens`, one prompt per chunk otherwise.
+    """
+    chunks = split_full_text(full_text, max_chunk_tokens)
+    if len(chunks) == 1:
+        return [create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text)]
+    chunk_template = get_chunk_template(prompt_template)
+    return [create_llm_full_text_prompt_string(chunk_template, covidence_number, f"[Part {part} of {len(chunks)}]\n{chunk}")
+            for part, chunk in enumerate(chunks, start=1)]
+
+
+def reduce_chunk_decisions(chunk_responses: List[Dict[str, Any]], prompt_template: Dict[str, Any], covidence_number: str) -> Dict[str, Any]:
+    """
+    Combines the per-chunk decisions on one article into a single decision.
+
+    A criterion is met ('Yes') if any chunk found evidence for it; its reasoning
+    is taken from the chunks that answered 'Yes' (or from all chunks otherwise).
+    The article is included if all inclusion criteria are met and no exclusion
+    criterion applies, as the screening criteria prescribe.
+
+    Args:
+        chunk_responses: Parsed responses for the chunks of the article, in document order.
+        prompt_template: The full-text PromptTemplates entry the chunks were screened with.
+        covidence_number: Covidence number of the article.
+
+    Returns:
+        A decision in the template's output format, plus the number of chunks.
+    """
+    decision = {"covidence_number": covidence_number}
+    criteria_met = {}
+    for group in ("inclusion_criteria_evaluation", "exclusion_criteria_evaluation"):
+        decision[group] = {}
+        for criterion in prompt_template["output_format"][group]:
+            evaluations = [response.get(group, {}).get(criterion, {}) for response in chunk_responses]
+            supporting = [evaluation for evaluation in evaluations if str(evaluation.get("decision", "")).strip().lower() == "yes"]
+            criteria_met[(group, criterion)] = bool(supporting)
+            reasons = [
+                f"Part {part}: {evaluation.get('reasoning', '')}"
+                for part, evaluation in enumerate(evaluations, start=1)
+                if evaluation in supporting or not supporting
+            ]
+            decision[group][criterion] = {
+                "reasoning": " ".join(reasons),
+                "decision": "Yes" if supporting else "No"
+            }
+    include = (all(met for (group, _), met in criteria_met.items() if group == "inclusion_criteria_evaluation")
+               and not any(met for (group, _), met in criteria_met.items() if group == "exclusion_criteria_evaluation"))
+    decision["final_decision"] = "Include" if include else "Exclude"
+    decision["n_chunks"] = len(chunk_responses)
+    return decision
+
+
+async def screen_full_texts_async(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str,
+                                  max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS, max_concurrency: int = 8,
+                                  use_cache: bool = True, stream: bool = False,
+                                  pool: Optional[EndpointPool] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Screens full texts chunk by chunk and reduces the chunk verdicts per article.
+
+    Texts that fit into `max_chunk_tokens` are sent unchanged with the original
+    template. Longer texts are split with split_full_text, and all chunks of all
+    articles are evaluated concurrently.
+
+    Args:
+        articles: DataFrame with 'Covidence #' and 'path' (the full-text file) columns.
+        prompt_template: A full-text PromptTemplates entry, e.g. PromptTemplates.PROMPT_FULL_TEXT.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        max_chunk_tokens: Token budget of the full text in one request.
+        max_concurrency: Upper bound on simultaneous requests.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        stream: Whether to stream the answers, so that slow or runaway generations are
+            cut off by the deadlines of get_llm_screening_decision.
+        pool: Optional EndpointPool to spread the requests over several endpoints; api_key, base_url and model are then ignored.
+
+    Returns:
+        One decision per article in the same order as the DataFrame rows, with None
+        for articles where any chunk failed after all retries.
+    """
+    prompts, owners = [], []
+    chunk_counts = []
+    for position, (covidence_number, path) in enumerate(articles[['Covidence #', 'path']].itertuples(index=False)):
+        with open(path, 'r', encoding='utf-8') as f:
+            full_text = f.read()
+        article_prompts = build_full_text_prompts(prompt_template, covidence_number, full_text, max_chunk_tokens)
+        chunk_counts.append(len(article_prompts))
+        prompts.extend(article_prompts)
+        owners.extend([position] * len(article_prompts))
+
+    print(f"Screening {len(articles)} full texts in {len(prompts)} chunk requests")
+    with metrics_template(template_name(prompt_template)):
+        responses = await screen_prompts_async(prompts, api_key, base_url, model, max_concurrency, use_cache,
+                                               [str(articles['Covidence #'].iloc[owner]) for owner in owners], stream=stream, pool=pool,
+                                               required_keys=list(prompt_template["output_format"]))
+
+    chunk_responses = [[] for _ in chunk_counts]
+    for owner, llm_response in zip(owners, responses):
+        chunk_responses[owner].append(llm_response)
+
+    results = []
+    for position, (covidence_number, article_responses) in enumerate(zip(articles['Covidence #'], chunk_responses)):
+        if any(llm_response is None for llm_response in article_responses):
+            results.append(None)
+        elif chunk_counts[position] == 1:
+            results.append(article_responses[0])
+        else:
+            results.append(reduce_chunk_decisions(article_responses, prompt_template, covidence_number))
+    return results
+
+
+def screen_full_texts(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str,
+                      max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS, max_concurrency: int = 8,
+                      use_cache: bool = True, stream: bool = False, pool: Optional[EndpointPool] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Blocking wrapper around screen_full_texts_async for use in the request scripts.
+    """
+    return run_coroutine(screen_full_texts_async(articles, prompt_template, api_key, base_url, model,
+                                                 max_chunk_tokens, max_concurrency, use_cache, stream, pool))
@@ -1,9 +1,125 @@
-from typing import Any, Dict
-from openai import OpenAI
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import openai
+from openai import AsyncOpenAI, OpenAI
 from openai.types.chat import ChatCompletionChunk 
+import httpx
 import json
+from llm_systematic_review.call_metrics import get_call_metrics
+from llm_systematic_review.endpoint_pool import Endpoint, EndpointPool
+from llm_systematic_review.prompt_renderer import compact_instructions, count_tokens, get_compiled_template
+from llm_systematic_review.rate_limiter import LLMRequestError, MAX_RETRIES, TRANSIENT_ERRORS, get_rate_limiter
+from llm_systematic_review.response_cache import ResponseCache, get_response_cache
+from llm_systematic_review.response_stream import (DEFAULT_FIRST_TOKEN_TIMEOUT, DEFAULT_TOTAL_TIMEOUT, FirstTokenTimeout, JSONStreamAccumulator,
+                                                   StreamDeadlineExceeded)
+import asyncio
+import time
 
-def create_llm_abs_title_prompt_string(prompt_template: Dict, title: str, abstract: str, year: str, covidence_number: str) -> str:
+SYSTEM_MESSAGE = "You are a meticulous research assistant. Your task is to evaluate a research article's abstract based on a specific criterion and respond ONLY with a valid JSON object matching the requested format."
+EXTRACTION_SYSTEM_MESSAGE = "You are a meticulous research assistant. Your task is to extract data from a research article and respond ONLY with a single line of comma-separated values in the requested format."
+
+# Fields of the article section filled per article ('input_article', or 'input_format' in the extraction templates)
+TITLE_ABSTRACT_FIELDS = ["title", "abstract", "year", "covidence_number"]
+FULL_TEXT_FIELDS = ["covidence_number", "full_text"]
+
+# Fixed seed so that repeated requests are as reproducible as the API allows
+SEED = 42
+
+# Number of keep-alive connections kept open per endpoint
+DEFAULT_POOL_SIZE = 16
+# Seconds an idle connection is kept before it has to be re-established
+KEEPALIVE_EXPIRY = 60.0
+
+# Streamed requests are also retried when the stream stalls or starts too late
+STREAM_TRANSIENT_ERRORS = TRANSIENT_ERRORS + (httpx.TimeoutException, FirstTokenTimeout)
+# Errors with which one endpoint rejects every request (wrong key, no access, unknown model or URL);
+# in a pool, the other endpoints may still serve the request
+ENDPOINT_REJECTION_ERRORS = (openai.AuthenticationError, openai.PermissionDeniedError, openai.NotFoundError)
+
+# Shared clients keyed by (base_url, api_key), so every request script reuses the same connection pool
+_openai_clients: Dict[Tuple[str, str], OpenAI] = {}
+
+
+def _connection_limits(pool_size: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def get_openai_client(api_key: str, base_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> OpenAI:
+    """
+    Returns the shared OpenAI client for an endpoint, creating it on first use.
+
+    The client keeps its HTTP connections alive between calls, so the TCP/TLS
+    handshake is paid once per connection instead of once per request.
+
+    Args:
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        pool_size: Maximum number of pooled connections. Only used when the client is created.
+
+    Returns:
+        An OpenAI client bound to a persistent connection pool.
+    """
+    key = (base_url, api_key)
+    if key not in _openai_clients:
+        _openai_clients[key] = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0, # retries are paced by the rate limiter instead
+            http_client=httpx.Client(limits=_connection_limits(pool_size))
+        )
+    return _openai_clients[key]
+
+
+def create_async_openai_client(api_key: str, base_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> AsyncOpenAI:
+    """
+    Creates an AsyncOpenAI client with a keep-alive connection pool of `pool_size` connections.
+
+    Async clients are tied to the event loop they run in, so they are not cached
+    globally; create one per run and share it between all concurrent requests.
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        http_client=httpx.AsyncClient(limits=_connection_limits(pool_size))
+    )
+
+
+def close_openai_clients() -> None:
+    """
+    Closes all shared clients and their connection pools.
+    """
+    for client in _openai_clients.values():
+        client.close()
+    _openai_clients.clear()
+
+
+def create_system_message(prompt_template: Dict, encoding: str = "pretty") -> str:
+    """
+    Returns the system message that goes with prompts of the given encoding.
+
+    In 'compact' mode the role, criteria and output format of the template are
+    part of the system message, so the user message only carries the article.
+
+    Args:
+        prompt_template: A dictionary representing the base prompt structure.
+        encoding: 'pretty' or 'compact'.
+
+    Returns:
+        The system message to send with every prompt built from this template.
+    """
+    if encoding == "pretty":
+        return SYSTEM_MESSAGE
+    return (
+        f"{SYSTEM_MESSAGE}\n\nInstructions, criteria and output format: {compact_instructions(prompt_template)}\n"
+        "The user message contains the article as JSON, using the short keys listed in input_article_keys."
+    )
+
+
+def create_llm_abs_title_prompt_string(prompt_template: Dict, title: str, abstract: str, year: str, covidence_number: str, encoding: str = "pretty") -> str:
     """
     Fills a prompt template with article-specific information.
 
@@ -11,22 +127,17 @@ def create_llm_abs_title_prompt_string(prompt_template: Dict, title: str, abstra
         prompt_template: A dictionary representing the base prompt structure.
         title: The article's title.
         abstract: The article's abstract.
+        encoding: 'pretty' for the whole template as indented JSON, 'compact' for the
+            article only as minified JSON (use with create_system_message).
 
     Returns:
         A JSON-formatted string to be sent to the LLM.
     """
-    # Deep copy the template to avoid modifying the original
-    filled_prompt = json.loads(json.dumps(prompt_template))
-    
-    # Inject the specific article data into the prompt
-    filled_prompt["input_article"]["title"] = title
-    filled_prompt["input_article"]["abstract"] = abstract
-    filled_prompt["input_article"]["year"] = year
-    filled_prompt["input_article"]["covidence_number"] = covidence_number
-    
-    return json.dumps(filled_prompt, indent=2)
+    # The static part of the template is serialized once; only the article fields are encoded per call
+    compiled_template = get_compiled_template(prompt_template, TITLE_ABSTRACT_FIELDS, encoding)
+    return compiled_template.render(title=title, abstract=abstract, year=year, covidence_number=covidence_number)
 
-def create_llm_full_text_prompt_string(prompt_template: Dict, covidence_number: str, full_text: str) -> str:
+def create_llm_full_text_prompt_string(prompt_template: Dict, covidence_number: str, full_text: str, encoding: str = "pretty") -> str:
     """
     Fills a prompt template with article-specific information.
 
@@ -34,61 +145,496 @@ def create_llm_full_text_prompt_string(prompt_template: Dict, covidence_number:
         prompt_template: A dictionary representing the base prompt structure.
         covidence_number: Unique number of article in Covidence
         full_text: Full text of article except for References section
+        encoding: 'pretty' for the whole template as indented JSON, 'compact' for the
+            article only as minified JSON (use with create_system_message).
 
     Returns:
         A JSON-formatted string to be sent to the LLM.
     """
-    # Deep copy the template to avoid modifying the original
-    filled_prompt = json.loads(json.dumps(prompt_template))
-    
-    # Inject the specific article data into the prompt
-    filled_prompt["input_article"]["covidence_number"] = covidence_number
-    filled_prompt["input_article"]["full_text"] = full_text
-    
-    return json.dumps(filled_prompt, indent=2)
+    section = "input_article" if "input_article" in prompt_template else "input_format"
+    compiled_template = get_compiled_template(prompt_template, FULL_TEXT_FIELDS, encoding, section)
+    return compiled_template.render(covidence_number=covidence_number, full_text=full_text)
+
+
+def _cached_response(cache: Optional[ResponseCache], model: str, system_message: str, prompt_string: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Looks a prompt up in the response cache. Returns (cache_key, cached_response); both are None without a cache.
+    """
+    if cache is None:
+        return None, None
+    cache_key = ResponseCache.make_key(model, SEED, system_message, prompt_string)
+    return cache_key, cache.get(cache_key)
 
 
-def get_llm_screening_decision(prompt_string: str, api_key: str, base_url: str, model: str) -> Dict[str, Any]:
+def _store_response(cache: Optional[ResponseCache], cache_key: Optional[str], response: Dict[str, Any]) -> Dict[str, Any]:
+    if cache is not None:
+        cache.set(cache_key, response)
+    return response
+
+
+def _chat_completion_kwargs(prompt_string: str, model: str, system_message: str, json_mode: bool) -> Dict[str, Any]:
+    kwargs = {
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt_string}
+        ],
+        "model": model,
+        "seed": SEED
+    }
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"} # Use JSON mode for reliability
+    return kwargs
+
+
+def _parse_response_content(response_content: str) -> Dict[str, Any]:
+    try:
+        return json.loads(response_content)
+    except (json.JSONDecodeError, TypeError) as e:
+        raise LLMRequestError(f"Failed to decode JSON from LLM response: {response_content!r}") from e
+
+
+def get_llm_screening_decision(prompt_string: str, api_key: str, base_url: str, model: str, use_cache: bool = True,
+                               system_message: str = SYSTEM_MESSAGE, stream: bool = False,
+                               first_token_timeout: float = DEFAULT_FIRST_TOKEN_TIMEOUT,
+                               total_timeout: float = DEFAULT_TOTAL_TIMEOUT, pool: Optional[EndpointPool] = None,
+                               required_keys: Optional[Sequence[str]] = None) -> Dict[str, Any]:
     """
     Sends a formatted prompt to the LLM API and returns the parsed JSON response.
 
+    Requests are paced by the endpoint's adaptive rate limiter, and throttled or
+    transient failures are retried with jittered exponential backoff. With a
+    `pool`, every attempt is routed to one of the pool's endpoints instead, and
+    a failed attempt is retried on another endpoint first.
+
+    In streaming mode the answer is consumed chunk by chunk: a request whose
+    first token does not arrive within `first_token_timeout` is retried, one
+    still generating after `total_timeout` is cancelled, and the stream is
+    closed as soon as all `required_keys` have been generated (otherwise at the
+    end of the JSON object).
+
     Args:
         prompt_string: The complete, JSON-formatted prompt string for the LLM.
         api_key: The API key for authentication.
         base_url: The base URL for the LLM API.
         model: The model to use for the LLM API request.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        system_message: The system message; see create_system_message for compact prompts.
+        stream: Whether to stream the answer and enforce the deadlines below.
+        first_token_timeout: Seconds until the first token must arrive (streaming only).
+        total_timeout: Seconds the whole answer may take (streaming only).
+        pool: Optional EndpointPool to route the request through; api_key, base_url and model are then ignored.
+        required_keys: Keys of the template's output_format (streaming only), see JSONStreamAccumulator.
 
     Returns:
         A dictionary parsed from the LLM's JSON response.
-        Returns an error dictionary if the response is not valid JSON.
+
+    Raises:
+        LLMRequestError: If the call fails permanently, keeps failing after all
+            retries, exceeds `total_timeout`, or the response is not valid JSON.
     """
-    try:
-        client = OpenAI(
-            api_key=api_key,
-            base_url=base_url
-        )
-        
-        # We ask the model to respond in JSON mode for more reliable output
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a meticulous research assistant. Your task is to evaluate a research article's abstract based on a specific criterion and respond ONLY with a valid JSON object matching the requested format."},
-                {"role": "user", "content": prompt_string}
-            ],
-            model=model,
-            response_format={"type": "json_object"}, # Use JSON mode for reliability
-            seed = 42
-        )
-        
-        response_content = chat_completion.choices[0].message.content
-        return json.loads(response_content)
+    if pool is not None:
+        return _get_pooled_screening_decision(prompt_string, pool, use_cache, system_message, stream, first_token_timeout, total_timeout,
+                                              required_keys)
+    cache = get_response_cache() if use_cache else None
+    cache_key, cached = _cached_response(cache, model, system_message, prompt_string)
+    if cached is not None:
+        return cached
+    response_content = _request_decision_content(prompt_string, api_key, base_url, model, system_message, stream,
+                                                 first_token_timeout, total_timeout, required_keys=required_keys)
+    return _store_response(cache, cache_key, _parse_response_content(response_content))
+
+
+def _request_decision_content(prompt_string: str, api_key: str, base_url: str, model: str, system_message: str, stream: bool,
+                              first_token_timeout: float, total_timeout: float, max_retries: int = MAX_RETRIES,
+                              required_keys: Optional[Sequence[str]] = None) -> str:
+    if stream:
+        return _request_chat_completion_streamed(prompt_string, api_key, base_url, model, system_message,
+                                                 first_token_timeout, total_timeout, max_retries, required_keys)
+    return _request_chat_completion(prompt_string, api_key, base_url, model, system_message, json_mode=True, max_retries=max_retries)
+
+
+def _pooled_cached_response(cache: Optional[ResponseCache], pool: EndpointPool, system_message: str, prompt_string: str) -> Optional[Dict[str, Any]]:
+    # Any model of the pool may have answered the prompt before
+    for model in pool.models:
+        _, cached = _cached_response(cache, model, system_message, prompt_string)
+        if cached is not None:
+            return cached
+    return None
+
+
+def _release_failed_endpoint(pool: EndpointPool, endpoint: Endpoint, error: LLMRequestError, attempt: int,
+                             rejected_endpoints: List[Endpoint]) -> float:
+    """
+    Hands a failed endpoint back to the pool and returns the backoff before the request is retried.
+
+    An endpoint that rejects the request (ENDPOINT_REJECTION_ERRORS) counts as
+    failed and is added to `rejected_endpoints`; the request moves on to the
+    other endpoints without a backoff. Re-raises the error once every endpoint
+    of the pool has rejected the request, or if it is not worth retrying on
+    another endpoint.
+    """
+    cause = error.__cause__
+    if isinstance(cause, ENDPOINT_REJECTION_ERRORS):
+        pool.release(endpoint, failed=True)
+        rejected_endpoints.append(endpoint)
+        if len(set(map(id, rejected_endpoints))) == len(pool.endpoints):
+            raise LLMRequestError(f"Every endpoint of the pool rejected the request, the last one with: {cause}") from cause
+        return 0.0
+    if not isinstance(cause, STREAM_TRANSIENT_ERRORS):
+        pool.release(endpoint)
+        raise error
+    delay = get_rate_limiter(endpoint.base_url, endpoint.api_key).retry_delay(cause, attempt)
+    # Throttling is the rate limiter's business and does not count against the endpoint's health
+    pool.release(endpoint, failed=not isinstance(cause, openai.RateLimitError))
+    return delay
+
+
+def _get_pooled_screening_decision(prompt_string: str, pool: EndpointPool, use_cache: bool, system_message: str, stream: bool,
+                                   first_token_timeout: float, total_timeout: float,
+                                   required_keys: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    cache = get_response_cache() if use_cache else None
+    cached = _pooled_cached_response(cache, pool, system_message, prompt_string)
+    if cached is not None:
+        return cached
+
+    failed_endpoints, rejected_endpoints = [], []
+    for attempt in range(MAX_RETRIES + 1):
+        endpoint = pool.acquire(exclude=failed_endpoints + rejected_endpoints)
+        started = time.monotonic()
+        try:
+            response_content = _request_decision_content(prompt_string, endpoint.api_key, endpoint.base_url, endpoint.model, system_message,
+                                                         stream, first_token_timeout, total_timeout, max_retries=0, required_keys=required_keys)
+        except LLMRequestError as e:
+            delay = _release_failed_endpoint(pool, endpoint, e, attempt, rejected_endpoints)
+            if attempt == MAX_RETRIES:
+                raise LLMRequestError(f"API call still failing after {MAX_RETRIES} retries across the endpoint pool: {e}") from e
+            failed_endpoints.append(endpoint)
+            if len(set(map(id, failed_endpoints + rejected_endpoints))) == len(pool.endpoints):
+                # Every endpoint failed this request; back off before going round again
+                time.sleep(delay)
+                failed_endpoints = []
+            continue
+
+        # The latency includes the wait for the endpoint's rate limiter, so throttled endpoints count as slow
+        pool.release(endpoint, latency=time.monotonic() - started)
+        cache_key, _ = _cached_response(cache, endpoint.model, system_message, prompt_string)
+        return _store_response(cache, cache_key, _parse_response_content(response_content))
+
+
+def get_llm_text_response(prompt_string: str, api_key: str, base_url: str, model: str, use_cache: bool = True,
+                          system_message: str = EXTRACTION_SYSTEM_MESSAGE) -> str:
+    """
+    Sends a formatted prompt to the LLM API and returns the plain-text answer, e.g. the CSV line of a data extraction prompt.
+
+    Uses the same connection pool, rate limiter, retries and response cache as get_llm_screening_decision.
+
+    Args:
+        prompt_string: The complete, JSON-formatted prompt string for the LLM.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        system_message: The system message sent with the prompt.
+
+    Returns:
+        The stripped text of the LLM's answer.
+
+    Raises:
+        LLMRequestError: If the call fails permanently or keeps failing after all retries.
+    """
+    cache = get_response_cache() if use_cache else None
+    cache_key, cached = _cached_response(cache, model, system_message, prompt_string)
+    if cached is not None:
+        return cached["text"]
+    response_content = _request_chat_completion(prompt_string, api_key, base_url, model, system_message, json_mode=False)
+    return _store_response(cache, cache_key, {"text": (response_content or "").strip()})["text"]
+
+
+def _request_chat_completion(prompt_string: str, api_key: str, base_url: str, model: str, system_message: str, json_mode: bool,
+                             max_retries: int = MAX_RETRIES) -> str:
+    client = get_openai_client(api_key, base_url)
+    limiter = get_rate_limiter(base_url, api_key)
+
+    for attempt in range(max_retries + 1):
+        time.sleep(limiter.reserve())
+        started = time.monotonic()
+        try:
+            # The raw response gives access to the rate-limit headers
+            raw_response = client.chat.completions.with_raw_response.create(**_chat_completion_kwargs(prompt_string, model, system_message, json_mode))
+        except TRANSIENT_ERRORS as e:
+            _record_call(base_url, model, started, error=e)
+            if attempt == max_retries:
+                raise LLMRequestError(f"API call still failing after {max_retries} retries: {e}") from e
+            time.sleep(limiter.retry_delay(e, attempt))
+            continue
+        except Exception as e:
+            _record_call(base_url, model, started, error=e)
+            raise LLMRequestError(f"An API call error occurred: {e}") from e
+
+        limiter.on_success(raw_response.headers)
+        chat_completion = raw_response.parse()
+        _record_call(base_url, model, started, chat_completion=chat_completion)
+        return chat_completion.choices[0].message.content
+
+
+def _record_call(base_url: str, model: str, started: float, chat_completion: Optional[Any] = None, error: Optional[Exception] = None,
+                 prompt_string: str = "", system_message: str = "", response_content: str = "") -> None:
+    """
+    Logs one API attempt to the metrics of the current run, if a run was started with start_metrics_run.
+
+    Without a chat completion (streamed answers) the tokens are estimated from the prompt and the answer.
+    """
+    metrics = get_call_metrics()
+    if metrics is None:
+        return
+    latency = time.monotonic() - started
+    if error is not None:
+        metrics.record(base_url, model, latency, status=type(error).__name__)
+    elif chat_completion is not None and chat_completion.usage is not None:
+        metrics.record(base_url, model, latency, chat_completion.usage.prompt_tokens, chat_completion.usage.completion_tokens)
+    else:
+        metrics.record(base_url, model, latency, count_tokens(system_message) + count_tokens(prompt_string), count_tokens(response_content),
+                       usage_estimated=True)
+
+
+def _stream_timeout(first_token_timeout: float, total_timeout: float) -> httpx.Timeout:
+    # The read timeout bounds the wait for every chunk, including the first one
+    return httpx.Timeout(total_timeout, read=first_token_timeout)
+
+
+def _stream_delta(chunk: ChatCompletionChunk) -> str:
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def _request_chat_completion_streamed(prompt_string: str, api_key: str, base_url: str, model: str, system_message: str,
+                                      first_token_timeout: float, total_timeout: float, max_retries: int = MAX_RETRIES,
+                                      required_keys: Optional[Sequence[str]] = None) -> str:
+    client = get_openai_client(api_key, base_url)
+    limiter = get_rate_limiter(base_url, api_key)
+
+    for attempt in range(max_retries + 1):
+        time.sleep(limiter.reserve())
+        started = time.monotonic()
+        accumulator = JSONStreamAccumulator(required_keys)
+        try:
+            raw_response = client.chat.completions.with_raw_response.create(
+                **_chat_completion_kwargs(prompt_string, model, system_message, json_mode=True),
+                stream=True,
+                timeout=_stream_timeout(first_token_timeout, total_timeout)
+            )
+            limiter.on_success(raw_response.headers)
+            chunk_stream = raw_response.parse()
+            try:
+                for chunk in chunk_stream:
+                    delta = _stream_delta(chunk)
+                    if not delta:
+                        continue
+                    elapsed = time.monotonic() - started
+                    if not accumulator.text and elapsed > first_token_timeout:
+                        raise FirstTokenTimeout(f"No token within {first_token_timeout}s")
+                    if elapsed > total_timeout:
+                        raise StreamDeadlineExceeded(f"Response still generating after {total_timeout}s")
+                    if accumulator.feed(delta):
+                        break
+            finally:
+                # Closing the stream cancels the generation on the server
+                chunk_stream.close()
+        except STREAM_TRANSIENT_ERRORS as e:
+            _record_call(base_url, model, started, error=e)
+            if attempt == max_retries:
+                raise LLMRequestError(f"API call still failing after {max_retries} retries: {e}") from e
+            time.sleep(limiter.retry_delay(e, attempt))
+            continue
+        except Exception as e:
+            _record_call(base_url, model, started, error=e)
+            raise LLMRequestError(f"An API call error occurred: {e}") from e
+
+        _record_call(base_url, model, started, prompt_string=prompt_string, system_message=system_message, response_content=accumulator.text)
+        return accumulator.text
+
+
+async def get_llm_screening_decision_async(prompt_string: str, client: AsyncOpenAI, model: str, use_cache: bool = True,
+                                           system_message: str = SYSTEM_MESSAGE, stream: bool = False,
+                                           first_token_timeout: float = DEFAULT_FIRST_TOKEN_TIMEOUT,
+                                           total_timeout: float = DEFAULT_TOTAL_TIMEOUT,
+                                           required_keys: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Asynchronous counterpart of get_llm_screening_decision.
+
+    Args:
+        prompt_string: The complete, JSON-formatted prompt string for the LLM.
+        client: An AsyncOpenAI client shared by all concurrent requests.
+        model: The model to use for the LLM API request.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        system_message: The system message; see create_system_message for compact prompts.
+        stream: Whether to stream the answer and enforce the deadlines below.
+        first_token_timeout: Seconds until the first token must arrive (streaming only).
+        total_timeout: Seconds the whole answer may take (streaming only).
+        required_keys: Keys of the template's output_format (streaming only), see JSONStreamAccumulator.
+
+    Returns:
+        A dictionary parsed from the LLM's JSON response.
+
+    Raises:
+        LLMRequestError: If the call fails permanently, keeps failing after all
+            retries, exceeds `total_timeout`, or the response is not valid JSON.
+    """
+    cache = get_response_cache() if use_cache else None
+    cache_key, cached = _cached_response(cache, model, system_message, prompt_string)
+    if cached is not None:
+        return cached
+    if stream:
+        response_content = await _request_chat_completion_streamed_async(prompt_string, client, model, system_message,
+                                                                          first_token_timeout, total_timeout, required_keys=required_keys)
+    else:
+        response_content = await _request_chat_completion_async(prompt_string, client, model, system_message, json_mode=True)
+    return _store_response(cache, cache_key, _parse_response_content(response_content))
+
+
+def create_async_pool_clients(pool: EndpointPool, pool_size: int = DEFAULT_POOL_SIZE) -> Dict[Endpoint, AsyncOpenAI]:
+    """
+    Creates one AsyncOpenAI client per endpoint of the pool, for use with get_pooled_screening_decision_async.
+
+    Like create_async_openai_client, the clients belong to the running event loop; close them at the end of the run.
+    """
+    return {endpoint: create_async_openai_client(endpoint.api_key, endpoint.base_url, pool_size) for endpoint in pool.endpoints}
+
+
+async def get_pooled_screening_decision_async(prompt_string: str, pool: EndpointPool, clients: Dict[Endpoint, AsyncOpenAI], use_cache: bool = True,
+                                              system_message: str = SYSTEM_MESSAGE, stream: bool = False,
+                                              first_token_timeout: float = DEFAULT_FIRST_TOKEN_TIMEOUT,
+                                              total_timeout: float = DEFAULT_TOTAL_TIMEOUT,
+                                              required_keys: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Asynchronous counterpart of get_llm_screening_decision with a `pool`.
+
+    Args:
+        prompt_string: The complete, JSON-formatted prompt string for the LLM.
+        pool: The EndpointPool to route the request through.
+        clients: The clients of the pool's endpoints, see create_async_pool_clients.
+
+    The remaining arguments are those of get_llm_screening_decision_async.
+    """
+    cache = get_response_cache() if use_cache else None
+    cached = _pooled_cached_response(cache, pool, system_message, prompt_string)
+    if cached is not None:
+        return cached
+
+    failed_endpoints, rejected_endpoints = [], []
+    for attempt in range(MAX_RETRIES + 1):
+        endpoint = pool.acquire(exclude=failed_endpoints + rejected_endpoints)
+        client = clients[endpoint]
+        started = time.monotonic()
+        try:
+            if stream:
+                response_content = await _request_chat_completion_streamed_async(prompt_string, client, endpoint.model, system_message,
+                                                                                  first_token_timeout, total_timeout, max_retries=0,
+                                                                                  required_keys=required_keys)
+            else:
+                response_content = await _request_chat_completion_async(prompt_string, client, endpoint.model, system_message,
+                                                                        json_mode=True, max_retries=0)
+        except LLMRequestError as e:
+            delay = _release_failed_endpoint(pool, endpoint, e, attempt, rejected_endpoints)
+            if attempt == MAX_RETRIES:
+                raise LLMRequestError(f"API call still failing after {MAX_RETRIES} retries across the endpoint pool: {e}") from e
+            failed_endpoints.append(endpoint)
+            if len(set(map(id, failed_endpoints + rejected_endpoints))) == len(pool.endpoints):
+                await asyncio.sleep(delay)
+                failed_endpoints = []
+            continue
+
+        pool.release(endpoint, latency=time.monotonic() - started)
+        cache_key, _ = _cached_response(cache, endpoint.model, system_message, prompt_string)
+        return _store_response(cache, cache_key, _parse_response_content(response_content))
+
+
+async def get_llm_text_response_async(prompt_string: str, client: AsyncOpenAI, model: str, use_cache: bool = True,
+                                      system_message: str = EXTRACTION_SYSTEM_MESSAGE) -> str:
+    """
+    Asynchronous counterpart of get_llm_text_response.
+    """
+    cache = get_response_cache() if use_cache else None
+    cache_key, cached = _cached_response(cache, model, system_message, prompt_string)
+    if cached is not None:
+        return cached["text"]
+    response_content = await _request_chat_completion_async(prompt_string, client, model, system_message, json_mode=False)
+    return _store_response(cache, cache_key, {"text": (response_content or "").strip()})["text"]
+
+
+async def _request_chat_completion_async(prompt_string: str, client: AsyncOpenAI, model: str, system_message: str, json_mode: bool,
+                                         max_retries: int = MAX_RETRIES) -> str:
+    limiter = get_rate_limiter(str(client.base_url), client.api_key)
+
+    for attempt in range(max_retries + 1):
+        await asyncio.sleep(limiter.reserve())
+        started = time.monotonic()
+        try:
+            raw_response = await client.chat.completions.with_raw_response.create(**_chat_completion_kwargs(prompt_string, model, system_message, json_mode))
+        except TRANSIENT_ERRORS as e:
+            _record_call(str(client.base_url), model, started, error=e)
+            if attempt == max_retries:
+                raise LLMRequestError(f"API call still failing after {max_retries} retries: {e}") from e
+            await asyncio.sleep(limiter.retry_delay(e, attempt))
+            continue
+        except Exception as e:
+            _record_call(str(client.base_url), model, started, error=e)
+            raise LLMRequestError(f"An API call error occurred: {e}") from e
+
+        limiter.on_success(raw_response.headers)
+        chat_completion = raw_response.parse()
+        _record_call(str(client.base_url), model, started, chat_completion=chat_completion)
+        return chat_completion.choices[0].message.content
+
+
+async def _request_chat_completion_streamed_async(prompt_string: str, client: AsyncOpenAI, model: str, system_message: str,
+                                                  first_token_timeout: float, total_timeout: float, max_retries: int = MAX_RETRIES,
+                                                  required_keys: Optional[Sequence[str]] = None) -> str:
+    limiter = get_rate_limiter(str(client.base_url), client.api_key)
+
+    for attempt in range(max_retries + 1):
+        await asyncio.sleep(limiter.reserve())
+        started = time.monotonic()
+        deadline = started + total_timeout
+        accumulator = JSONStreamAccumulator(required_keys)
+        try:
+            raw_response = await client.chat.completions.with_raw_response.create(
+                **_chat_completion_kwargs(prompt_string, model, system_message, json_mode=True),
+                stream=True,
+                timeout=_stream_timeout(first_token_timeout, total_timeout)
+            )
+            limiter.on_success(raw_response.headers)
+            chunk_stream = raw_response.parse()
+            chunks = chunk_stream.__aiter__()
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    # Until the first token arrives, the shorter time-to-first-token deadline applies
+                    wait = min(first_token_timeout, remaining) if not accumulator.text else remaining
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(wait, 0))
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        if not accumulator.text and remaining > first_token_timeout:
+                            raise FirstTokenTimeout(f"No token within {first_token_timeout}s")
+                        raise StreamDeadlineExceeded(f"Response still generating after {total_timeout}s")
+                    if accumulator.feed(_stream_delta(chunk)):
+                        break
+            finally:
+                # Closing the stream cancels the generation on the server
+                await chunk_stream.close()
+        except STREAM_TRANSIENT_ERRORS as e:
+            _record_call(str(client.base_url), model, started, error=e)
+            if attempt == max_retries:
+                raise LLMRequestError(f"API call still failing after {max_retries} retries: {e}") from e
+            await asyncio.sleep(limiter.retry_delay(e, attempt))
+            continue
+        except Exception as e:
+            _record_call(str(client.base_url), model, started, error=e)
+            raise LLMRequestError(f"An API call error occurred: {e}") from e
 
-    except json.JSONDecodeError:
-        return {
-            "error": "Failed to decode JSON from LLM response.",
-            "raw_response": response_content
-        }
-    except Exception as e:
-        return {
-            "error": f"An API call error occurred: {e}"
-        }
-    
+        _record_call(str(client.base_url), model, started, prompt_string=prompt_string, system_message=system_message,
+                     response_content=accumulator.text)
+        return accumulator.text
@@ -1,34 +1,20 @@
 import pandas as pd
-from pathlib import Path
+from llm_systematic_review.title_matching import DEFAULT_MIN_SCORE, join_covidence_zotero
+from llm_systematic_review.zotero_index import DEFAULT_CACHE_PATH, ZoteroFileIndex
 
 covidence_df = pd.read_csv("data/review_581959_screen_csv_20250603221248.csv") #data for full text screening
 
-# Constructing dataframe with files from Zotero
-zotero_df = pd.DataFrame(columns=["title_zotero", "authors", "year", "path"])
+# Constructing dataframe with files from Zotero; folders unchanged since the last run come from the cache
+zotero_index = ZoteroFileIndex("data/test_conversion/PDF", cache_path=DEFAULT_CACHE_PATH)
+zotero_df = zotero_index.scan()
+print(f"{len(zotero_df)} Zotero files, {zotero_index.rescanned_folders} folders rescanned")
 
-root_directory = "data/test_conversion/PDF"
-root_path = Path(root_directory)
-
-# Iterate through all subdirectories (numbered folders)
-for folder_path in sorted(root_path.iterdir()):
-    # Scan for txt files in the current folder
-    for file_path in folder_path.iterdir():
-        if file_path.suffix.lower() == '.txt':
-            # Remove '_ocr' from the filename if present
-            clean_name = file_path.name.replace('_ocr.txt', '')
-            authors, year, title = clean_name.split(" - ")[:3]
-            zotero_df = zotero_df.append({
-                "title_zotero": title.strip(),
-                "authors": authors.strip(),
-                "year": year.strip(),
-                "path": str(file_path)
-            }, ignore_index=True)
-
-max_title_length = max(zotero_df['title_zotero'].str.len())
-
-covidence_df['cropped_title'] = covidence_df['Title'].str[:max_title_length]
-# Merging the two dataframes on the cropped title
-merged_df = pd.merge(covidence_df, zotero_df, left_on='cropped_title', right_on='title_zotero', how='left')
+# Matching by fuzzy title (the file names carry no DOI): Zotero truncates and sanitizes
+# titles in its file names, so exact merges on the title miss most articles
+merged_df = join_covidence_zotero(covidence_df, zotero_df)
+print(f"{merged_df['path'].notna().sum()} of {len(merged_df)} Covidence records matched to a Zotero file")
+# Matches just above the threshold are worth a look
+print(merged_df.loc[merged_df['match_confidence'].between(DEFAULT_MIN_SCORE, 0.95), ['Title', 'title_zotero', 'match_confidence']])
 
 # Saving the merged dataframe to a CSV file
 output_path = "data/merged_zotero_covidence_full_text.csv"
@@ -7,15 +7,27 @@ Created on Fri Jun 13 14:04:10 2025
 import pandas as pd
 import numpy as np
 
-import matplotlib.pyplot as plt
-from sklearn.metrics import confusion_matrix, ConfusionMatrixDisplay
-    
-df = pd.read_csv("data/human_llm_title_abstract_second_version.csv")
+from llm_systematic_review.agreement_metrics import agreement_metrics, llm_criterion_pairs
+from llm_systematic_review.confusion_report import render_reports
 
-cm = confusion_matrix(df['Sofiyas_decision'], df['llm_final_decision_bin'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for the final inclusion decision (second version)")
-plt.savefig('conf_matrices/final_decision_second_ver.png')
-plt.show()
+# Joined human/LLM decisions of every run to report on; the figures are rendered headless
+# in one batch, so add new runs here and rerun instead of regenerating them by hand
+joined_files = {
+    "second_ver": "data/human_llm_title_abstract_second_version.csv"
+}
+# Human columns of the single criteria; criteria only appear once their llm_ic_*/llm_ec_*
+# columns have a human counterpart here
+human_columns = {}
+
+reports = {}
+for run_name, path in joined_files.items():
+    df = pd.read_csv(path)
+    # Kappa, sensitivity, specificity and WSS with 95% bootstrap intervals
+    pairs = llm_criterion_pairs(df, human_columns, final_decision=('Sofiyas_decision', 'llm_final_decision_bin'))
+    reports[run_name] = agreement_metrics(df, pairs, n_bootstrap=10000)
+    print(run_name)
+    print(reports[run_name].T)
+    reports[run_name].to_csv(f'conf_matrices/agreement_{run_name}.csv')
+
+render_reports(reports, output_dir='conf_matrices', pdf_path='conf_matrices/confusion_matrices.pdf',
+               html_path='conf_matrices/confusion_matrices.html')
@@ -7,8 +7,8 @@ Created on Fri Jun 13 14:04:10 2025
 import pandas as pd
 import numpy as np
 
-import matplotlib.pyplot as plt
-from sklearn.metrics import confusion_matrix, ConfusionMatrixDisplay
+from llm_systematic_review.agreement_metrics import agreement_metrics, llm_criterion_pairs
+from llm_systematic_review.confusion_report import ConfusionMatrixReport
     
 human = pd.read_excel("data/subset_50_title_abstract_screened_caro.xlsm")
 llm = pd.read_csv("data/llm_title_abstract_50.csv")
@@ -40,50 +40,17 @@ joint_df['human_llm_diff']= np.where(joint_df['Decision logical']!=joint_df['llm
 
 joint_df.to_csv('data/caro_llm_title_abstract_50_joint.csv', index = False)
 
-cm = confusion_matrix(human['Decision logical'], llm['llm_final_decision'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for the final inclusion decision")
-plt.savefig('conf_matrices/final_decision.png')
-plt.show()
-
-cm_hp = confusion_matrix(human['human_human_participants'], llm['llm_ic_1_population.decision'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm_hp)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for human participants' presence in the study")
-plt.savefig('conf_matrices/human_participants.png')
-plt.show()
-
-cm_ip = confusion_matrix(human['human_involves_persuasion'], llm['llm_ic_2_intervention.decision'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm_ip)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for persuasion presence in the study")
-plt.savefig('conf_matrices/persuasion.png')
-plt.show()
-
-cm_aip = confusion_matrix(human['human_persuasion_is_ai'], llm['llm_ic_3_technology.decision'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm_aip)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for AI persuasion detection")
-plt.savefig('conf_matrices/ai_persuasion.png')
-plt.show()
-
-cm_emp = confusion_matrix(~(human['human_is_theoretical']), llm['llm_ic_4_study_type.decision'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm_emp)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for empiciral studies detection")
-plt.savefig('conf_matrices/empirical_studies.png')
-plt.show()
-
-cm_mar = confusion_matrix(human['human_is_marketing'], llm['llm_ec_1_domain.decision'])
-fig, ax = plt.subplots()
-disp = ConfusionMatrixDisplay(confusion_matrix=cm_mar)
-disp.plot(ax=ax)
-ax.set_title("Confusion matrix for the marketing articles detection")
-plt.savefig('conf_matrices/marketing_articles.png')
-plt.show()
\ No newline at end of file
+# All criteria at once, with 95% bootstrap intervals
+joint_df['human_is_empirical'] = ~(joint_df['human_is_theoretical'])
+human_columns = {'llm_ic_1_population': 'human_human_participants',
+                 'llm_ic_2_intervention': 'human_involves_persuasion',
+                 'llm_ic_3_technology': 'human_persuasion_is_ai',
+                 'llm_ic_4_study_type': 'human_is_empirical',
+                 'llm_ec_1_domain': 'human_is_marketing'}
+pairs = llm_criterion_pairs(joint_df, human_columns, final_decision=('Decision logical', 'llm_final_decision'))
+agreement = agreement_metrics(joint_df, pairs, n_bootstrap=10000)
+print(agreement.T)
+agreement.to_csv('conf_matrices/agreement_pilot.csv')
+
+# One headless figure with a panel per criterion instead of a window per criterion
+ConfusionMatrixReport().save(agreement, 'conf_matrices/pilot_criteria.png', "LLM vs. human decisions (pilot, 50 articles)")
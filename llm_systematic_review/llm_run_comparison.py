@@ -0,0 +1,26 @@
+from llm_systematic_review.run_comparison import RunComparison
+import pandas as pd
+
+# Compares the decisions of any number of title/abstract runs (prompt versions, models)
+# on the articles they share. Add the output CSV of every new run to run_files.
+
+run_files = {
+    "first_version": "data/llm_title_abstract_first_version.csv",
+    "second_version": "data/llm_title_abstract_second_version.csv"
+}
+
+comparison = RunComparison.from_files(run_files)
+print(f"{len(comparison.run_names)} runs, {len(comparison.covidence_numbers)} articles, criteria: {comparison.criteria}")
+
+# Share of agreeing final decisions and Cohen's kappa for every pair of runs
+print(comparison.agreement_matrix().round(3))
+print(comparison.agreement_matrix(statistic="kappa").round(3))
+
+pairwise = comparison.pairwise_table()
+pd.set_option('display.width', 200)
+print(pairwise.drop(columns=["precision", "accuracy"]).round(3).to_string(index=False))
+pairwise.to_csv("conf_matrices/run_comparison.csv", index=False)
+
+# Articles whose final decision changed between the first two runs
+first_run, second_run = comparison.run_names[:2]
+comparison.disagreements(first_run, second_run).to_csv(f"data/disagreements_{first_run}_{second_run}.csv")
@@ -0,0 +1,48 @@
+from llm_systematic_review.call_metrics import estimate_run, template_name
+from llm_systematic_review.extraction_runner import EXTRACTION_PARTS
+from llm_systematic_review.full_text_chunking import build_full_text_prompts
+from llm_systematic_review.helpers import EXTRACTION_SYSTEM_MESSAGE, create_llm_full_text_prompt_string, create_system_message
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.screening_engine import build_title_abstract_prompts
+import pandas as pd
+
+# Predicts the tokens and wall time of the screening and extraction runs from their input
+# CSVs before anything is sent. Set history_path to the metrics file of an earlier run
+# (data/llm_call_metrics/*.jsonl) to use its measured answer lengths and latencies.
+
+title_abstract_csv = "data/sofiyas_title_abstract_scr.csv"
+full_text_csv = "data/merged_zotero_covidence_full_text.csv"
+history_path = None
+max_concurrency = 8
+requests_per_second = None # the endpoint's rate limit, if known
+encoding = "pretty"
+
+articles = pd.read_csv(title_abstract_csv)
+articles['Published Year'] = articles['Published Year'].astype(str)
+full_text_articles = pd.read_csv(full_text_csv).dropna(subset=['path'])
+
+
+def read_full_texts():
+    for covidence_number, path in full_text_articles[['Covidence #', 'path']].itertuples(index=False):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield covidence_number, f.read()
+
+
+estimates = []
+prompt_template = PromptTemplates.PROMPT_TITLE_ABSTRACT
+estimates.append(estimate_run(build_title_abstract_prompts(articles, prompt_template, encoding), create_system_message(prompt_template, encoding),
+                              template_name(prompt_template), max_concurrency, history_path, requests_per_second))
+
+full_texts = list(read_full_texts())
+prompt_template = PromptTemplates.PROMPT_FULL_TEXT
+# Long full texts are screened in several chunk requests
+prompts = [prompt_string for covidence_number, full_text in full_texts for prompt_string in build_full_text_prompts(prompt_template, covidence_number, full_text)]
+estimates.append(estimate_run(prompts, create_system_message(prompt_template), template_name(prompt_template), max_concurrency, history_path, requests_per_second))
+
+for prompt_template, _ in EXTRACTION_PARTS:
+    prompts = [create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text) for covidence_number, full_text in full_texts]
+    estimates.append(estimate_run(prompts, EXTRACTION_SYSTEM_MESSAGE, template_name(prompt_template), max_concurrency, history_path, requests_per_second))
+
+estimates_df = pd.DataFrame(estimates)
+print(estimates_df.to_string(index=False))
+print(f"Total: {estimates_df['total_tokens'].sum():,} tokens, {estimates_df['wall_time_s'].sum() / 3600:.1f} h if run one after another")
@@ -1,6 +1,8 @@
 from instance.config import api_key
 from llm_systematic_review.helpers import *
 from llm_systematic_review.prompt_config import *
+from llm_systematic_review.extraction_runner import extract_articles, reextract_invalid
+from llm_systematic_review.call_metrics import start_metrics_run, stop_metrics_run, summarize_call_metrics
 import io
 import pandas as pd
 import time
@@ -22,124 +24,24 @@ filtered_df = filtered_df.head(1)
 base_url = "https://chat-ai.academiccloud.de/v1"
 model = "llama-3.3-70b-instruct"
 
-# Loop number 1
-
-results_1 = []
-
-for idx, row in filtered_df.iterrows():
-    covidence_number = row['Covidence #']
-    path = row['path']
-    with open(path, 'r', encoding='utf-8') as f:
-        full_text = f.read()
-    prompt_template = PromptTemplates.PROMPT_EXTRACTION_PT_1
-    prompt_string = create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text)
-    llm_response = get_llm_screening_decision(prompt_string, api_key, base_url, model)
-    results_1.append(llm_response.strip())
-    time.sleep(1)
-
-# Prepare DataFrame from CSV
-columns_pt_1 = [
-    "covidence_number",
-    "study_objectives",
-    "location",
-    "sample_age",
-    "sample_gender_distribution",
-    "sample_education_level",
-    "interactive",
-    "interaction_description",
-    "domain",
-    "informed_participants",
-    "disclosure_delivery"
-]
-
-with open('llm_data_extraction_pt_1.csv', 'w', encoding='utf-8') as f:
-    f.write(",".join(columns) + '\n')
-    for line in results_1:
-        f.write(line + '\n')
-
-# Convert results (list of CSV lines) to DataFrame
-pt_1_df = pd.read_csv('llm_data_extraction_pt_1.csv', dtype={'covidence_number': str})
-
-# Loop number 2
-
-results_2 = []
-
-for idx, row in articles.iterrows():
-    covidence_number = row['Covidence #']
-    path = row['path']
-    with open(path, 'r', encoding='utf-8') as f:
-        full_text = f.read()
-    prompt_template = PromptTemplates.PROMPT_EXTRACTION_PT_2
-    prompt_string = create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text)
-    llm_response = get_llm_screening_decision(prompt_string, api_key, base_url, model)
-    results_2.append(llm_response.strip())
-    time.sleep(2)
-
-# Prepare DataFrame from CSV
-columns_pt_2 = [
-    "covidence_number",
-    "prompt_availability",
-    "prompt_extract",
-    "prompt_location",
-    "pers_prompt_content",
-    "discouragement_of_disclosure",
-    "participant_instr_avail",
-    "participant_instr",
-    "pers_nature_in_instr"
-]
-
-with open('llm_data_extraction_pt_2.csv', 'w', encoding='utf-8') as f:
-    f.write(",".join(columns_pt_2) + '\n')
-    for line in results_2:
-        f.write(line + '\n')
-
-# Convert results (list of CSV lines) to DataFrame
-pt_2_df = pd.read_csv('llm_data_extraction_pt_2.csv', dtype={'covidence_number': str})
-
-# Loop number 3
-
-results_3 = []
-
-for idx, row in articles.iterrows():
-    covidence_number = row['Covidence #']
-    path = row['path']
-    with open(path, 'r', encoding='utf-8') as f:
-        full_text = f.read()
-    prompt_template = PromptTemplates.PROMPT_EXTRACTION_PT_3
-    prompt_string = create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text)
-    llm_response = get_llm_screening_decision(prompt_string, api_key, base_url, model)
-    results_3.append(llm_response.strip())
-    time.sleep(3)
-
-# Prepare DataFrame from CSV
-columns_pt_3 = [
-    "covidence_number",
-    "debriefing_reported",
-    "debriefing_discloses_ai",
-    "debriefing_discloses_pers",
-    "debriefing_extract",
-    "ai_system_used",
-    "study_design_type",
-    "study_setting",
-    "ethical_approval_reported"
-]
-
-with open('llm_data_extraction_pt_3.csv', 'w', encoding='utf-8') as f:
-    f.write(",".join(columns_pt_3) + '\n')
-    for line in results_3:
-        f.write(line + '\n')
-
-# Convert results (list of CSV lines) to DataFrame
-pt_3_df = pd.read_csv('llm_data_extraction_pt_3.csv', dtype={'covidence_number': str})
-
-
-# Combine all DataFrames based on 'covidence_number'
-
-merged_df = pt_1_df.merge(pt_2_df, on="covidence_number", how="outer", suffixes=('_pt1', '_pt2'))
-merged_df = merged_df.merge(pt_3_df, on="covidence_number", how="outer", suffixes=('', '_pt3'))
+max_concurrency = 8 # number of requests in flight at the same time
+
+# The three extraction prompts run concurrently for every article, reading each full text once.
+# Validated rows are written to the Parquet dataset directory as they arrive, one readable file
+# per 50 rows; answers that stay malformed are listed in data/llm_data_extraction_invalid.jsonl.
+# Set rerequest_invalid to request only those parts again and merge them into the dataset.
+output_path = "data/llm_data_extraction.parquet"
+rerequest_invalid = False
+metrics = start_metrics_run()
+if rerequest_invalid:
+    merged_df = reextract_invalid(filtered_df, api_key, base_url, model, output_path, max_concurrency)
+else:
+    merged_df = extract_articles(filtered_df, api_key, base_url, model, max_concurrency, output_path=output_path)
+stop_metrics_run()
+print(summarize_call_metrics(metrics.path))
 
 # Join with the original filtered DataFrame to include paths and other metadata
-merged_df = merged_df.merge(filtered_df, left_on='covidence_number', right_on='Covidence #', how='left')
+merged_df = merged_df.merge(filtered_df.astype({'Covidence #': str}), left_on='covidence_number', right_on='Covidence #', how='left')
 
 # Save the merged DataFrame
 merged_df.to_csv("data/llm_data_extraction_all.csv", index=False)
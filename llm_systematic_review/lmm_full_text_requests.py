@@ -1,6 +1,8 @@
 from instance.config import api_key
 from llm_systematic_review.helpers import *
 from llm_systematic_review.prompt_config import *
+from llm_systematic_review.full_text_chunking import screen_full_texts
+from llm_systematic_review.call_metrics import start_metrics_run, stop_metrics_run, summarize_call_metrics
 import io
 import pandas as pd
 import time
@@ -16,20 +18,21 @@ articles = articles.head(1)
 base_url = "https://chat-ai.academiccloud.de/v1"
 model = "llama-3.3-70b-instruct"
 
-results = []
+max_concurrency = 8 # number of requests in flight at the same time
+max_chunk_tokens = 12000 # longer full texts are split into chunks of at most this many tokens
+stream = True # stream the answers, cancelling generations that stall or run past the deadline
 
-for idx, row in articles.iterrows():
-    covidence_number = row['Covidence #']
-    path = row['path']
-    with open(path, 'r', encoding='utf-8') as f:
-        full_text = f.read()
-    prompt_template = PromptTemplates.PROMPT_FULL_TEXT
-    prompt_string = create_llm_full_text_prompt_string(prompt_template, covidence_number, full_text)
-    llm_response = get_llm_screening_decision(prompt_string, api_key, base_url, model)
-    time.sleep(1)
+metrics = start_metrics_run()
+prompt_template = PromptTemplates.PROMPT_FULL_TEXT
+results = screen_full_texts(articles, prompt_template, api_key, base_url, model, max_chunk_tokens, max_concurrency, stream=stream)
 
-    results.append(llm_response)
+failed = articles.loc[[llm_response is None for llm_response in results], 'Covidence #']
+if len(failed) > 0:
+    print(f"{len(failed)} articles could not be screened: {failed.tolist()}")
 
-final_df = pd.json_normalize(results)
+stop_metrics_run()
+print(summarize_call_metrics(metrics.path))
+
+final_df = pd.json_normalize([llm_response for llm_response in results if llm_response is not None])
 
 final_df.to_csv("data/llm_full_text_50.csv", index=False)
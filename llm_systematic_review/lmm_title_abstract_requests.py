@@ -1,43 +1,92 @@
 from instance.config import api_key
 from llm_systematic_review.helpers import *
 from llm_systematic_review.prompt_config import *
+from llm_systematic_review.screening_engine import screen_articles
+from llm_systematic_review.batch_screening import screen_articles_batched
+from llm_systematic_review.response_cache import get_response_cache
+from llm_systematic_review.endpoint_pool import EndpointPool
+from llm_systematic_review.call_metrics import start_metrics_run, stop_metrics_run, summarize_call_metrics
+from llm_systematic_review.prescreen_cascade import load_labelled_articles, screen_articles_cascade, train_prescreen
+from llm_systematic_review.rule_prefilter import RulePrefilter
 import io
 import pandas as pd
 import time
 
 articles = pd.read_csv("data/sofiyas_title_abstract_scr.csv")
 articles['Published Year']=articles['Published Year'].astype(str)
-articles = articles[['Title', 'Abstract', 'Published Year', 'Covidence #']]
-articles = articles.tail(277) #let's do the first half, then the second one
+# DOI and Authors are only read by the prefilter's duplicate rule, never sent to the LLM
+articles = articles[['Title', 'Abstract', 'Published Year', 'Covidence #', 'DOI', 'Authors']]
 
  
 # API configuration (except for api_key)
 base_url = "https://chat-ai.academiccloud.de/v1"
 model = "llama-3.3-70b-instruct"
 
-results = []
+max_concurrency = 8 # number of requests in flight at the same time
+use_cache = True # set to False to force fresh requests instead of reusing cached responses
+# Every response is appended here as it arrives; rerunning the script after a crash skips the articles already in it
+journal_path = "data/llm_title_abstract_journal.jsonl"
+# 'pretty' keeps the original prompt format, 'compact' sends minified prompts with the criteria in the system message
+encoding = "pretty"
+# Articles per request; with more than 1, the criteria are sent once per batch instead of once per article
+batch_size = 1
+# To spread the requests over several endpoints or API keys, list them here (weight ~ quota), e.g.
+# endpoints = [{"base_url": base_url, "api_key": api_key, "model": model, "weight": 2},
+#              {"base_url": other_base_url, "api_key": other_api_key, "model": model}]
+endpoints = None
+pool = EndpointPool.from_config(endpoints) if endpoints else None
+# Cascade mode: a TF-IDF classifier trained on earlier decisions excludes the clear-cut records
+# and only the rest goes to the LLM; meant for new records, not the ones it was trained on
+cascade = False
+cascade_training_files = ["data/human_llm_title_abstract_second_version.csv"]
+cascade_target_recall = 0.98
+# Records without an abstract, outside the year range or duplicating a decided record are
+# excluded (or copied) locally, tagged 'decided_by': 'rule', and never sent; None disables the stage
+prefilter = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT, min_year=None, max_year=None)
+
+# Every API call (tokens, latency, endpoint) is logged to a new file in data/llm_call_metrics
+metrics = start_metrics_run()
 
 start = time.time()
 
-for _, article in articles.iterrows():
-    title, abstract, year, covidence_number = article.tolist()
-
-    prompt_template = PromptTemplates.PROMPT_TITLE_ABSTRACT
-    prompt_string = create_llm_abs_title_prompt_string(prompt_template, title, abstract, year, covidence_number)
-    llm_response = get_llm_screening_decision(prompt_string, api_key, base_url, model)
-    time.sleep(1)
-
-    results.append(llm_response)
+prompt_template = PromptTemplates.PROMPT_TITLE_ABSTRACT
+if cascade:
+    classifier, threshold, cascade_recall_report = train_prescreen(load_labelled_articles(cascade_training_files), cascade_target_recall)
+    # Recall of the human includes and share of calls saved on the cross-validated human labels, per threshold
+    print(cascade_recall_report.to_string(index=False))
+    print(f"Using threshold {threshold:.3f}")
+    results = screen_articles_cascade(articles, prompt_template, api_key, base_url, model, classifier, threshold,
+                                      max_concurrency=max_concurrency, use_cache=use_cache, journal_path=journal_path, encoding=encoding, pool=pool,
+                                      prefilter=prefilter)
+elif batch_size > 1:
+    results = screen_articles_batched(articles, prompt_template, api_key, base_url, model, batch_size,
+                                      max_concurrency=max_concurrency, use_cache=use_cache, journal_path=journal_path, encoding=encoding, pool=pool,
+                                      prefilter=prefilter)
+else:
+    results = screen_articles(articles, prompt_template, api_key, base_url, model, max_concurrency, use_cache, journal_path, encoding, pool, prefilter)
     
 end = time.time()
 
+if use_cache:
+    print(get_response_cache().stats())
+if pool is not None:
+    print(pd.DataFrame(pool.stats()))
+stop_metrics_run()
+print(summarize_call_metrics(metrics.path))
+
 end-start
 
-final_df = pd.json_normalize(results)
+# Failed requests come back as None and are reported instead of being written as error rows
+failed = articles.loc[[llm_response is None for llm_response in results], 'Covidence #']
+if len(failed) > 0:
+    print(f"{len(failed)} articles could not be screened: {failed.tolist()}")
+
+final_df = pd.json_normalize([llm_response for llm_response in results if llm_response is not None])
 
-final_df.to_csv("data/llm_title_abstract_third_part_2nd_try.csv", index=False)
+final_df.to_csv("data/llm_title_abstract_journaled_run.csv", index=False)
 
 
+# Stitching of the part files from the interrupted second-version runs (before runs were journaled)
 first_part = pd.read_csv("data/llm_title_abstract_first_part_2nd_try.csv")
 second_part = pd.read_csv("data/llm_title_abstract_second_part_2nd_try.csv")
 third_part = pd.read_csv("data/llm_title_abstract_third_part_2nd_try.csv")
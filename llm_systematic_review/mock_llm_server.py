@@ -0,0 +1,263 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Marker after which create_system_message puts the template in compact mode
+_COMPACT_INSTRUCTIONS_MARKER = "Instructions, criteria and output format: "
+
+
+def _seeded_random(*parts: str) -> random.Random:
+    # Answers depend only on the prompt, so repeated runs see the same decisions
+    return random.Random(hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest())
+
+
+def _loads_or_none(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def _fill_output_format(output_format: Dict[str, Any], covidence_number: Any, rng: random.Random) -> Dict[str, Any]:
+    """
+    Fills a screening output_format with random Yes/No decisions and the matching final decision.
+    """
+    decision = {"covidence_number": covidence_number}
+    criteria_met = {}
+    for group in ("inclusion_criteria_evaluation", "exclusion_criteria_evaluation"):
+        decision[group] = {}
+        for criterion in output_format.get(group, {}):
+            answer = "Yes" if rng.random() < (0.7 if group == "inclusion_criteria_evaluation" else 0.2) else "No"
+            criteria_met[(group, criterion)] = answer == "Yes"
+            decision[group][criterion] = {"reasoning": f"Mock reasoning for {criterion}.", "decision": answer}
+    include = (all(met for (group, _), met in criteria_met.items() if group == "inclusion_criteria_evaluation")
+               and not any(met for (group, _), met in criteria_met.items() if group == "exclusion_criteria_evaluation"))
+    decision["final_decision"] = "Include" if include else "Exclude"
+    return decision
+
+
+def _extraction_line(prompt: Dict[str, Any], rng: random.Random) -> str:
+    covidence_number = prompt.get("input_format", {}).get("covidence_number", "")
+    values = [str(covidence_number)]
+    for item in prompt["data_extraction_items"][1:]:
+        values.append(rng.choice(["Not Reported", "Yes", "No", f"Mock value for {item['column_name']}, with a comma"]))
+    return ",".join(f'"{value}"' if "," in value else value for value in values)
+
+
+def mock_completion_content(system_message: str, user_message: str) -> str:
+    """
+    Returns a plausible answer to a prompt built from one of the PromptTemplates entries.
+
+    Understands pretty and compact title/abstract and full-text prompts (a JSON
+    decision in the template's output format), pretty and compact batched
+    title/abstract prompts (one decision per article in 'results') and data
+    extraction prompts (a CSV line with one value per extraction item).
+    """
+    rng = _seeded_random(system_message, user_message)
+    prompt = _loads_or_none(user_message) or {}
+
+    if "data_extraction_items" in prompt:
+        return _extraction_line(prompt, rng)
+
+    if "input_articles" in prompt:
+        output_format = prompt["output_format"]["results"][0]
+        results = [_fill_output_format(output_format, article.get("covidence_number"), rng) for article in prompt["input_articles"]]
+        return json.dumps({"results": results})
+
+    if isinstance(prompt, list):
+        # Compact batched prompts: a list of articles with short keys, the batch template in the system message
+        _, _, instructions = system_message.partition(_COMPACT_INSTRUCTIONS_MARKER)
+        template = _loads_or_none(instructions.split("\n", 1)[0]) or {}
+        output_format = template.get("output_format", {}).get("results", [{}])[0]
+        return json.dumps({"results": [_fill_output_format(output_format, article.get("id"), rng) for article in prompt]})
+
+    if "output_format" in prompt:
+        output_format = prompt["output_format"]
+        covidence_number = prompt.get("input_article", {}).get("covidence_number")
+    else:
+        # Compact prompts: the template is in the system message and the article uses short keys
+        _, _, instructions = system_message.partition(_COMPACT_INSTRUCTIONS_MARKER)
+        template = _loads_or_none(instructions.split("\n", 1)[0]) or {}
+        output_format = template.get("output_format", {})
+        covidence_number = prompt.get("id")
+    return json.dumps(_fill_output_format(output_format, covidence_number, rng))
+
+
+class MockLLMServer:
+    """
+    A local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+    Answers POST /v1/chat/completions (plain and streamed) and GET /v1/models
+    after a simulated latency, and injects server errors and 429s at the
+    configured rates. Responses carry OpenAI-style rate-limit headers for a
+    per-minute quota, which the adaptive rate limiter follows. Every request is
+    recorded in `request_log`.
+
+    Usage:
+        with MockLLMServer(latency=0.5) as server:
+            screen_articles(articles, template, "mock-key", server.base_url, "mock-model")
+    """
+
+    def __init__(self, latency: float = 0.5, latency_jitter: float = 0.2, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 requests_per_minute: int = 6000, retry_after: float = 1.0, stream_chunk_chars: int = 16,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency: Mean seconds from request to (the first token of) the answer.
+            latency_jitter: Maximum deviation from `latency`, drawn uniformly.
+            error_rate: Share of requests answered with a 500.
+            rate_limit_rate: Share of requests answered with a 429, on top of those over the quota.
+            requests_per_minute: Quota advertised in the rate-limit headers and enforced with 429s.
+            retry_after: Value of the retry-after header of 429 responses, in seconds.
+            stream_chunk_chars: Characters per chunk in streamed answers.
+            host: Interface to listen on.
+            port: Port to listen on; 0 picks a free port.
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self.stream_chunk_chars = stream_chunk_chars
+        self.request_log: List[Dict[str, Any]] = []
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _admit(self) -> Dict[str, str]:
+        """
+        Counts a request against the per-minute quota and returns the rate-limit headers, with 'status' 429 if over quota.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start, self._window_requests = now, 0
+            self._window_requests += 1
+            remaining = max(self.requests_per_minute - self._window_requests, 0)
+            headers = {
+                "x-ratelimit-limit-requests": str(self.requests_per_minute),
+                "x-ratelimit-remaining-requests": str(remaining),
+                "x-ratelimit-reset-requests": f"{60 - (now - self._window_start):.3f}s"
+            }
+            if self._window_requests > self.requests_per_minute:
+                headers["status"] = "429"
+            return headers
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str]) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "mock-model", "object": "model", "owned_by": "mock"}]}, {})
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}}, {})
+
+            def do_POST(self):
+                received = time.monotonic()
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found"}}, {})
+                    return
+
+                headers = server._admit()
+                status = int(headers.pop("status", 200))
+                roll = random.random()
+                if status == 200 and roll < server.rate_limit_rate:
+                    status = 429
+                elif status == 200 and roll < server.rate_limit_rate + server.error_rate:
+                    status = 500
+
+                if status == 429:
+                    headers["retry-after"] = str(server.retry_after)
+                    self._send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_exceeded"}}, headers)
+                elif status == 500:
+                    time.sleep(random.uniform(0, server.latency))
+                    self._send_json(500, {"error": {"message": "Simulated server error"}}, headers)
+                else:
+                    messages = {message["role"]: message["content"] for message in body.get("messages", [])}
+                    content = mock_completion_content(messages.get("system", ""), messages.get("user", ""))
+                    time.sleep(max(0.0, server.latency + random.uniform(-server.latency_jitter, server.latency_jitter)))
+                    if body.get("stream"):
+                        self._stream(body.get("model", "mock-model"), content, headers)
+                    else:
+                        self._send_json(200, self._completion(body.get("model", "mock-model"), content, body), headers)
+
+                with server._lock:
+                    server.request_log.append({"status": status, "stream": bool(body.get("stream")), "received": received,
+                                               "latency": time.monotonic() - received})
+
+            @staticmethod
+            def _completion(model: str, content: str, body: Dict[str, Any]) -> Dict[str, Any]:
+                prompt_chars = sum(len(message.get("content", "")) for message in body.get("messages", []))
+                return {
+                    "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(content) // 4,
+                              "total_tokens": (prompt_chars + len(content)) // 4}
+                }
+
+            def _stream(self, model: str, content: str, headers: Dict[str, str]) -> None:
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("connection", "close")
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.close_connection = True
+                pieces = [content[start:start + server.stream_chunk_chars] for start in range(0, len(content), server.stream_chunk_chars)]
+                try:
+                    for piece in pieces:
+                        chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                                 "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream early, e.g. after the final decision
+                    pass
+
+        return Handler
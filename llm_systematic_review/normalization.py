@@ -0,0 +1,56 @@
+import re
+import unicodedata
+from typing import Any, Optional
+
+import pandas as pd
+
+# Placeholders databases put in place of a missing value (e.g. an abstract)
+_MISSING_VALUE = re.compile(r"^\s*(\[?\s*no abstract(\s+(is\s+)?available)?\.?\s*\]?|n/?a|none|-+)?\s*$", re.IGNORECASE)
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+_DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+
+def is_missing(value: Any) -> bool:
+    """
+    Returns True for None, NaN, empty strings and placeholders such as '[No abstract available]' or 'N/A'.
+    """
+    return value is None or (isinstance(value, float) and pd.isna(value)) or bool(_MISSING_VALUE.match(str(value)))
+
+
+def normalize_title(title: Any) -> Optional[str]:
+    """
+    Lower-cases a title, folds accents and drops everything but letters and digits, so trivially different spellings compare equal.
+    """
+    if is_missing(title):
+        return None
+    folded = unicodedata.normalize("NFKD", str(title)).encode("ascii", "ignore").decode("ascii")
+    normalized = _NON_ALPHANUMERIC.sub(" ", folded.lower()).strip()
+    return normalized or None
+
+
+def normalize_doi(doi: Any) -> Optional[str]:
+    """
+    Lower-cases a DOI and strips 'https://doi.org/' or 'doi:' prefixes.
+    """
+    if is_missing(doi):
+        return None
+    return _DOI_PREFIX.sub("", str(doi).strip()).lower() or None
+
+
+def first_author(authors: Any) -> Optional[str]:
+    """
+    Returns the normalized surname of the first author of a 'Surname, Initials; ...' list.
+    """
+    if is_missing(authors):
+        return None
+    return normalize_title(str(authors).split(";")[0].split(",")[0])
+
+
+def parse_year(year: Any) -> Optional[int]:
+    """
+    Returns a publication year as int ('2024', 2024.0 and 2024 alike), or None if it cannot be parsed.
+    """
+    try:
+        return int(float(year))
+    except (TypeError, ValueError):
+        return None
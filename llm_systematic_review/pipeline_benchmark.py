@@ -0,0 +1,75 @@
+from llm_systematic_review.extraction_runner import extract_articles, failed_extractions
+from llm_systematic_review.full_text_chunking import screen_full_texts
+from llm_systematic_review.mock_llm_server import MockLLMServer
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.screening_engine import screen_articles
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import time
+
+# Runs the title/abstract, full-text and extraction paths end to end against a local
+# MockLLMServer, so the pipeline's own overhead can be measured without the live service.
+# CPU time is that of the calling thread only (prompt rendering, the event loop, response
+# parsing); the mock server answers from its own threads. Latencies are measured by the
+# server from request arrival to the last byte of the answer. Responses are never cached.
+
+n_title_abstract_articles = 500
+n_full_text_articles = 20
+max_concurrency = 16
+server_settings = {
+    "latency": 0.5,
+    "latency_jitter": 0.2,
+    "error_rate": 0.02,
+    "rate_limit_rate": 0.02,
+    "retry_after": 0.5
+}
+model = "mock-model"
+api_key = "mock-key"
+
+# Real articles, repeated up to the requested number with distinct Covidence numbers
+articles = pd.read_csv("data/subset_50_title_abstract_unscreened.csv")
+articles['Published Year'] = articles['Published Year'].astype(str)
+articles = articles.sample(n_title_abstract_articles, replace=True, random_state=0).reset_index(drop=True)
+articles['Covidence #'] = [f"#{number}" for number in range(1, n_title_abstract_articles + 1)]
+
+full_text_paths = sorted(Path("data/test_conversion/PDF").glob("*/*.txt"))
+full_text_articles = pd.DataFrame({
+    'Covidence #': [str(number) for number in range(1, n_full_text_articles + 1)],
+    'path': [str(full_text_paths[number % len(full_text_paths)]) for number in range(n_full_text_articles)]
+})
+
+paths = {
+    "title/abstract": (len(articles), lambda base_url: screen_articles(
+        articles, PromptTemplates.PROMPT_TITLE_ABSTRACT, api_key, base_url, model, max_concurrency, use_cache=False)),
+    "full text": (len(full_text_articles), lambda base_url: screen_full_texts(
+        full_text_articles, PromptTemplates.PROMPT_FULL_TEXT, api_key, base_url, model, max_concurrency=max_concurrency, use_cache=False)),
+    "extraction": (len(full_text_articles), lambda base_url: extract_articles(
+        full_text_articles, api_key, base_url, model, max_concurrency, use_cache=False))
+}
+
+report = []
+for path_name, (n_articles, run_path) in paths.items():
+    # A fresh server (and port) per path, so every path starts with a fresh rate limiter
+    with MockLLMServer(**server_settings) as server:
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        results = run_path(server.base_url)
+        wall_time, cpu_time = time.perf_counter() - start_wall, time.thread_time() - start_cpu
+
+    latencies = np.array([request["latency"] for request in server.request_log if request["status"] == 200])
+    # Screening marks a failed article with None; extraction leaves the parts that stayed invalid empty
+    n_failed = int(failed_extractions(results).sum()) if isinstance(results, pd.DataFrame) else sum(result is None for result in results)
+    report.append({
+        "path": path_name,
+        "articles": n_articles,
+        "requests": len(server.request_log),
+        "errors_and_429s": sum(request["status"] != 200 for request in server.request_log),
+        "failed_articles": n_failed,
+        "wall_s": round(wall_time, 2),
+        "requests_per_s": round(len(latencies) / wall_time, 2),
+        "p50_latency_ms": round(np.percentile(latencies, 50) * 1000, 1),
+        "p95_latency_ms": round(np.percentile(latencies, 95) * 1000, 1),
+        "cpu_ms_per_article": round(cpu_time / n_articles * 1000, 2)
+    })
+
+print(pd.DataFrame(report).to_string(index=False))
@@ -0,0 +1,215 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+from llm_systematic_review.result_journal import ResultJournal
+from llm_systematic_review.screening_engine import run_coroutine, screen_articles_async
+
+# Recall on human includes the cascade must keep on the held-out labels
+DEFAULT_TARGET_RECALL = 0.98
+
+
+def article_texts(articles: pd.DataFrame) -> List[str]:
+    """
+    Returns 'title. abstract' for every article; missing values count as empty.
+    """
+    return (articles['Title'].fillna('').astype(str) + ". " + articles['Abstract'].fillna('').astype(str)).tolist()
+
+
+class PrescreenClassifier:
+    """
+    TF-IDF + logistic regression model that scores how likely an abstract is to be included.
+
+    It is trained on earlier screening decisions and only used to decide which
+    records the LLM does not need to see; it never includes anything by itself.
+    """
+
+    def __init__(self, max_features: int = 50000, C: float = 4.0):
+        """
+        Args:
+            max_features: Size of the word uni- and bigram vocabulary.
+            C: Inverse regularization strength of the logistic regression.
+        """
+        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_features=max_features, sublinear_tf=True, strip_accents="unicode")
+        # Includes are the minority class; balancing keeps their scores from collapsing towards 0
+        self.model = LogisticRegression(C=C, class_weight="balanced", max_iter=2000)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[int]) -> "PrescreenClassifier":
+        self.model.fit(self.vectorizer.fit_transform(texts), np.asarray(labels, dtype=int))
+        return self
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Returns the predicted probability of inclusion for every text.
+        """
+        return self.model.predict_proba(self.vectorizer.transform(texts))[:, 1]
+
+
+def load_labelled_articles(paths: Sequence[str], label_column: str = "Sofiyas_decision",
+                           fallback_label_column: Optional[str] = "llm_final_decision_bin") -> pd.DataFrame:
+    """
+    Reads screened articles and their labels, preferring the human decision over the LLM's.
+
+    Args:
+        paths: CSV files with 'Title' and 'Abstract' columns, e.g. data/human_llm_title_abstract_*.csv.
+        label_column: Column with the human 0/1 decision.
+        fallback_label_column: Column with a 0/1 decision used where the human one is missing.
+
+    Returns:
+        The articles with a 'label' column and a 'label_source' column ('human' or 'llm'),
+        de-duplicated by Covidence number where available.
+    """
+    labelled = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    labelled['label'] = labelled[label_column]
+    labelled['label_source'] = np.where(labelled['label'].notna(), "human", None)
+    if fallback_label_column is not None and fallback_label_column in labelled.columns:
+        fallback = labelled['label'].isna() & labelled[fallback_label_column].notna()
+        labelled.loc[fallback, 'label'] = labelled.loc[fallback, fallback_label_column]
+        labelled.loc[fallback, 'label_source'] = "llm"
+    labelled = labelled.dropna(subset=['label'])
+    labelled['label'] = labelled['label'].astype(int)
+    id_column = next((column for column in ('Covidence #', 'covidence_number') if column in labelled.columns), None)
+    if id_column is not None:
+        labelled = labelled.drop_duplicates(subset=id_column)
+    return labelled.reset_index(drop=True)
+
+
+def cascade_report(scores: np.ndarray, labels: np.ndarray, thresholds: Optional[Sequence[float]] = None) -> pd.DataFrame:
+    """
+    Trade-off between LLM calls saved and includes missed, for a range of thresholds.
+
+    Records scoring below the threshold are excluded without an LLM call.
+
+    Returns:
+        One row per threshold with the recall of the includes, the number of missed
+        includes and the share of LLM calls saved.
+    """
+    labels = np.asarray(labels, dtype=int)
+    if thresholds is None:
+        thresholds = np.round(np.linspace(0.0, 0.5, 26), 3)
+    n_includes = max(int(labels.sum()), 1)
+    rows = []
+    for threshold in thresholds:
+        sent = scores >= threshold
+        rows.append({
+            "threshold": threshold,
+            "recall": (sent & (labels == 1)).sum() / n_includes,
+            "missed_includes": int((~sent & (labels == 1)).sum()),
+            "calls_saved": 1 - sent.mean()
+        })
+    return pd.DataFrame(rows)
+
+
+def choose_threshold(scores: np.ndarray, labels: np.ndarray, target_recall: float = DEFAULT_TARGET_RECALL) -> float:
+    """
+    Returns the highest threshold whose recall of the includes is at least `target_recall`.
+    """
+    include_scores = np.sort(scores[np.asarray(labels, dtype=int) == 1])
+    if len(include_scores) == 0:
+        return 0.0
+    # Up to this many includes may fall below the threshold
+    allowed_misses = int(np.floor(len(include_scores) * (1 - target_recall)))
+    return float(include_scores[allowed_misses])
+
+
+def train_prescreen(labelled: pd.DataFrame, target_recall: float = DEFAULT_TARGET_RECALL, folds: int = 4,
+                    random_state: int = 42) -> Tuple[PrescreenClassifier, float, pd.DataFrame]:
+    """
+    Trains the pre-screening model and picks its threshold by cross-validation on human labels.
+
+    The human labels are split into stratified folds; each fold is scored by a
+    PrescreenClassifier trained on the other folds, so every human label gets a
+    held-out score from the same model setup as the returned classifier. The
+    threshold and the reported recall are measured on these scores against
+    human decisions alone. Articles labelled by the LLM (see
+    load_labelled_articles) are only used for training. The returned model is
+    fit on all labels.
+
+    Args:
+        labelled: Articles with 'Title', 'Abstract' and 0/1 'label' columns, and optionally 'label_source'
+            (rows without it count as human labels), see load_labelled_articles.
+        target_recall: Recall of the includes the threshold must keep on the held-out scores.
+        folds: Number of cross-validation folds over the human labels.
+        random_state: Seed of the stratified folds.
+
+    Returns:
+        Tuple of (classifier fitted on all labels, threshold, cross-validated cascade_report including the chosen threshold).
+    """
+    texts = article_texts(labelled)
+    labels = labelled['label'].to_numpy()
+    human = (labelled['label_source'] == "human").to_numpy() if 'label_source' in labelled.columns else np.ones(len(labelled), dtype=bool)
+    if not human.any():
+        raise ValueError("No human labels to hold out; the cascade threshold can only be chosen on human decisions")
+    human_positions = np.flatnonzero(human)
+    llm_positions = np.flatnonzero(~human)
+    human_scores = np.empty(len(human_positions))
+    splits = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state).split(human_positions, labels[human_positions])
+    for train_split, test_split in splits:
+        train_positions = np.concatenate([human_positions[train_split], llm_positions])
+        fold_classifier = PrescreenClassifier().fit([texts[position] for position in train_positions], labels[train_positions])
+        human_scores[test_split] = fold_classifier.score([texts[position] for position in human_positions[test_split]])
+    human_labels = labels[human_positions]
+    threshold = choose_threshold(human_scores, human_labels, target_recall)
+    report = cascade_report(human_scores, human_labels, sorted(set(np.round(np.linspace(0.0, 0.5, 26), 3)) | {threshold}))
+    classifier = PrescreenClassifier().fit(texts, labels)
+    return classifier, threshold, report
+
+
+async def screen_articles_cascade_async(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str,
+                                        classifier: PrescreenClassifier, threshold: float, **screen_kwargs) -> List[Optional[Dict[str, Any]]]:
+    """
+    Screens articles in two stages: the classifier first, the LLM only for uncertain or likely includes.
+
+    Articles scoring below `threshold` are excluded without an LLM call; their
+    decision holds the Covidence number, 'final_decision': 'Exclude' and
+    'decided_by': 'prescreen'. All results carry the 'prescreen_score'. With a
+    `journal_path` in screen_kwargs, these exclusions are journaled like rule
+    decisions, and articles already in the journal are neither scored nor sent again.
+
+    Args:
+        articles: DataFrame with 'Title', 'Abstract', 'Published Year' and 'Covidence #' columns.
+        prompt_template: A title/abstract PromptTemplates entry.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        classifier: A fitted PrescreenClassifier.
+        threshold: Score below which an article is excluded without an LLM call.
+        screen_kwargs: Further arguments of screen_articles_async (max_concurrency, use_cache, journal_path, ...).
+
+    Returns:
+        A list of decisions in the same order as the DataFrame rows, with None for
+        articles whose LLM request failed.
+    """
+    covidence_numbers = articles['Covidence #'].astype(str).tolist()
+    journal_path = screen_kwargs.get("journal_path")
+    journal = ResultJournal(journal_path) if journal_path is not None else None
+    results = [journal.get(covidence_number) if journal is not None else None for covidence_number in covidence_numbers]
+    undecided = np.array([position for position, result in enumerate(results) if result is None], dtype=int)
+    scores = classifier.score(article_texts(articles.iloc[undecided]))
+    sent = undecided[scores >= threshold]
+    print(f"Pre-screening excluded {len(undecided) - len(sent)} of {len(undecided)} undecided articles, {len(sent)} go to the LLM")
+
+    for position, score in zip(undecided, scores):
+        if score < threshold:
+            results[position] = {"covidence_number": covidence_numbers[position], "final_decision": "Exclude", "decided_by": "prescreen",
+                                 "prescreen_score": float(score)}
+            if journal is not None:
+                journal.append(covidence_numbers[position], results[position])
+    undecided_scores = dict(zip(undecided.tolist(), scores.tolist()))
+    # screen_articles_async opens the journal again and skips the exclusions recorded above
+    responses = await screen_articles_async(articles.iloc[sent], prompt_template, api_key, base_url, model, **screen_kwargs)
+    for position, llm_response in zip(sent, responses):
+        results[position] = None if llm_response is None else dict(llm_response, decided_by=llm_response.get("decided_by", "llm"),
+                                                                   prescreen_score=undecided_scores[position])
+    return results
+
+def screen_articles_cascade(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str,
+                            classifier: PrescreenClassifier, threshold: float, **screen_kwargs) -> List[Optional[Dict[str, Any]]]:
+    """
+    Blocking wrapper around screen_articles_cascade_async for use in the request scripts.
+    """
+    return run_coroutine(screen_articles_cascade_async(articles, prompt_template, api_key, base_url, model, classifier, threshold, **screen_kwargs))
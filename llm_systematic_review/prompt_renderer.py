@@ -0,0 +1,135 @@
+import copy
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+try:
+    import tiktoken
+    # Llama 3 uses a tiktoken-style BPE; cl100k_base is a close stand-in for counting
+    _token_encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _token_encoding = None
+
+# 'pretty' is the original indented JSON prompt with the whole template per article.
+# 'compact' sends minified JSON with short keys and moves everything except the
+# article into the system message, which is identical for every request.
+PROMPT_ENCODINGS = ("pretty", "compact")
+
+# Short keys of the article fields in compact prompts
+COMPACT_KEYS = {
+    "title": "ti",
+    "abstract": "ab",
+    "year": "py",
+    "covidence_number": "id",
+    "full_text": "tx"
+}
+
+_COMPACT_SEPARATORS = (",", ":")
+
+
+def compact_json(value: Any) -> str:
+    """
+    Serializes a value as minified JSON, as compact prompts are.
+    """
+    return json.dumps(value, separators=_COMPACT_SEPARATORS)
+
+
+def _placeholder(field: str) -> str:
+    return f"@@prompt_field:{field}@@"
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text with tiktoken, or estimates them as one token per four characters if it is not installed.
+    """
+    if _token_encoding is None:
+        return len(text) // 4
+    return len(_token_encoding.encode(text))
+
+
+def compact_instructions(prompt_template: Dict[str, Any], section: str = "input_article") -> str:
+    """
+    Returns the static part of a template (everything but the article section) as minified JSON.
+
+    In compact mode this is appended to the system message, together with a
+    legend of the short article keys used in the user message.
+    """
+    instructions = {key: value for key, value in prompt_template.items() if key != section}
+    instructions["input_article_keys"] = {COMPACT_KEYS[field]: field for field in prompt_template[section] if field in COMPACT_KEYS}
+    return json.dumps(instructions, separators=_COMPACT_SEPARATORS)
+
+
+class CompiledPromptTemplate:
+    """
+    A PromptTemplates entry serialized once, with slots for the article fields.
+
+    The static parts of the template (role, criteria, output format) are encoded
+    a single time at construction. Rendering only JSON-escapes the article values
+    and splices them between the precomputed parts, which produces exactly the
+    same string as filling a deep copy of the template and calling json.dumps on it.
+    """
+
+    def __init__(self, prompt_template: Dict[str, Any], fields: List[str], section: str = "input_article", encoding: str = "pretty"):
+        """
+        Args:
+            prompt_template: A dictionary representing the base prompt structure.
+            fields: Names of the article fields inside `section` that are filled per article.
+            section: Key of the template part holding the article fields.
+            encoding: 'pretty' for the full template as indented JSON, 'compact' for only
+                the article fields as minified JSON with the short keys of COMPACT_KEYS.
+        """
+        if encoding not in PROMPT_ENCODINGS:
+            raise ValueError(f"Unknown prompt encoding '{encoding}', expected one of {PROMPT_ENCODINGS}")
+        self.prompt_template = prompt_template
+        self.fields = fields
+        self.encoding = encoding
+
+        if encoding == "pretty":
+            filled_prompt = copy.deepcopy(prompt_template)
+            for field in fields:
+                filled_prompt[section][field] = _placeholder(field)
+            rendered = json.dumps(filled_prompt, indent=2)
+        else:
+            # Keep the field order of the template section
+            ordered_fields = [field for field in prompt_template[section] if field in fields]
+            rendered = json.dumps({COMPACT_KEYS[field]: _placeholder(field) for field in ordered_fields}, separators=_COMPACT_SEPARATORS)
+
+        tokens = {json.dumps(_placeholder(field)): field for field in fields}
+        pattern = re.compile("|".join(re.escape(token) for token in tokens))
+        self._static_parts: List[str] = []
+        self._slot_fields: List[str] = []
+        position = 0
+        for match in pattern.finditer(rendered):
+            self._static_parts.append(rendered[position:match.start()])
+            self._slot_fields.append(tokens[match.group()])
+            position = match.end()
+        self._static_parts.append(rendered[position:])
+
+    def render(self, **values: Any) -> str:
+        """
+        Returns the JSON-formatted prompt with the given article values filled in.
+        """
+        pieces = [self._static_parts[0]]
+        for field, static_part in zip(self._slot_fields, self._static_parts[1:]):
+            pieces.append(json.dumps(values[field]))
+            pieces.append(static_part)
+        return "".join(pieces)
+
+
+_compiled_templates: Dict[Tuple[int, Tuple[str, ...], str, str], CompiledPromptTemplate] = {}
+
+
+def get_compiled_template(prompt_template: Dict[str, Any], fields: List[str], encoding: str = "pretty", section: str = "input_article") -> CompiledPromptTemplate:
+    """
+    Returns the compiled form of a template, compiling it on first use.
+
+    Templates are looked up by identity, so the PromptTemplates entries are
+    compiled once per process. They must not be modified after their first use.
+    """
+    key = (id(prompt_template), tuple(fields), encoding, section)
+    compiled = _compiled_templates.get(key)
+    # Guard against a different dict reusing the id of a garbage-collected one
+    if compiled is None or compiled.prompt_template is not prompt_template:
+        compiled = CompiledPromptTemplate(prompt_template, fields, section, encoding)
+        _compiled_templates[key] = compiled
+    return compiled
@@ -0,0 +1,59 @@
+from llm_systematic_review.helpers import create_llm_abs_title_prompt_string, create_llm_full_text_prompt_string
+from llm_systematic_review.prompt_config import PromptTemplates
+from pathlib import Path
+import json
+import time
+
+# Compares per-article prompt rendering time of the former deep-copy approach
+# (json.loads(json.dumps(template)) + json.dumps(indent=2) per article) with the
+# precompiled templates now used by the helpers. No API calls are made.
+
+article_counts = [500, 5000, 50000]
+
+# A real OCR output as representative full text
+full_text = next(Path("data/test_conversion/PDF").glob("*/*.txt")).read_text(encoding="utf-8")
+abstract = full_text[:1500]
+
+
+def legacy_abs_title_prompt(prompt_template, title, abstract, year, covidence_number):
+    filled_prompt = json.loads(json.dumps(prompt_template))
+    filled_prompt["input_article"]["title"] = title
+    filled_prompt["input_article"]["abstract"] = abstract
+    filled_prompt["input_article"]["year"] = year
+    filled_prompt["input_article"]["covidence_number"] = covidence_number
+    return json.dumps(filled_prompt, indent=2)
+
+
+def legacy_full_text_prompt(prompt_template, covidence_number, full_text):
+    filled_prompt = json.loads(json.dumps(prompt_template))
+    filled_prompt["input_article"]["covidence_number"] = covidence_number
+    filled_prompt["input_article"]["full_text"] = full_text
+    return json.dumps(filled_prompt, indent=2)
+
+
+def time_per_article(render, n_articles: int) -> float:
+    start = time.perf_counter()
+    for i in range(n_articles):
+        render(f"#{i}")
+    return (time.perf_counter() - start) / n_articles
+
+
+renderers = {
+    "title/abstract": (
+        lambda number: legacy_abs_title_prompt(PromptTemplates.PROMPT_TITLE_ABSTRACT, "A title", abstract, "2024", number),
+        lambda number: create_llm_abs_title_prompt_string(PromptTemplates.PROMPT_TITLE_ABSTRACT, "A title", abstract, "2024", number)
+    ),
+    "full text": (
+        lambda number: legacy_full_text_prompt(PromptTemplates.PROMPT_FULL_TEXT, number, full_text),
+        lambda number: create_llm_full_text_prompt_string(PromptTemplates.PROMPT_FULL_TEXT, number, full_text)
+    )
+}
+
+for name, (legacy, compiled) in renderers.items():
+    # Both paths must produce byte-identical prompts
+    assert legacy("#0") == compiled("#0")
+    for n_articles in article_counts:
+        legacy_time = time_per_article(legacy, n_articles)
+        compiled_time = time_per_article(compiled, n_articles)
+        print(f"{name:>14} | {n_articles:>6} articles | deep copy: {legacy_time * 1e6:8.1f} us/article | "
+              f"compiled: {compiled_time * 1e6:8.1f} us/article | speed-up: {legacy_time / compiled_time:4.1f}x")
@@ -0,0 +1,75 @@
+from llm_systematic_review.helpers import create_llm_abs_title_prompt_string, create_llm_full_text_prompt_string, create_system_message
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.prompt_renderer import PROMPT_ENCODINGS, count_tokens
+from pathlib import Path
+import pandas as pd
+import time
+
+# Reports the input tokens per request of each prompt encoding for the screening templates.
+# 'static' tokens are identical for every request (system message, and in compact mode the
+# criteria), 'per-article' tokens vary with the article. Set measure_latency to True to also
+# time live requests for each encoding (uncached, so they are billed).
+
+measure_latency = False
+n_latency_requests = 5
+
+articles = pd.read_csv("data/subset_50_title_abstract_unscreened.csv")
+articles['Published Year'] = articles['Published Year'].astype(str)
+full_text_paths = sorted(Path("data/test_conversion/PDF").glob("*/*.txt"))
+
+
+def title_abstract_prompts(encoding):
+    return [create_llm_abs_title_prompt_string(PromptTemplates.PROMPT_TITLE_ABSTRACT, row['Title'], row['Abstract'], row['Published Year'], row['Covidence #'], encoding)
+            for _, row in articles.iterrows()]
+
+
+def full_text_prompts(encoding):
+    return [create_llm_full_text_prompt_string(PromptTemplates.PROMPT_FULL_TEXT, path.parent.name, path.read_text(encoding="utf-8"), encoding)
+            for path in full_text_paths]
+
+
+templates = {
+    "PROMPT_TITLE_ABSTRACT": (PromptTemplates.PROMPT_TITLE_ABSTRACT, title_abstract_prompts),
+    "PROMPT_FULL_TEXT": (PromptTemplates.PROMPT_FULL_TEXT, full_text_prompts)
+}
+
+report = []
+for template_name, (prompt_template, build_prompts) in templates.items():
+    for encoding in PROMPT_ENCODINGS:
+        system_message = create_system_message(prompt_template, encoding)
+        prompts = build_prompts(encoding)
+        system_tokens = count_tokens(system_message)
+        prompt_tokens = [count_tokens(prompt_string) for prompt_string in prompts]
+        report.append({
+            "template": template_name,
+            "encoding": encoding,
+            "system_message_tokens": system_tokens,
+            "mean_user_prompt_tokens": sum(prompt_tokens) / len(prompt_tokens),
+            "mean_input_tokens_per_request": system_tokens + sum(prompt_tokens) / len(prompt_tokens),
+            "system_message": system_message,
+            "prompts": prompts
+        })
+
+report_df = pd.DataFrame(report)
+pretty_tokens = report_df[report_df['encoding'] == 'pretty'].set_index('template')['mean_input_tokens_per_request']
+report_df['saving_vs_pretty'] = 1 - report_df['mean_input_tokens_per_request'] / report_df['template'].map(pretty_tokens)
+
+if measure_latency:
+    from instance.config import api_key
+    from llm_systematic_review.helpers import get_llm_screening_decision
+
+    base_url = "https://chat-ai.academiccloud.de/v1"
+    model = "llama-3.3-70b-instruct"
+
+    mean_latencies = []
+    for _, row in report_df.iterrows():
+        durations = []
+        for prompt_string in row['prompts'][:n_latency_requests]:
+            start = time.perf_counter()
+            get_llm_screening_decision(prompt_string, api_key, base_url, model, use_cache=False, system_message=row['system_message'])
+            durations.append(time.perf_counter() - start)
+        mean_latencies.append(sum(durations) / len(durations))
+    report_df['mean_latency_s'] = mean_latencies
+
+report_df = report_df.drop(columns=['system_message', 'prompts'])
+print(report_df.to_string(index=False))
@@ -0,0 +1,205 @@
+import random
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+import openai
+
+# Errors worth retrying: throttling, dropped connections, timeouts and 5xx responses
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError
+)
+
+MAX_RETRIES = 6
+BASE_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+# Window lengths of Kong-style headers such as 'x-ratelimit-remaining-minute'
+_WINDOW_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Short windows pace every request; the remaining count of a long window is a budget and
+# only slows the requests down once it is nearly used up
+_PACING_WINDOWS = ("second", "minute")
+# A long-window budget counts as nearly used up below this share of its limit, or below
+# LOW_BUDGET_REQUESTS requests if the endpoint does not report the limit
+LOW_BUDGET_SHARE = 0.05
+LOW_BUDGET_REQUESTS = 100
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class LLMRequestError(Exception):
+    """
+    Raised when an LLM request fails permanently or keeps failing after all retries.
+    """
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """
+    Parses '20', '1.5', '20ms' or '6m0s' into seconds.
+    """
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Extracts the sustainable request rate and the requested pause from rate-limit response headers.
+
+    Understands OpenAI-style ('x-ratelimit-remaining-requests' / 'x-ratelimit-reset-requests'),
+    Kong-style ('x-ratelimit-remaining-minute', '-hour', ...) and IETF draft ('ratelimit-remaining' /
+    'ratelimit-reset') headers, plus 'retry-after'.
+
+    Args:
+        headers: Response headers of the API call.
+
+    Returns:
+        Tuple of (allowed requests per second, retry-after seconds); each is None when not reported.
+        With several windows reported, the most restrictive rate is returned. Hourly and daily
+        remaining counts only give a rate (the rest spread over the window) once they drop below
+        LOW_BUDGET_SHARE of the limit, or LOW_BUDGET_REQUESTS without a reported limit.
+    """
+    headers = {key.lower(): value for key, value in headers.items()}
+    rates = []
+
+    for remaining_key, reset_key in [("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+                                     ("ratelimit-remaining", "ratelimit-reset")]:
+        if remaining_key in headers and reset_key in headers:
+            reset = _parse_duration(headers[reset_key])
+            if reset:
+                rates.append(float(headers[remaining_key]) / reset)
+
+    for window, seconds in _WINDOW_SECONDS.items():
+        remaining = headers.get(f"x-ratelimit-remaining-{window}")
+        if remaining is None:
+            continue
+        remaining = float(remaining)
+        if window not in _PACING_WINDOWS:
+            limit = headers.get(f"x-ratelimit-limit-{window}")
+            low_budget = float(limit) * LOW_BUDGET_SHARE if limit is not None else LOW_BUDGET_REQUESTS
+            if remaining >= low_budget:
+                continue
+        rates.append(remaining / seconds)
+
+    retry_after = _parse_duration(headers["retry-after"]) if "retry-after" in headers else None
+    return (min(rates) if rates else None), retry_after
+
+
+def backoff_delay(attempt: int, base_delay: float = BASE_RETRY_DELAY, max_delay: float = MAX_RETRY_DELAY) -> float:
+    """
+    Exponential backoff with full jitter for the given (0-based) retry attempt.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate follows what the endpoint reports.
+
+    Every request reserves one token and sleeps for the returned wait time, so
+    the same limiter can pace both the blocking and the asyncio request paths.
+    The rate is set from rate-limit headers when the endpoint sends them,
+    grows additively after successful calls when it does not, and is halved
+    (with a pause of the bucket) on every 429.
+    """
+
+    def __init__(self, initial_rate: float = 2.0, min_rate: float = 0.05, max_rate: float = 50.0,
+                 burst: int = 4, increase_step: float = 0.25):
+        """
+        Args:
+            initial_rate: Requests per second before any feedback from the endpoint.
+            min_rate: Lower bound the rate never drops below.
+            max_rate: Upper bound the rate never exceeds.
+            burst: Bucket capacity, i.e. how many requests may start back to back.
+            increase_step: Requests per second added after a success without rate-limit headers.
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def reserve(self) -> float:
+        """
+        Takes one token and returns how many seconds the caller has to wait before sending.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # The balance may go negative: later callers queue up behind earlier reservations
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def on_success(self, headers: Mapping[str, str]) -> None:
+        """
+        Adapts the rate after a successful call.
+        """
+        allowed_rate, _ = parse_rate_limit_headers(headers)
+        with self._lock:
+            self._refill(time.monotonic())
+            if allowed_rate is not None:
+                self.rate = allowed_rate
+            else:
+                self.rate += self.increase_step
+            self.rate = min(self.max_rate, max(self.min_rate, self.rate))
+
+    def on_rate_limited(self, headers: Mapping[str, str], attempt: int) -> float:
+        """
+        Slows down after a 429 and pauses the bucket.
+
+        Returns:
+            Seconds to wait before retrying: the server's retry-after if given, otherwise a jittered backoff.
+        """
+        _, retry_after = parse_rate_limit_headers(headers)
+        delay = retry_after if retry_after is not None else backoff_delay(attempt)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._paused_until = max(self._paused_until, now + delay)
+        return delay
+
+    def retry_delay(self, error: Exception, attempt: int) -> float:
+        """
+        Returns the wait before retrying after a transient error.
+        """
+        if isinstance(error, openai.RateLimitError):
+            return self.on_rate_limited(error.response.headers, attempt)
+        return backoff_delay(attempt)
+
+
+_rate_limiters: Dict[Tuple[str, str], AdaptiveRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: str, api_key: str = "") -> AdaptiveRateLimiter:
+    """
+    Returns the limiter shared by all requests to one endpoint with one API key, creating it on first use.
+
+    Quotas are usually per key, so several keys on the same endpoint are paced independently.
+    """
+    # The OpenAI client reports its base_url with a trailing slash
+    key = (base_url.rstrip("/"), api_key)
+    with _registry_lock:
+        if key not in _rate_limiters:
+            _rate_limiters[key] = AdaptiveRateLimiter()
+        return _rate_limiters[key]
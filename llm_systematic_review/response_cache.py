@@ -0,0 +1,126 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = "data/llm_response_cache.sqlite"
+DEFAULT_MAX_SIZE_MB = 500
+
+
+class ResponseCache:
+    """
+    On-disk cache of parsed LLM responses, stored in a single SQLite file.
+
+    Entries are addressed by a hash of everything that determines the answer
+    (model, seed, system message and the rendered prompt), so a prompt that has
+    been answered once is never sent again, even across runs. When the stored
+    responses exceed `max_size_mb`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        """
+        Opens (or creates) the cache file.
+
+        Args:
+            path: Location of the SQLite file.
+            max_size_mb: Upper bound on the total size of stored responses.
+        """
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # The async engine may run in a worker thread, so the connection is shared behind a lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self._connection.commit()
+        self._total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, seed: Optional[int], system_message: str, prompt_string: str) -> str:
+        """
+        Returns the SHA-256 hex digest identifying a request.
+        """
+        payload = json.dumps([model, seed, system_message, prompt_string], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached response for `key`, or None if it is not cached.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Stores a response and evicts least recently used entries if the cache is over its size limit.
+        """
+        serialized = json.dumps(response, ensure_ascii=False)
+        size = len(serialized.encode("utf-8"))
+        with self._lock:
+            previous = self._connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if previous is not None:
+                self._total_size -= previous[0]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, serialized, size, time.time())
+            )
+            self._total_size += size
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        while self._total_size > self.max_size_bytes:
+            row = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._total_size -= row[1]
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns hit/miss/eviction counters for the current session together with the cache size.
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": self._total_size
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the process-wide cache at DEFAULT_CACHE_PATH, opening it on first use.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
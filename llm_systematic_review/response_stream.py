@@ -0,0 +1,110 @@
+from typing import Iterable, List, Optional, Set
+
+# Seconds until the first content token must arrive; longer waits are retried like other timeouts
+DEFAULT_FIRST_TOKEN_TIMEOUT = 30.0
+# Seconds a streamed response may take in total before the generation is cancelled
+DEFAULT_TOTAL_TIMEOUT = 180.0
+
+
+
+class FirstTokenTimeout(TimeoutError):
+    """
+    Raised when a streamed response does not start within the time-to-first-token deadline.
+    """
+
+
+class StreamDeadlineExceeded(TimeoutError):
+    """
+    Raised when a streamed response is still generating at its total-time deadline.
+    """
+
+
+class JSONStreamAccumulator:
+    """
+    Collects the content deltas of a streamed JSON answer and detects when it is complete.
+
+    The answer is complete when the top-level object closes, or as soon as the
+    values of all `required_keys` at the top level have been generated; the
+    object is then closed here, so whatever the model would have generated
+    afterwards (extra keys, trailing whitespace) is never waited for. Without
+    `required_keys` the answer is read to the end of the object.
+    """
+
+    def __init__(self, required_keys: Optional[Iterable[str]] = None):
+        """
+        Args:
+            required_keys: Top-level keys the answer must contain, e.g. the keys of the
+                template's output_format; None to never stop before the object closes.
+        """
+        self.required_keys = set(required_keys) if required_keys else None
+        self.complete = False
+        self._pieces: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_chars: List[str] = []
+        self._last_string = None
+        # Top-level key whose value is being generated, and the keys whose value is complete
+        self._value_key: Optional[str] = None
+        self._completed_keys: Set[str] = set()
+
+    def _complete_value(self) -> bool:
+        # Records the end of a top-level value; True once every required key has its value
+        if self._value_key is not None:
+            self._completed_keys.add(self._value_key)
+            self._value_key = None
+        return self.required_keys is not None and self.required_keys <= self._completed_keys
+
+    def feed(self, delta: str) -> bool:
+        """
+        Adds a content delta and returns True once the answer is complete.
+
+        Characters after the point of completion are discarded.
+        """
+        if self.complete:
+            return True
+        for position, char in enumerate(delta):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._string_chars)
+                    if self._depth == 1 and self._value_key is not None and self._complete_value():
+                        # All required values are in; close the top-level object instead of waiting for the model to
+                        self._pieces.append(delta[:position + 1] + "}")
+                        self.complete = True
+                        return True
+                    continue
+                self._string_chars.append(char)
+            elif char == '"':
+                self._in_string = True
+                self._string_chars = []
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pieces.append(delta[:position + 1])
+                    self.complete = True
+                    return True
+                if self._depth == 1 and self._complete_value():
+                    self._pieces.append(delta[:position + 1] + "}")
+                    self.complete = True
+                    return True
+            elif char == ":" and self._depth == 1:
+                self._value_key = self._last_string
+            elif char == "," and self._depth == 1:
+                # Ends a number or literal value; string and nested values have been recorded already
+                if self._complete_value():
+                    self._pieces.append(delta[:position] + "}")
+                    self.complete = True
+                    return True
+        self._pieces.append(delta)
+        return False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._pieces)
@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class ResultJournal:
+    """
+    Append-only JSONL journal of LLM responses, keyed by Covidence number.
+
+    Each completed response is written as one line and flushed to disk straight
+    away, so a run that is killed midway loses at most the requests that were in
+    flight. Re-opening the same file restores the completed IDs, which lets the
+    next run skip them instead of requesting them again.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens the journal, loading the responses that are already recorded.
+
+        Args:
+            path: Location of the JSONL file. It is created on the first append.
+        """
+        self.path = path
+        self._responses: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed while writing can leave a truncated last line; that article is simply redone
+                    continue
+                self._responses[str(entry["covidence_number"])] = entry["response"]
+
+    def __contains__(self, covidence_number: str) -> bool:
+        return str(covidence_number) in self._responses
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._responses)
+
+    def get(self, covidence_number: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the recorded response for an article, or None if it has not been completed.
+        """
+        return self._responses.get(str(covidence_number))
+
+    def append(self, covidence_number: str, response: Dict[str, Any]) -> None:
+        """
+        Records a completed response and flushes it to disk.
+        """
+        line = json.dumps({"covidence_number": str(covidence_number), "response": response}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._responses[str(covidence_number)] = response
+
+    def responses(self) -> List[Dict[str, Any]]:
+        """
+        Returns all recorded responses in the order they were completed.
+        """
+        return list(self._responses.values())
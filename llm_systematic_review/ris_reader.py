@@ -0,0 +1,73 @@
+import hashlib
+import os
+import re
+from typing import Any, Dict, List, Sequence
+
+import pandas as pd
+
+from llm_systematic_review.normalization import normalize_title
+
+# RIS tags mapped to the column names of the Covidence exports
+RIS_COLUMNS = {"TI": "Title", "T1": "Title", "AB": "Abstract", "N2": "Abstract", "DO": "DOI", "PY": "Published Year", "Y1": "Published Year"}
+_RIS_LINE = re.compile(r"^([A-Z][A-Z0-9])  - ?(.*)$")
+
+
+def read_ris(path: str) -> pd.DataFrame:
+    """
+    Reads the records of a RIS file (Scopus, Web of Science, or the preprint exports of preprints_scraping.py).
+
+    Returns:
+        DataFrame with 'Title', 'Abstract', 'DOI', 'Published Year', 'Authors' (semicolon-separated)
+        and 'source' (the file name) columns, one row per record.
+    """
+    records: List[Dict[str, str]] = []
+    record: Dict[str, str] = {}
+    authors: List[str] = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            match = _RIS_LINE.match(line.rstrip('\n'))
+            if match is None:
+                continue
+            tag, value = match.group(1), match.group(2).strip()
+            if tag == "ER":
+                record["Authors"] = "; ".join(authors)
+                records.append(record)
+                record, authors = {}, []
+            elif tag in ("AU", "A1"):
+                authors.append(value)
+            elif tag in RIS_COLUMNS:
+                # The first occurrence wins, e.g. TI over a later T1
+                record.setdefault(RIS_COLUMNS[tag], value)
+
+    ris_df = pd.DataFrame(records, columns=["Title", "Abstract", "DOI", "Published Year", "Authors"])
+    ris_df["Published Year"] = ris_df["Published Year"].str[:4]
+    ris_df["source"] = os.path.basename(path)
+    return ris_df
+
+
+def record_id(stem: str, title: Any, abstract: Any) -> str:
+    """
+    Returns '<file stem>:<hash>', the hash taken over the normalized title and abstract.
+
+    The ID stays the same when a file is exported again with records added or
+    reordered, unlike the record's position.
+    """
+    content = f"{normalize_title(title) or ''}\x1f{normalize_title(abstract) or ''}"
+    return f"{stem}:{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}"
+
+
+def read_ris_files(paths: Sequence[str]) -> pd.DataFrame:
+    """
+    Reads and concatenates several RIS files, identifying the records by record_id in a 'Covidence #' column.
+
+    Records of one file with the same title and abstract get '-2', '-3', ... appended in file order.
+    """
+    frames = []
+    for path in paths:
+        ris_df = read_ris(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        ids = pd.Series([record_id(stem, title, abstract) for title, abstract in zip(ris_df["Title"], ris_df["Abstract"])])
+        occurrence = ids.groupby(ids).cumcount()
+        ris_df["Covidence #"] = ids.where(occurrence == 0, ids + "-" + (occurrence + 1).astype(str)).tolist()
+        frames.append(ris_df)
+    return pd.concat(frames, ignore_index=True)
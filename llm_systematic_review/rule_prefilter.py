@@ -0,0 +1,132 @@
+import copy
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from llm_systematic_review.normalization import first_author, is_missing, normalize_doi, normalize_title, parse_year
+
+
+class RulePrefilter:
+    """
+    Decides the records that fail the screening criteria deterministically, without an LLM call.
+
+    Three rules apply, in this order:
+      - missing abstract: the title/abstract prompt instructs the model to exclude these;
+      - publication year outside [min_year, max_year];
+      - duplicate of an already decided record (same DOI, or same normalized
+        title, publication year and first author): the earlier decision is copied.
+        A title alone is not enough, since generic titles ("Editorial",
+        "Reply to ...") are shared by different papers. Only decisions on the
+        article itself are copied, never the exclusions of the two rules above.
+
+    Rule decisions use the template's output_format, so they line up with the
+    LLM's decisions in the result files, and are tagged with 'decided_by': 'rule'
+    and the name of the rule.
+    """
+
+    def __init__(self, prompt_template: Dict[str, Any], min_year: Optional[int] = None, max_year: Optional[int] = None,
+                 deduplicate: bool = True):
+        """
+        Args:
+            prompt_template: The title/abstract PromptTemplates entry whose output_format the decisions follow.
+            min_year: Earliest publication year that can be included, or None.
+            max_year: Latest publication year that can be included, or None.
+            deduplicate: Whether duplicates are decided by copying the decision of their first occurrence.
+        """
+        self.prompt_template = prompt_template
+        self.min_year = min_year
+        self.max_year = max_year
+        self.deduplicate = deduplicate
+
+    def exclusion(self, covidence_number: str, rule: str, reason: str) -> Dict[str, Any]:
+        """
+        Returns an 'Exclude' decision in the template's output format, with `reason` as the reasoning of every criterion.
+        """
+        output_format = self.prompt_template["output_format"]
+        decision = {"covidence_number": covidence_number}
+        for group in ("inclusion_criteria_evaluation", "exclusion_criteria_evaluation"):
+            # 'No' for an inclusion criterion means it is not met; for an exclusion criterion that it does not apply
+            decision[group] = {criterion: {"reasoning": reason, "decision": "No"} for criterion in output_format.get(group, {})}
+        decision["final_decision"] = "Exclude"
+        decision["decided_by"] = "rule"
+        decision["rule"] = rule
+        return decision
+
+    @staticmethod
+    def duplicate(decision: Dict[str, Any], covidence_number: str, duplicate_of: str) -> Dict[str, Any]:
+        """
+        Returns a copy of the decision on `duplicate_of` for its duplicate `covidence_number`.
+        """
+        copied = copy.deepcopy(decision)
+        copied["covidence_number"] = covidence_number
+        copied["decided_by"] = "rule"
+        copied["rule"] = "duplicate"
+        copied["duplicate_of"] = duplicate_of
+        return copied
+
+    def _year_reason(self, year: Any) -> Optional[str]:
+        parsed = parse_year(year)
+        if parsed is None:
+            return None
+        if self.min_year is not None and parsed < self.min_year:
+            return f"Published in {parsed}, before {self.min_year}; excluded by rule without LLM evaluation."
+        if self.max_year is not None and parsed > self.max_year:
+            return f"Published in {parsed}, after {self.max_year}; excluded by rule without LLM evaluation."
+        return None
+
+    def apply(self, articles: pd.DataFrame, decided: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, int]]:
+        """
+        Applies the rules to every article.
+
+        Args:
+            articles: DataFrame with 'Title', 'Abstract', 'Published Year', 'Covidence #' and optionally 'DOI'
+                and 'Authors' columns.
+            decided: Decisions already available (e.g. from the journal), keyed by Covidence number.
+
+        Returns:
+            Tuple of (rule decisions keyed by row position, duplicate_of), where duplicate_of
+            maps the position of a duplicate whose first occurrence has no decision yet to
+            the position of that first occurrence; copy its decision with duplicate() once
+            it has been screened.
+        """
+        decided = decided or {}
+        covidence_numbers = articles['Covidence #'].astype(str).tolist()
+        dois = articles['DOI'].tolist() if 'DOI' in articles.columns else [None] * len(articles)
+        authors = articles['Authors'].tolist() if 'Authors' in articles.columns else [None] * len(articles)
+        first_positions: Dict[Tuple, int] = {}
+        rule_decisions, duplicate_of = {}, {}
+
+        for position, (title, abstract, year, doi, author_list) in enumerate(zip(articles['Title'], articles['Abstract'],
+                                                                               articles['Published Year'], dois, authors)):
+            covidence_number = covidence_numbers[position]
+            normalized_doi, normalized_title, parsed_year = normalize_doi(doi), normalize_title(title), parse_year(year)
+            normalized_author = first_author(author_list)
+            keys = []
+            if normalized_doi is not None:
+                keys.append(("doi", normalized_doi))
+            if normalized_title is not None and parsed_year is not None and normalized_author is not None:
+                keys.append(("title", normalized_title, parsed_year, normalized_author))
+            first = min((first_positions[key] for key in keys if key in first_positions), default=None)
+            # A record can share its DOI with one occurrence and its title with another
+            first = duplicate_of.get(first, first)
+            year_reason = self._year_reason(year)
+            # Only records whose decision is about the article itself are passed on; a rule exclusion
+            # for a missing abstract or the year would otherwise exclude a screenable duplicate unseen
+            if not is_missing(abstract) and year_reason is None:
+                for key in keys:
+                    first_positions.setdefault(key, position)
+            if covidence_number in decided:
+                continue
+
+            if is_missing(abstract):
+                rule_decisions[position] = self.exclusion(covidence_number, "missing_abstract",
+                                                          "No abstract provided; excluded by rule without LLM evaluation.")
+            elif year_reason is not None:
+                rule_decisions[position] = self.exclusion(covidence_number, "year_out_of_range", year_reason)
+            elif self.deduplicate and first is not None:
+                first_decision = decided.get(covidence_numbers[first], rule_decisions.get(first))
+                if first_decision is not None:
+                    rule_decisions[position] = self.duplicate(first_decision, covidence_number, covidence_numbers[first])
+                else:
+                    duplicate_of[position] = first
+        return rule_decisions, duplicate_of
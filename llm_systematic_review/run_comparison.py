@@ -0,0 +1,125 @@
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from llm_systematic_review.agreement_metrics import METRICS, binarize, criterion_columns, metrics_from_counts
+
+FINAL_DECISION = "final_decision"
+# Criterion names changed between prompt versions (llm_ic_1_population -> llm_ic_1_participants),
+# so runs are aligned on the numbered prefix
+_CRITERION_ID = re.compile(r"^(llm_(?:ic|ec)_\d+)")
+
+
+def _run_decisions(run: pd.DataFrame) -> pd.DataFrame:
+    # 0/1 decisions of one run, indexed by Covidence number, one column per criterion id
+    columns = {FINAL_DECISION: FINAL_DECISION} if FINAL_DECISION in run.columns else {}
+    for criterion, column in criterion_columns(run).items():
+        columns.setdefault(_CRITERION_ID.match(criterion).group(1), column)
+    decisions = pd.DataFrame({criterion: binarize(run[column]) for criterion, column in columns.items()})
+    decisions.index = run['covidence_number'].astype(str)
+    # A run resumed from a journal can repeat an article; its last answer counts
+    return decisions[~decisions.index.duplicated(keep='last')]
+
+
+class RunComparison:
+    """
+    Decisions of several screening runs aligned on the Covidence number.
+
+    The runs are aligned once into a (runs x articles x criteria) array; the
+    agreement of all run pairs then follows from a few matrix products per
+    criterion instead of one join per pair. Articles missing from a run, or a
+    criterion a run does not have, are NaN and left out of that pair's counts.
+    """
+
+    def __init__(self, runs: Dict[str, pd.DataFrame]):
+        """
+        Args:
+            runs: Dictionary mapping a run name to its output (pd.json_normalize of the decisions,
+                with 'covidence_number', 'final_decision' and llm_ic_*/llm_ec_* decision columns).
+        """
+        decisions = {name: _run_decisions(run) for name, run in runs.items()}
+        self.run_names: List[str] = list(decisions)
+        self.covidence_numbers = pd.Index(sorted(set().union(*(run.index for run in decisions.values()))), name="covidence_number")
+        # Final decision first, then the inclusion and the exclusion criteria
+        self.criteria: List[str] = sorted(set().union(*(run.columns for run in decisions.values())),
+                                          key=lambda criterion: (criterion != FINAL_DECISION, criterion.startswith("llm_ec"), criterion))
+        self.decisions = np.stack([run.reindex(index=self.covidence_numbers, columns=self.criteria).to_numpy(dtype=float)
+                                   for run in decisions.values()])
+
+    @classmethod
+    def from_files(cls, paths: Union[Sequence[str], Dict[str, str]]) -> "RunComparison":
+        """
+        Loads run outputs from CSV files; a list of paths names each run after its file.
+        """
+        if not isinstance(paths, dict):
+            paths = {os.path.splitext(os.path.basename(path))[0]: path for path in paths}
+        return cls({name: pd.read_csv(path) for name, path in paths.items()})
+
+    def _pair_counts(self, criterion: str) -> Dict[str, np.ndarray]:
+        # (runs x runs) counts for every ordered pair (a, b); 'include_exclude' means a includes and b excludes
+        values = self.decisions[:, :, self.criteria.index(criterion)]
+        include = (values == 1).astype(np.float64)
+        exclude = (values == 0).astype(np.float64)
+        return {
+            "both_include": include @ include.T,
+            "include_exclude": include @ exclude.T,
+            "exclude_include": exclude @ include.T,
+            "both_exclude": exclude @ exclude.T
+        }
+
+    def agreement_matrix(self, criterion: str = FINAL_DECISION, statistic: str = "agreement") -> pd.DataFrame:
+        """
+        Returns a (runs x runs) matrix of the share of agreeing decisions or, with statistic='kappa', Cohen's kappa.
+        """
+        counts = self._pair_counts(criterion)
+        n = sum(counts.values())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if statistic == "agreement":
+                matrix = (counts["both_include"] + counts["both_exclude"]) / n
+            else:
+                matrix = metrics_from_counts(counts["both_include"], counts["exclude_include"], counts["include_exclude"], counts["both_exclude"])[statistic]
+        return pd.DataFrame(matrix, index=self.run_names, columns=self.run_names)
+
+    def pairwise_table(self, criteria: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Compares every pair of runs on every criterion.
+
+        For the metrics, the first run of the pair is taken as the reference, so
+        'sensitivity' is the share of run_a's includes that run_b includes as well.
+
+        Returns:
+            One row per (run_a, run_b, criterion) with the number of articles both runs decided,
+            the four agreement counts, the number of disagreements and every metric in METRICS.
+        """
+        first, second = np.triu_indices(len(self.run_names), k=1)
+        tables = []
+        for criterion in criteria or self.criteria:
+            counts = {name: count[first, second] for name, count in self._pair_counts(criterion).items()}
+            metrics = metrics_from_counts(counts["both_include"], counts["exclude_include"], counts["include_exclude"], counts["both_exclude"])
+            table = pd.DataFrame({
+                "run_a": np.array(self.run_names)[first],
+                "run_b": np.array(self.run_names)[second],
+                "criterion": criterion,
+                "n": sum(counts.values()),
+                **counts,
+                "disagreements": counts["include_exclude"] + counts["exclude_include"],
+                **{metric: metrics[metric] for metric in METRICS}
+            })
+            tables.append(table)
+        table = pd.concat(tables, ignore_index=True)
+        count_columns = ["n", "both_include", "include_exclude", "exclude_include", "both_exclude", "disagreements"]
+        table[count_columns] = table[count_columns].astype(int)
+        return table
+
+    def disagreements(self, run_a: str, run_b: str, criterion: str = FINAL_DECISION) -> pd.DataFrame:
+        """
+        Returns the articles on which two runs decided a criterion differently, with both decisions.
+        """
+        column = self.criteria.index(criterion)
+        decisions_a = self.decisions[self.run_names.index(run_a), :, column]
+        decisions_b = self.decisions[self.run_names.index(run_b), :, column]
+        differ = (decisions_a != decisions_b) & ~np.isnan(decisions_a) & ~np.isnan(decisions_b)
+        return pd.DataFrame({run_a: decisions_a[differ], run_b: decisions_b[differ]}, index=self.covidence_numbers[differ]).astype(int)
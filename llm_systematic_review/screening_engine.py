@@ -0,0 +1,214 @@
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from llm_systematic_review.call_metrics import metrics_template, template_name
+from llm_systematic_review.endpoint_pool import EndpointPool
+from llm_systematic_review.helpers import (SYSTEM_MESSAGE, LLMRequestError, create_async_openai_client, create_async_pool_clients,
+                                           create_llm_abs_title_prompt_string, create_system_message, get_llm_screening_decision_async,
+                                           get_pooled_screening_decision_async)
+from llm_systematic_review.result_journal import ResultJournal
+from llm_systematic_review.rule_prefilter import RulePrefilter
+
+# Column order expected by create_llm_abs_title_prompt_string (title, abstract, year, covidence_number)
+TITLE_ABSTRACT_COLUMNS = ['Title', 'Abstract', 'Published Year', 'Covidence #']
+
+
+def build_title_abstract_prompts(articles: pd.DataFrame, prompt_template: Dict, encoding: str = "pretty") -> List[str]:
+    """
+    Renders one title/abstract prompt per article.
+
+    Args:
+        articles: DataFrame with 'Title', 'Abstract', 'Published Year' and 'Covidence #' columns.
+        prompt_template: A PromptTemplates entry, e.g. PromptTemplates.PROMPT_TITLE_ABSTRACT.
+        encoding: 'pretty' or 'compact', see create_llm_abs_title_prompt_string.
+
+    Returns:
+        A list of JSON-formatted prompt strings in the same order as the DataFrame rows.
+    """
+    prompts = []
+    for title, abstract, year, covidence_number in articles[TITLE_ABSTRACT_COLUMNS].itertuples(index=False):
+        prompts.append(create_llm_abs_title_prompt_string(prompt_template, title, abstract, year, covidence_number, encoding))
+    return prompts
+
+
+async def _screen_one(semaphore: asyncio.Semaphore, get_decision: Callable[[str], Awaitable[Dict[str, Any]]], prompt_string: str,
+                      covidence_number: Optional[str], journal: Optional[ResultJournal]) -> Optional[Dict[str, Any]]:
+    async with semaphore:
+        try:
+            llm_response = await get_decision(prompt_string)
+        except LLMRequestError as e:
+            # One failing article should not abort the others; the caller gets None in its slot
+            print(f"Request failed for {covidence_number}: {e}")
+            return None
+    if journal is not None:
+        journal.append(covidence_number, llm_response)
+    return llm_response
+
+
+async def screen_prompts_async(prompts: List[str], api_key: str, base_url: str, model: str, max_concurrency: int = 8, use_cache: bool = True,
+                               covidence_numbers: Optional[List[str]] = None, journal: Optional[ResultJournal] = None,
+                               system_message: str = SYSTEM_MESSAGE, stream: bool = False,
+                               pool: Optional[EndpointPool] = None, required_keys: Optional[Sequence[str]] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Sends already rendered prompts concurrently, with at most `max_concurrency` requests in flight.
+
+    Args:
+        prompts: JSON-formatted prompt strings.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        max_concurrency: Upper bound on simultaneous requests.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        covidence_numbers: Covidence numbers of the prompts, used for error messages and the journal.
+        journal: If given, every successful response is appended to it as soon as it arrives.
+        system_message: The system message sent with every prompt.
+        stream: Whether to stream the answers, see get_llm_screening_decision.
+        pool: Optional EndpointPool to spread the requests over; api_key, base_url and model are then ignored.
+        required_keys: Keys of the template's output_format; a streamed answer is closed once all of them are generated.
+
+    Returns:
+        The parsed LLM responses, in the same order as `prompts`. Requests that
+        failed after all retries are returned as None.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    if covidence_numbers is None:
+        covidence_numbers = [None] * len(prompts)
+    async with contextlib.AsyncExitStack() as clients_stack:
+        # One pooled client per endpoint and run, sized so that every in-flight request gets a keep-alive connection
+        if pool is None:
+            client = await clients_stack.enter_async_context(create_async_openai_client(api_key, base_url, pool_size=max_concurrency))
+            get_decision = functools.partial(get_llm_screening_decision_async, client=client, model=model, use_cache=use_cache,
+                                             system_message=system_message, stream=stream, required_keys=required_keys)
+        else:
+            clients = create_async_pool_clients(pool, pool_size=max_concurrency)
+            for client in clients.values():
+                await clients_stack.enter_async_context(client)
+            get_decision = functools.partial(get_pooled_screening_decision_async, pool=pool, clients=clients, use_cache=use_cache,
+                                             system_message=system_message, stream=stream, required_keys=required_keys)
+        tasks = [_screen_one(semaphore, get_decision, prompt_string, covidence_number, journal)
+                 for prompt_string, covidence_number in zip(prompts, covidence_numbers)]
+        # gather keeps the order of the tasks, not the order in which they finish
+        return await asyncio.gather(*tasks)
+
+
+def apply_prefilter(prefilter: Optional[RulePrefilter], articles: pd.DataFrame,
+                    journal: Optional[ResultJournal]) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, int]]:
+    """
+    Applies a RulePrefilter (if any) and journals its decisions.
+
+    Returns:
+        Tuple of (rule decisions, duplicate_of) as returned by RulePrefilter.apply; both empty without a prefilter.
+    """
+    if prefilter is None:
+        return {}, {}
+    covidence_numbers = articles['Covidence #'].astype(str).tolist()
+    decided = {covidence_number: journal.get(covidence_number) for covidence_number in journal} if journal is not None else {}
+    rule_decisions, duplicate_of = prefilter.apply(articles, decided)
+    if journal is not None:
+        for position, decision in rule_decisions.items():
+            journal.append(covidence_numbers[position], decision)
+    print(f"{len(rule_decisions)} articles decided by rule, {len(duplicate_of)} duplicates wait for their first occurrence")
+    return rule_decisions, duplicate_of
+
+
+def pending_positions(covidence_numbers: List[str], journal: Optional[ResultJournal], rule_decisions: Dict[int, Dict[str, Any]],
+                      duplicate_of: Dict[int, int]) -> List[int]:
+    """
+    Returns the positions of the articles that still need an LLM decision.
+    """
+    pending = [position for position, covidence_number in enumerate(covidence_numbers)
+               if (journal is None or covidence_number not in journal) and position not in rule_decisions and position not in duplicate_of]
+    if journal is not None:
+        print(f"{len(covidence_numbers) - len(pending) - len(duplicate_of)} articles already decided, {len(pending)} to screen")
+    return pending
+
+
+def fill_rule_decisions(results: List[Optional[Dict[str, Any]]], covidence_numbers: List[str], journal: Optional[ResultJournal],
+                        rule_decisions: Dict[int, Dict[str, Any]], duplicate_of: Dict[int, int]) -> None:
+    """
+    Puts the rule decisions into `results` and copies the decision of every screened first occurrence to its duplicates.
+    """
+    for position, decision in rule_decisions.items():
+        results[position] = decision
+    for position, first in duplicate_of.items():
+        if results[first] is not None:
+            results[position] = RulePrefilter.duplicate(results[first], covidence_numbers[position], covidence_numbers[first])
+            if journal is not None:
+                journal.append(covidence_numbers[position], results[position])
+
+
+async def screen_articles_async(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str, max_concurrency: int = 8, use_cache: bool = True,
+                                journal_path: Optional[str] = None, encoding: str = "pretty",
+                                pool: Optional[EndpointPool] = None, prefilter: Optional[RulePrefilter] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Screens every article of the DataFrame against a title/abstract prompt template concurrently.
+
+    With a `journal_path`, every response is appended to that JSONL journal as it
+    arrives, and articles already recorded there are not requested again, so an
+    interrupted run can simply be started again with the same journal.
+
+    With a `prefilter`, articles that fail the criteria deterministically (no
+    abstract, publication year out of range, duplicates) are decided locally
+    and never sent; see RulePrefilter.
+
+    Args:
+        articles: DataFrame with 'Title', 'Abstract', 'Published Year' and 'Covidence #' columns.
+        prompt_template: A PromptTemplates entry, e.g. PromptTemplates.PROMPT_TITLE_ABSTRACT.
+        api_key: The API key for authentication.
+        base_url: The base URL for the LLM API.
+        model: The model to use for the LLM API request.
+        max_concurrency: Upper bound on simultaneous requests.
+        use_cache: Whether to answer from / store into the on-disk response cache.
+        journal_path: Optional JSONL file used to checkpoint and resume the run.
+        encoding: 'pretty' (original prompt format) or 'compact' (minified prompt, criteria in the system message).
+        pool: Optional EndpointPool to spread the requests over several endpoints; api_key, base_url and model are then ignored.
+        prefilter: Optional RulePrefilter deciding articles without an LLM call.
+
+    Returns:
+        A list of LLM decisions in the same order as the DataFrame rows, with None
+        for articles whose request failed after all retries.
+    """
+    covidence_numbers = articles['Covidence #'].astype(str).tolist()
+    journal = ResultJournal(journal_path) if journal_path is not None else None
+    rule_decisions, duplicate_of = apply_prefilter(prefilter, articles, journal)
+    pending = pending_positions(covidence_numbers, journal, rule_decisions, duplicate_of)
+
+    prompts = build_title_abstract_prompts(articles.iloc[pending], prompt_template, encoding)
+    with metrics_template(template_name(prompt_template)):
+        responses = await screen_prompts_async(prompts, api_key, base_url, model, max_concurrency, use_cache,
+                                               [covidence_numbers[position] for position in pending], journal,
+                                               create_system_message(prompt_template, encoding), pool=pool)
+
+    results = [journal.get(covidence_number) if journal is not None else None for covidence_number in covidence_numbers]
+    for position, llm_response in zip(pending, responses):
+        results[position] = llm_response
+    fill_rule_decisions(results, covidence_numbers, journal, rule_decisions, duplicate_of)
+    return results
+
+
+def run_coroutine(coroutine):
+    """
+    Runs a coroutine to completion, also from consoles that already run an event loop (Spyder, Jupyter).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # asyncio.run refuses to nest inside a running loop, so use a fresh loop in a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def screen_articles(articles: pd.DataFrame, prompt_template: Dict, api_key: str, base_url: str, model: str, max_concurrency: int = 8, use_cache: bool = True,
+                    journal_path: Optional[str] = None, encoding: str = "pretty", pool: Optional[EndpointPool] = None,
+                    prefilter: Optional[RulePrefilter] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Blocking wrapper around screen_articles_async for use in the request scripts.
+    """
+    return run_coroutine(screen_articles_async(articles, prompt_template, api_key, base_url, model, max_concurrency, use_cache, journal_path,
+                                               encoding, pool, prefilter))
@@ -0,0 +1,141 @@
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from llm_systematic_review.normalization import normalize_title, parse_year
+
+# Title similarity below which a Covidence record is left without a match
+DEFAULT_MIN_SCORE = 0.85
+# Confidence is multiplied by this when both records have a year and the years differ
+YEAR_MISMATCH_PENALTY = 0.9
+# Zotero keeps at least this many characters of a title in its file names
+PREFIX_CHARS = 40
+
+_TEXT_SUFFIX = re.compile(r"\.txt$", re.IGNORECASE)
+
+
+def title_ngrams(normalized_title: str, n: int = 3) -> set:
+    padded = f" {normalized_title} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def title_similarity(query: str, candidate: str) -> float:
+    """
+    Similarity of two normalized titles, tolerant of the candidate being a truncated prefix.
+
+    Zotero cuts long titles in file names, so the query is compared with the
+    candidate both in full and cut to the candidate's length; the better ratio counts.
+    """
+    full = SequenceMatcher(None, query, candidate).ratio()
+    if len(query) <= len(candidate):
+        return full
+    return max(full, SequenceMatcher(None, query[:len(candidate)], candidate).ratio())
+
+
+class TitleMatchIndex:
+    """
+    Fuzzy lookup of Zotero entries by title.
+
+    The Zotero file names carry no DOI, so entries can only be told apart by
+    their (often truncated) title and year. Titles are normalized and indexed by character trigrams. A lookup only
+    reads the postings of the query's rarest trigrams (of the whole title and
+    of its start), counts how many of them each Zotero entry shares, and
+    scores the best few candidates with
+    title_similarity, so its cost grows with the size of those postings rather
+    than with the size of the library.
+    """
+
+    def __init__(self, zotero_df: pd.DataFrame, title_column: str = "title_zotero", year_column: str = "year",
+                 n: int = 3, query_ngrams: int = 16, candidates: int = 5):
+        """
+        Args:
+            zotero_df: Zotero entries, e.g. from ZoteroFileIndex.scan().
+            title_column: Column with the (possibly truncated) titles.
+            year_column: Optional column with the publication years.
+            n: Length of the character n-grams.
+            query_ngrams: Number of the query's rarest n-grams whose postings are read, per lookup.
+            candidates: Number of candidates taken from each of the two lookups per query.
+        """
+        self.n = n
+        self.query_ngrams = query_ngrams
+        self.candidates = candidates
+        titles = zotero_df[title_column].map(lambda title: normalize_title(_TEXT_SUFFIX.sub("", str(title))) if pd.notna(title) else None)
+        self.titles: List[Optional[str]] = titles.tolist()
+        self.years: List[Optional[int]] = (zotero_df[year_column].map(parse_year).tolist() if year_column in zotero_df.columns
+                                           else [None] * len(zotero_df))
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for position, title in enumerate(self.titles):
+            for ngram in title_ngrams(title, n) if title else ():
+                self.postings[ngram].append(position)
+
+    def _rarest(self, title: str, count: int) -> List[str]:
+        return sorted((ngram for ngram in title_ngrams(title, self.n) if ngram in self.postings),
+                      key=lambda ngram: len(self.postings[ngram]))[:count]
+
+    def _top(self, ngrams: List[str]) -> List[int]:
+        shared = Counter(position for ngram in ngrams for position in self.postings[ngram])
+        return [position for position, _ in shared.most_common(self.candidates)]
+
+    def _candidates(self, title: str) -> List[int]:
+        # The start of the title is looked up on its own as well, since truncated Zotero titles
+        # lack the n-grams of the rest and can lose against entries sharing words further on
+        candidates = self._top(self._rarest(title[:PREFIX_CHARS], self.query_ngrams))
+        candidates += [position for position in self._top(self._rarest(title, self.query_ngrams)) if position not in candidates]
+        return candidates
+
+    def lookup(self, title: Any, year: Any = None) -> Tuple[Optional[int], float]:
+        """
+        Finds the Zotero entry of one record.
+
+        Returns:
+            Tuple of (position of the best Zotero entry or None, confidence between 0 and 1).
+        """
+        normalized_title = normalize_title(title)
+        if normalized_title is None:
+            return None, 0.0
+
+        year = parse_year(year)
+        best_position, best_score = None, 0.0
+        for position in self._candidates(normalized_title):
+            score = title_similarity(normalized_title, self.titles[position])
+            if year is not None and self.years[position] is not None and year != self.years[position]:
+                score *= YEAR_MISMATCH_PENALTY
+            if score > best_score:
+                best_position, best_score = position, score
+        return best_position, best_score
+
+    def match(self, records: pd.DataFrame, title_column: str = "Title", year_column: str = "Published Year") -> pd.DataFrame:
+        """
+        Looks up every record.
+
+        Returns:
+            DataFrame aligned with `records` with the 'zotero_position' of the best entry (or NaN)
+            and the 'match_confidence'.
+        """
+        years = records[year_column] if year_column in records.columns else [None] * len(records)
+        matches = [self.lookup(title, year) for title, year in zip(records[title_column], years)]
+        return pd.DataFrame(matches, columns=["zotero_position", "match_confidence"], index=records.index)
+
+
+def join_covidence_zotero(covidence_df: pd.DataFrame, zotero_df: pd.DataFrame, min_score: float = DEFAULT_MIN_SCORE) -> pd.DataFrame:
+    """
+    Left-joins the Zotero entries onto the Covidence records by fuzzy title match.
+
+    Args:
+        covidence_df: Covidence export with 'Title' and 'Published Year' columns.
+        zotero_df: Zotero entries, e.g. from ZoteroFileIndex.scan().
+        min_score: Confidence below which a record is left without a Zotero entry.
+
+    Returns:
+        The Covidence records with the columns of their Zotero entry (empty where unmatched)
+        and the 'match_confidence'.
+    """
+    matches = TitleMatchIndex(zotero_df).match(covidence_df)
+    matches.loc[matches["match_confidence"] < min_score, "zotero_position"] = None
+    positions = matches["zotero_position"]
+    matched = zotero_df.reset_index(drop=True).reindex(positions.astype("Int64").fillna(-1).astype(int).tolist())
+    matched.index = covidence_df.index
+    return pd.concat([covidence_df, matched, matches[["match_confidence"]]], axis=1)
@@ -0,0 +1,27 @@
+from llm_systematic_review.cosine_sim_duplicates_detector import ArticleDuplicateDetector
+from llm_systematic_review.duplicate_index import DEFAULT_INDEX_PATH, DuplicateIndex
+from llm_systematic_review.ris_reader import read_ris_files
+import os
+import pandas as pd
+
+# Checks a newly arrived export against the records screened so far and adds it to the duplicate
+# index. The first run builds the index from the Covidence export; later runs only process the
+# new records. Records already in the index (same Covidence #, or for RIS files '<file stem>:' and
+# a hash of the title and abstract) are skipped, so running the script twice on the same export
+# adds nothing, while a re-exported file with new records adds those records.
+
+screened_csv = "data/review_581959_screen_csv_20250603221248.csv"
+new_ris_files = ["data/ris_files/all_records.ris"]
+report_path = "data/new_records_duplicate_report.csv"
+
+if os.path.exists(DEFAULT_INDEX_PATH):
+    index = DuplicateIndex.load(DEFAULT_INDEX_PATH)
+else:
+    screened_df = pd.read_csv(screened_csv)[['Title', 'Abstract', 'Covidence #']]
+    index = DuplicateIndex.build(screened_df, ArticleDuplicateDetector(similarity_threshold=0.7, mode="sparse"))
+    print(f"Built the index of {len(index)} screened records")
+
+duplicate_report = index.update(read_ris_files(new_ris_files))
+index.save(DEFAULT_INDEX_PATH)
+print(f"{len(duplicate_report)} potential duplicate pairs, {len(index)} records indexed")
+duplicate_report.to_csv(report_path, index=False)
@@ -0,0 +1,106 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+ZOTERO_COLUMNS = ["title_zotero", "authors", "year", "path"]
+DEFAULT_CACHE_PATH = "data/zotero_index_cache.json"
+
+
+def parse_zotero_file_name(file_name: str) -> Optional[Dict[str, str]]:
+    """
+    Parses a Zotero export file name of the form 'authors - year - title'.
+
+    Returns:
+        Dictionary with 'title_zotero', 'authors' and 'year', or None if the name has fewer than three parts.
+    """
+    # Remove '_ocr' from the filename if present
+    clean_name = file_name.replace('_ocr.txt', '')
+    parts = clean_name.split(" - ")
+    if len(parts) < 3:
+        return None
+    authors, year, title = parts[:3]
+    return {"title_zotero": title.strip(), "authors": authors.strip(), "year": year.strip()}
+
+
+def _scan_folder(folder_path: str) -> List[Dict[str, str]]:
+    records = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith('.txt') and entry.is_file():
+                record = parse_zotero_file_name(entry.name)
+                if record is not None:
+                    record["path"] = os.path.join(folder_path, entry.name)
+                    records.append(record)
+    return records
+
+
+class ZoteroFileIndex:
+    """
+    Index of the OCR text files in a Zotero export (one numbered folder per item).
+
+    The export is walked once with os.scandir and the parsed records are
+    collected in plain lists, from which the DataFrame is built in one go.
+    With a cache file, the records of every folder are stored together with
+    the folder's modification time, which changes whenever a file in it is
+    added, removed or renamed; a later scan only lists the folders whose
+    mtime differs and takes the others from the cache.
+    """
+
+    def __init__(self, root_directory: str, cache_path: Optional[str] = None):
+        """
+        Args:
+            root_directory: The export directory, e.g. 'data/test_conversion/PDF'.
+            cache_path: Optional JSON file caching the records per folder.
+        """
+        self.root_directory = root_directory
+        self.cache_path = cache_path
+        self.rescanned_folders = 0
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        with open(self.cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache["folders"] if cache.get("root_directory") == self.root_directory else {}
+
+    def _save_cache(self, folders: Dict[str, Dict]) -> None:
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = self.cache_path + ".tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump({"root_directory": self.root_directory, "folders": folders}, f, ensure_ascii=False)
+        os.replace(temporary_path, self.cache_path)
+
+    def scan(self) -> pd.DataFrame:
+        """
+        Lists the text files of all folders.
+
+        Returns:
+            DataFrame with 'title_zotero', 'authors', 'year' and 'path' columns, folders in sorted order.
+        """
+        cache = self._load_cache()
+        folders = {}
+        columns: Dict[str, List[str]] = {column: [] for column in ZOTERO_COLUMNS}
+        self.rescanned_folders = 0
+
+        with os.scandir(self.root_directory) as entries:
+            folder_entries = sorted((entry for entry in entries if entry.is_dir()), key=lambda entry: entry.name)
+        for entry in folder_entries:
+            mtime = entry.stat().st_mtime_ns
+            cached = cache.get(entry.name)
+            if cached is not None and cached["mtime"] == mtime:
+                records = cached["records"]
+            else:
+                records = _scan_folder(entry.path)
+                self.rescanned_folders += 1
+            folders[entry.name] = {"mtime": mtime, "records": records}
+            for record in records:
+                for column in ZOTERO_COLUMNS:
+                    columns[column].append(record[column])
+
+        if self.cache_path is not None and (self.rescanned_folders > 0 or folders.keys() != cache.keys()):
+            self._save_cache(folders)
+        return pd.DataFrame(columns, columns=ZOTERO_COLUMNS)
@@ -0,0 +1,70 @@
+from llm_systematic_review.zotero_index import ZoteroFileIndex, parse_zotero_file_name
+from pathlib import Path
+import os
+import pandas as pd
+import tempfile
+import time
+
+# Compares building the Zotero file table row by row (the former DataFrame.append loop,
+# written with pd.concat since append is gone in pandas 2) with ZoteroFileIndex, cold and
+# from its mtime cache, on synthetic exports. Every folder holds one PDF, its OCR text
+# and a few page images, like data/test_conversion/PDF. The row-by-row build is quadratic,
+# so it is only timed up to max_legacy_folders.
+
+folder_counts = [500, 5000, 50000]
+max_legacy_folders = 5000
+
+
+def make_export(root: Path, n_folders: int) -> None:
+    for number in range(n_folders):
+        folder = root / str(7000 + number)
+        folder.mkdir()
+        name = f"Author{number} и др. - {2015 + number % 10} - Title of article number {number}"
+        (folder / f"{name}.pdf").touch()
+        (folder / f"{name}_ocr.txt").touch()
+        for page in range(1, 4):
+            (folder / f"{name}_0001-{page}.png").touch()
+
+
+def legacy_scan(root: Path) -> pd.DataFrame:
+    zotero_df = pd.DataFrame(columns=["title_zotero", "authors", "year", "path"])
+    for folder_path in sorted(root.iterdir()):
+        for file_path in folder_path.iterdir():
+            if file_path.suffix.lower() == '.txt':
+                record = parse_zotero_file_name(file_path.name)
+                record["path"] = str(file_path)
+                zotero_df = pd.concat([zotero_df, pd.DataFrame([record])], ignore_index=True)
+    return zotero_df
+
+
+report = []
+for n_folders in folder_counts:
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory) / "PDF"
+        root.mkdir()
+        make_export(root, n_folders)
+        index = ZoteroFileIndex(str(root), cache_path=os.path.join(directory, "cache.json"))
+
+        timings = {}
+        if n_folders <= max_legacy_folders:
+            start = time.perf_counter()
+            legacy_df = legacy_scan(root)
+            timings["row_by_row_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        zotero_df = index.scan()
+        timings["bulk_cold_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        cached_df = index.scan()
+        timings["bulk_cached_s"] = time.perf_counter() - start
+        # A new file in one folder only rescans that folder
+        (root / "7000" / "Extra - 2020 - Added later.txt").touch()
+        start = time.perf_counter()
+        index.scan()
+        timings["one_folder_changed_s"] = time.perf_counter() - start
+
+        assert cached_df.equals(zotero_df) and len(zotero_df) == n_folders
+        if n_folders <= max_legacy_folders:
+            pd.testing.assert_frame_equal(legacy_df, zotero_df, check_dtype=False)
+        report.append({"folders": n_folders, **{name: round(seconds, 3) for name, seconds in timings.items()}})
+
+print(pd.DataFrame(report).to_string(index=False))
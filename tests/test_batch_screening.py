@@ -0,0 +1,45 @@
+import pandas as pd
+
+from llm_systematic_review.batch_screening import create_batch_system_message, create_llm_batch_prompt_string, screen_articles_batched
+from llm_systematic_review.endpoint_pool import EndpointPool
+from llm_systematic_review.mock_llm_server import MockLLMServer
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.rule_prefilter import RulePrefilter
+
+
+def make_articles():
+    articles = pd.DataFrame({
+        'Title': [f"Article {number}" for number in range(12)],
+        'Abstract': [f"Abstract of article {number}." for number in range(12)],
+        'Published Year': ["2024"] * 12,
+        'Covidence #': [f"#{number}" for number in range(12)],
+        'Authors': [f"Author{number}, A" for number in range(12)]
+    })
+    articles.loc[3, 'Abstract'] = None
+    # A duplicate of the first article
+    return pd.concat([articles, articles.iloc[[0]].assign(**{'Covidence #': "#dup"})], ignore_index=True)
+
+
+def test_batched_mode_uses_encoding_pool_and_prefilter():
+    articles = make_articles()
+    template = PromptTemplates.PROMPT_TITLE_ABSTRACT
+    with MockLLMServer(latency=0.01, latency_jitter=0.0) as first, MockLLMServer(latency=0.01, latency_jitter=0.0) as second:
+        pool = EndpointPool.from_config([{"base_url": first.base_url, "api_key": "key", "model": "mock"},
+                                         {"base_url": second.base_url, "api_key": "key", "model": "mock"}])
+        results = screen_articles_batched(articles, template, "unused", "http://127.0.0.1:9/v1", "mock", batch_size=2, use_cache=False,
+                                          encoding="compact", pool=pool, prefilter=RulePrefilter(template))
+
+    # Both endpoints of the pool answered, never the unused base_url
+    assert first.request_log and second.request_log
+    assert results[3]["rule"] == "missing_abstract"
+    assert results[-1]["duplicate_of"] == "#0"
+    assert results[-1]["final_decision"] == results[0]["final_decision"]
+    assert all(result is not None for result in results)
+
+
+def test_compact_batch_prompt_carries_only_the_articles():
+    template = PromptTemplates.PROMPT_TITLE_ABSTRACT
+    article = {"title": "Title", "abstract": "Abstract", "year": "2024", "covidence_number": "#1"}
+
+    assert create_llm_batch_prompt_string(template, [article], "compact") == '[{"ti":"Title","ab":"Abstract","py":"2024","id":"#1"}]'
+    assert '"results"' in create_batch_system_message(template, "compact")
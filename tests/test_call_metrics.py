@@ -0,0 +1,21 @@
+from llm_systematic_review.call_metrics import SUMMARY_COLUMNS, estimate_run, summarize_call_metrics
+
+
+def test_summarize_empty_metrics_file(tmp_path):
+    # A fully resumed or cached run logs no calls at all
+    path = tmp_path / "llm_calls.jsonl"
+    path.write_text("")
+
+    summary = summarize_call_metrics(str(path))
+
+    assert summary.empty
+    assert list(summary.columns) == SUMMARY_COLUMNS
+
+
+def test_estimate_run_with_empty_history(tmp_path):
+    path = tmp_path / "llm_calls.jsonl"
+    path.write_text("")
+
+    estimate = estimate_run(["prompt"], "system", "PROMPT_TITLE_ABSTRACT", history_path=str(path))
+
+    assert estimate["completion_tokens"] == 350
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from llm_systematic_review.duplicate_index import DuplicateIndex
+from llm_systematic_review.ris_reader import read_ris_files
+
+# The vectorizer keeps terms found in at least two records and in at most 95% of them, hence two topics
+RECORDS = [("Language models for screening " + name, "We evaluate language models as screeners of abstracts in " + name + ".")
+           for name in ("medicine", "ecology", "education")] + \
+          [("Protein folding with neural networks " + name, "A neural network predicts protein structures of " + name + ".")
+           for name in ("enzymes", "antibodies", "toxins")]
+INDEXED = RECORDS[0:2] + RECORDS[3:5]
+
+
+def write_ris(path, records):
+    with open(path, "w", encoding="utf-8") as file:
+        for title, abstract in records:
+            file.write(f"TY  - JOUR\nTI  - {title}\nAB  - {abstract}\nPY  - 2024\nER  - \n\n")
+
+
+def test_reexported_file_with_a_new_record_adds_it(tmp_path):
+    path = tmp_path / "export.ris"
+    write_ris(path, INDEXED)
+    index = DuplicateIndex.build(read_ris_files([str(path)]))
+
+    # The new record comes first, so it takes the position of an indexed one
+    write_ris(path, [RECORDS[2]] + INDEXED)
+    index.update(read_ris_files([str(path)]))
+
+    assert len(index) == 5
+    assert index.update(read_ris_files([str(path)])).empty and len(index) == 5
+
+
+def test_indexed_id_with_a_different_text_is_reported(capsys):
+    index = DuplicateIndex.build(pd.DataFrame({'Covidence #': ["1", "2", "3", "4"], 'Title': [title for title, _ in INDEXED],
+                                               'Abstract': [abstract for _, abstract in INDEXED]}))
+    capsys.readouterr()
+
+    index.update(pd.DataFrame({'Covidence #': ["1"], 'Title': [RECORDS[2][0]], 'Abstract': [RECORDS[2][1]]}))
+
+    assert "Warning: 1 records reuse the ID" in capsys.readouterr().out
+    assert len(index) == 4
@@ -0,0 +1,53 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_systematic_review.endpoint_pool import Endpoint, EndpointPool
+from llm_systematic_review.helpers import LLMRequestError, create_llm_abs_title_prompt_string, get_llm_screening_decision
+from llm_systematic_review.mock_llm_server import MockLLMServer
+from llm_systematic_review.prompt_config import PromptTemplates
+
+PROMPT = create_llm_abs_title_prompt_string(PromptTemplates.PROMPT_TITLE_ABSTRACT, "A title", "An abstract.", "2024", "1")
+
+
+class Unauthorized(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        body = json.dumps({"error": {"message": "Invalid API key", "type": "invalid_request_error"}}).encode()
+        self.send_response(401)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def unauthorized_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Unauthorized)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+def test_rejected_endpoint_is_marked_failed_and_the_request_moves_on(unauthorized_url):
+    with MockLLMServer(latency=0.01, latency_jitter=0.0) as server:
+        rejecting = Endpoint(unauthorized_url, "wrong-key", "mock-model", weight=1e6)
+        pool = EndpointPool([rejecting, Endpoint(server.base_url, "mock-key", "mock-model")])
+
+        decision = get_llm_screening_decision(PROMPT, "", "", "", use_cache=False, pool=pool)
+
+    assert decision["final_decision"] in ("Include", "Exclude")
+    assert rejecting.failures == 1
+
+
+def test_request_fails_once_every_endpoint_rejected_it(unauthorized_url):
+    pool = EndpointPool([Endpoint(unauthorized_url, "wrong-key", "mock-model"), Endpoint(unauthorized_url, "other-key", "mock-model")])
+
+    with pytest.raises(LLMRequestError, match="Every endpoint of the pool rejected the request"):
+        get_llm_screening_decision(PROMPT, "", "", "", use_cache=False, pool=pool)
+    assert [endpoint.failures for endpoint in pool.endpoints] == [1, 1]
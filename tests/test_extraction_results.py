@@ -0,0 +1,39 @@
+import os
+
+import pandas as pd
+
+from llm_systematic_review.extraction_parser import ExtractionResultWriter, read_extraction_results, read_invalid_queue
+from llm_systematic_review.extraction_runner import EXTRACTION_COLUMNS, columns_pt_1, columns_pt_2, reextract_invalid
+from llm_systematic_review.mock_llm_server import MockLLMServer
+
+COLUMNS = ["covidence_number", "location", "domain"]
+
+
+def test_rows_flushed_before_a_crash_stay_readable(tmp_path):
+    path = str(tmp_path / "extraction.parquet")
+    writer = ExtractionResultWriter(path, COLUMNS, rows_per_file=2)
+    for number in range(3):
+        writer.write_row({"covidence_number": str(number), "location": "Germany, Berlin"})
+
+    # The writer is never closed, as in a crashed run
+    results = read_extraction_results(path, COLUMNS)
+    assert results["covidence_number"].tolist() == ["0", "1"]
+    assert results["location"].tolist() == ["Germany, Berlin"] * 2
+
+
+def test_reextract_invalid_fills_the_queued_parts(tmp_path):
+    path = str(tmp_path / "extraction.parquet")
+    full_text = tmp_path / "article.txt"
+    full_text.write_text("A study on chatbots.", encoding="utf-8")
+    with ExtractionResultWriter(path, EXTRACTION_COLUMNS) as writer:
+        writer.write_row(dict.fromkeys(columns_pt_1, "Not Reported") | {"covidence_number": "7"})
+        writer.write_invalid("7", 2, "not a CSV line", "expected 9 values, got 1")
+    assert read_invalid_queue(writer.invalid_path)["part"].tolist() == [2]
+
+    articles = pd.DataFrame({'Covidence #': [7], 'path': [str(full_text)]})
+    with MockLLMServer(latency=0.01, latency_jitter=0.0) as server:
+        results = reextract_invalid(articles, "mock-key", server.base_url, "mock-model", path, use_cache=False)
+
+    assert len(results) == 1
+    assert results[columns_pt_1[1:] + columns_pt_2[1:]].notna().all(axis=1).iloc[0]
+    assert not os.path.exists(writer.invalid_path)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from llm_systematic_review.prescreen_cascade import screen_articles_cascade, train_prescreen
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.result_journal import ResultJournal
+
+
+class FixedScores:
+    def __init__(self, scores):
+        self.scores = np.asarray(scores)
+        self.scored = []
+
+    def score(self, texts):
+        self.scored.append(len(texts))
+        return self.scores[:len(texts)]
+
+
+def make_labelled(n_per_class=12):
+    rows = [(f"Language models screen abstracts {i}", "Screening with language models.", 1) for i in range(n_per_class)] + \
+           [(f"Protein folding networks {i}", "Protein structures from sequences.", 0) for i in range(3 * n_per_class)]
+    return pd.DataFrame(rows, columns=['Title', 'Abstract', 'label']).assign(label_source="human")
+
+
+def test_threshold_keeps_the_target_recall_on_cross_validated_scores():
+    _, threshold, report = train_prescreen(make_labelled(), target_recall=1.0)
+
+    chosen = report[report['threshold'] == threshold].iloc[0]
+    assert chosen['recall'] == 1.0 and chosen['calls_saved'] > 0
+
+
+def test_prescreen_exclusions_are_journaled_and_not_scored_again(tmp_path):
+    articles = pd.DataFrame({'Covidence #': ["1", "2"], 'Title': ["A", "B"], 'Abstract': ["a", "b"], 'Published Year': [2024, 2024]})
+    journal_path = str(tmp_path / "journal.jsonl")
+    classifier = FixedScores([0.1, 0.2])
+
+    results = screen_articles_cascade(articles, PromptTemplates.PROMPT_TITLE_ABSTRACT, "key", "http://localhost:1", "model",
+                                      classifier, 0.5, journal_path=journal_path, use_cache=False)
+    assert [result["decided_by"] for result in results] == ["prescreen", "prescreen"]
+    assert ResultJournal(journal_path).get("2")["final_decision"] == "Exclude"
+
+    resumed = screen_articles_cascade(articles, PromptTemplates.PROMPT_TITLE_ABSTRACT, "key", "http://localhost:1", "model",
+                                      classifier, 0.5, journal_path=journal_path, use_cache=False)
+    assert resumed == results
+    assert classifier.scored == [2, 0]
@@ -0,0 +1,29 @@
+import pytest
+
+from llm_systematic_review.rate_limiter import parse_rate_limit_headers
+
+
+def test_large_daily_budget_does_not_slow_down():
+    rate, _ = parse_rate_limit_headers({"X-RateLimit-Remaining-Day": "10000", "X-RateLimit-Limit-Day": "20000"})
+
+    assert rate is None
+
+
+def test_minute_window_paces_requests():
+    rate, _ = parse_rate_limit_headers({"x-ratelimit-remaining-minute": "120", "x-ratelimit-remaining-day": "10000"})
+
+    assert rate == pytest.approx(2.0)
+
+
+def test_nearly_used_up_daily_budget_is_spread_over_the_day():
+    rate, _ = parse_rate_limit_headers({"x-ratelimit-remaining-day": "864", "x-ratelimit-limit-day": "20000"})
+
+    assert rate == pytest.approx(0.01)
+
+
+def test_remaining_and_reset_pair():
+    rate, retry_after = parse_rate_limit_headers({"x-ratelimit-remaining-requests": "30", "x-ratelimit-reset-requests": "6m0s",
+                                                  "retry-after": "2"})
+
+    assert rate == pytest.approx(30 / 360)
+    assert retry_after == 2.0
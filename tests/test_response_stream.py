@@ -0,0 +1,33 @@
+import json
+
+from llm_systematic_review.response_stream import JSONStreamAccumulator
+
+ANSWER = ('{"covidence_number": "12", "inclusion_criteria_evaluation": {"ic_1": {"reasoning": "Uses an LLM.", "decision": "Yes"}}, '
+          '"final_decision": "Include", "notes": "never waited for"}')
+
+
+def feed_characters(accumulator, text):
+    return any(accumulator.feed(char) for char in text)
+
+
+def test_stops_once_every_required_key_is_generated():
+    accumulator = JSONStreamAccumulator(["covidence_number", "inclusion_criteria_evaluation", "final_decision"])
+
+    assert feed_characters(accumulator, ANSWER)
+    assert json.loads(accumulator.text) == {"covidence_number": "12", "inclusion_criteria_evaluation": {
+        "ic_1": {"reasoning": "Uses an LLM.", "decision": "Yes"}}, "final_decision": "Include"}
+
+
+def test_final_decision_before_other_keys_does_not_stop_the_stream():
+    answer = '{"final_decision": "Exclude", "covidence_number": 12, "exclusion_criteria_evaluation": {"ec_1": {"decision": "Yes"}}}'
+    accumulator = JSONStreamAccumulator(["covidence_number", "exclusion_criteria_evaluation", "final_decision"])
+
+    assert feed_characters(accumulator, answer)
+    assert json.loads(accumulator.text) == json.loads(answer)
+
+
+def test_without_required_keys_reads_to_the_end_of_the_object():
+    accumulator = JSONStreamAccumulator()
+
+    assert feed_characters(accumulator, ANSWER + "\n\n")
+    assert json.loads(accumulator.text) == json.loads(ANSWER)
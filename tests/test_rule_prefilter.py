@@ -0,0 +1,77 @@
+import pandas as pd
+
+from llm_systematic_review.prompt_config import PromptTemplates
+from llm_systematic_review.rule_prefilter import RulePrefilter
+
+
+def make_articles(rows):
+    return pd.DataFrame(rows, columns=['Covidence #', 'Title', 'Abstract', 'Published Year', 'DOI', 'Authors'])
+
+
+def test_same_title_different_years_are_both_sent_to_the_llm():
+    articles = make_articles([
+        ["1", "Editorial", "An editorial on screening.", 2021, None, "Smith, J"],
+        ["2", "Editorial", "Another editorial on screening.", 2023, None, "Smith, J"]
+    ])
+
+    rule_decisions, duplicate_of = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT).apply(articles, decided={"1": {"final_decision": "Include"}})
+
+    assert rule_decisions == {}
+    assert duplicate_of == {}
+
+
+def test_same_title_different_first_authors_are_not_duplicates():
+    articles = make_articles([
+        ["1", "Reply to the letter", "A reply.", 2022, None, "Smith, J; Lee, K"],
+        ["2", "Reply to the letter", "Another reply.", 2022, None, "Jones, A"]
+    ])
+
+    rule_decisions, duplicate_of = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT).apply(articles)
+
+    assert rule_decisions == {} and duplicate_of == {}
+
+
+def test_same_title_year_and_first_author_copies_the_decision():
+    articles = make_articles([
+        ["1", "Large language models for screening", "An abstract.", 2024, None, "Smith, J"],
+        ["2", "Large Language Models for Screening.", "The same abstract.", "2024", None, "Smith, J."]
+    ])
+
+    rule_decisions, _ = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT).apply(articles, decided={"1": {"final_decision": "Include"}})
+
+    assert rule_decisions[1]["final_decision"] == "Include"
+    assert rule_decisions[1]["duplicate_of"] == "1"
+
+
+def test_same_doi_copies_the_decision_across_years():
+    articles = make_articles([
+        ["1", "Editorial", "An abstract.", 2021, "10.1000/xyz", None],
+        ["2", "Editorial", "An abstract.", 2022, "https://doi.org/10.1000/XYZ", None]
+    ])
+
+    rule_decisions, _ = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT).apply(articles, decided={"1": {"final_decision": "Exclude"}})
+
+    assert rule_decisions[1]["rule"] == "duplicate"
+
+
+def test_missing_abstract_exclusion_is_not_copied_to_a_duplicate_with_abstract():
+    articles = make_articles([
+        ["1", "Large language models for screening", None, 2024, "10.1/x", "Smith, J"],
+        ["2", "Large language models for screening", "A full abstract.", 2024, "10.1/x", "Smith, J"]
+    ])
+
+    rule_decisions, duplicate_of = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT).apply(articles)
+
+    assert rule_decisions[0]["rule"] == "missing_abstract"
+    assert 1 not in rule_decisions and 1 not in duplicate_of
+
+
+def test_same_title_and_year_without_authors_are_not_duplicates():
+    articles = make_articles([
+        ["1", "Editorial", "An editorial.", 2022, None, None],
+        ["2", "Editorial", "Another editorial.", 2022, None, None]
+    ])
+
+    rule_decisions, duplicate_of = RulePrefilter(PromptTemplates.PROMPT_TITLE_ABSTRACT).apply(articles, decided={"1": {"final_decision": "Include"}})
+
+    assert rule_decisions == {} and duplicate_of == {}